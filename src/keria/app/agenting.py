@@ -7,11 +7,15 @@ keria.app.agenting module
 
 import logging
 import os
+import threading
+import time
 from base64 import b64decode
+from collections import OrderedDict, deque
+from concurrent import futures
 import json
 import datetime
 from dataclasses import asdict, dataclass, field
-from typing import List, Union
+from typing import Callable, List, Union
 from urllib.parse import urlparse, urljoin
 from types import MappingProxyType
 from deprecation import deprecated
@@ -35,7 +39,6 @@ from keri.app import (
     signaling,
     oobiing,
     agenting,
-    forwarding,
     querying,
     connecting,
     grouping,
@@ -45,6 +48,7 @@ from keri.app.keeping import Algos
 from keri.core import coring, parsing, eventing, routing, serdering
 from keri.core.coring import Ilks
 from keri.core.signing import Salter
+from keri.db import dbing
 from keri.db.basing import OobiRecord
 from keri.vc import protocoling
 
@@ -60,15 +64,24 @@ from keria.utils.openapi import dataclassFromFielddom
 
 from . import aiding, notifying, indirecting, credentialing, ipexing, delegating
 from . import grouping as keriagrouping
-from .serving import GracefulShutdownDoer
+from .serving import (
+    AdaptiveDoist,
+    Dispatcher,
+    GracefulShutdownDoer,
+    threadedServerDoer,
+)
 from .. import log_name, ogler, set_log_level
 from ..core.httping import falconApp, createHttpServer
 from ..peer import exchanging as keriaexchanging
+from ..peer import posting
 from .specing import AgentSpecResource
 from ..core import authing, longrunning, httping
+from ..core import verifying as keriaverifying
 from ..core.authing import Authenticater
 from ..core.keeping import RemoteManager
 from ..db import basing
+from ..monitoring.memory import residentSetSize
+from ..monitoring import metrics
 from .credentialing import (
     ICP_V_1,
     ICP_V_2,
@@ -138,6 +151,126 @@ class KERIAServerConfig:
     cors: bool = True
     # Timeout for releasing agents. Default is 86400 seconds (24 hours)
     releaseTimeout: int = 86400
+    # Maximum number of agents kept resident in memory. The least recently used agent is released
+    # when the limit is exceeded. Default is 0 (unlimited). KERIA_MAX_AGENTS also sets this
+    maxAgents: int = 0
+    # Resident set size budget for the agency process in megabytes. Least recently used agents are
+    # released while the budget is exceeded. Default is 0 (no budget). KERIA_MEMORY_BUDGET also sets this
+    memoryBudget: int = 0
+    # Load agents that are not resident on a background thread instead of on the request path.
+    # Requests for a loading agent receive 503 Service Unavailable with a Retry-After header.
+    # Default is False. KERIA_ASYNC_LOAD also sets this
+    asyncLoad: bool = False
+    # Number of background threads loading agents when asyncLoad is enabled. Default is 4
+    loadWorkers: int = 4
+    # Seconds clients are asked to wait before retrying a request for a loading agent. Default is 1
+    retryAfter: int = 1
+    # Open the credential and exchange search indexes, mailbox, operations and notifications databases of each Agent,
+    # and start the IPEX, multisig and indexing tasks, only once they are first used. Default is False.
+    # KERIA_LAZY_AGENTS also sets this
+    lazyAgents: bool = False
+    # Keep the credential and exchange search indexes, operations, remote key and notifications databases of each
+    # Agent as named sub databases of a single LMDB environment. Use `keria migrate-store` to move existing agents
+    # to this layout. Default is False. KERIA_SHARED_STORE also sets this
+    sharedStore: bool = False
+    # Number of worker processes the agency is split across, each owning a hash partition of the agents behind a
+    # router listening on the admin, http and boot ports. Default is 0 (single process). KERIA_SHARDS also sets this
+    shards: int = 0
+    # Worker N listens on the admin, http and boot ports plus shardPortStep * (N + 1). Default is 10.
+    # KERIA_SHARD_PORT_STEP also sets this
+    shardPortStep: int = 10
+    # Seconds the router waits on a worker for a response. Default is 60.0. KERIA_ROUTER_TIMEOUT also sets this
+    routerTimeout: float = 60.0
+    # Maximum size in bytes of a request body the router forwards, larger ones are refused with 413, 0 means
+    # unbounded. Default is 16777216. KERIA_ROUTER_BODY_LIMIT also sets this
+    routerBodyLimit: int = 16777216
+    # Number of most recently active agents loaded in the background at startup. Default is 0 (none).
+    # KERIA_PREWARM_COUNT also sets this
+    prewarmCount: int = 0
+    # Agents loaded per second while pre-warming at startup. Default is 1.0. KERIA_PREWARM_RATE also sets this
+    prewarmRate: float = 1.0
+    # Minimum seconds between writes of an agent's last activity time to the agency database. Default is 60.
+    # KERIA_ACTIVITY_INTERVAL also sets this
+    activityInterval: int = 60
+    # Seconds without requests after which an agent with empty queues and escrows is taken off the scheduler until
+    # its next request or inbound message. Default is 0 (never). KERIA_QUIESCE_AFTER also sets this
+    quiesceAfter: int = 0
+    # Seconds between the escrow and queue passes a quiescent agent is woken for. Default is 300.
+    # KERIA_ESCROW_WAKE also sets this
+    escrowWake: int = 300
+    # Number of prefix to controller AID routes of inbound messages and OOBIs kept in memory, and of unknown prefixes
+    # remembered as unknown. Default is 65536, 0 disables the cache. KERIA_ROUTE_CACHE also sets this
+    routeCache: int = 65536
+    # Seconds an unknown prefix is remembered before it is looked up in the agency database again. Default is 5.0.
+    # KERIA_UNKNOWN_TTL also sets this
+    unknownTtl: float = 5.0
+    # Seconds agents keep running on shutdown to flush their queued work while new requests are refused with
+    # 503 Service Unavailable. Default is 10.0. KERIA_DRAIN_TIMEOUT also sets this
+    drainTimeout: float = 10.0
+    # Seconds to wait on shutdown for the databases of all agents to close, databases still closing are abandoned.
+    # Default is 30.0. KERIA_CLOSE_TIMEOUT also sets this
+    closeTimeout: float = 30.0
+    # Number of threads closing agent databases in parallel on shutdown. Default is 8. KERIA_CLOSE_WORKERS also sets this
+    closeWorkers: int = 8
+    # Serve agency and per agent metrics in the Prometheus text format at /metrics on the boot port. Default is False.
+    # KERIA_METRICS also sets this
+    metrics: bool = False
+    # Agents process an escrow when its database has changed, and while nothing changes at intervals doubling up to
+    # escrowDeadline seconds so escrowed events time out. Escrow families without a "backoff" under "escrows" in the
+    # agent tocks use this. Default is 10.0. KERIA_ESCROW_DEADLINE also sets this
+    escrowDeadline: float = 10.0
+    # Maximum seconds the agency sleeps between passes over its agents while idle. Passes run every tock while there
+    # is work and immediately when a request arrives. Default is 0.0, waking every tock. KERIA_IDLE_TOCK also sets this
+    idleTock: float = 0.0
+    # Maximum bytes of CESR received over the indirect mode HTTP port queued for an agent. Further messages for the
+    # agent are refused with 429 Too Many Requests until it catches up. 0 means unbounded. Default is 16 MiB.
+    # KERIA_INGRESS_LIMIT also sets this
+    ingressLimit: int = 16 * 1024 * 1024
+    # Bytes of queued CESR an agent moves to its parser and maximum number of messages it parses on each pass.
+    # Defaults are 65536 and 16. KERIA_PARSE_BYTES and KERIA_PARSE_MSGS also set these
+    parseBytes: int = 65536
+    parseMsgs: int = 16
+    # Number of threads verifying the Ed25519 signatures of received CESR before agents parse it, so the parsers find
+    # them in a cache of verified signatures. 0 disables pre-verification. Default is 0. KERIA_PREVERIFY_WORKERS also
+    # sets this
+    preverifyWorkers: int = 0
+    # Number of verified signatures cached for the parsers when preverifyWorkers is set. Default is 65536.
+    # KERIA_VERIFY_CACHE also sets this
+    verifyCache: int = 65536
+    # Seconds an exchange message waits for the signatures of other multisig members before it is dropped, 0 means
+    # forever. Default is 86400.0. KERIA_EXCHANGE_TIMEOUT also sets this
+    exchangeTimeout: float = 86400.0
+    # Number of HTTP connections kept open to each peer endpoint and shared by all agents to send exchange messages
+    # and IPEX grants, merging messages queued for the same destination into one request. 0 opens a connection for
+    # each message. Default is 0. KERIA_OUTBOX_CONNECTIONS also sets this
+    outboxConnections: int = 0
+    # Maximum bytes of messages merged into one request to a peer. Default is 262144. KERIA_OUTBOX_BATCH also sets this
+    outboxBatch: int = 262144
+    # Number of events of an agent receipted by their witnesses at once, events of the same AID are receipted in
+    # order. Default is 8. KERIA_WITNESS_CONCURRENCY also sets this
+    witnessConcurrency: int = 8
+    # Seconds a signed admin request is accepted either side of its created time, replays of a request accepted
+    # within the window are rejected. 0 accepts requests created at any time again. Default is 0.0.
+    # KERIA_SIGNATURE_WINDOW also sets this
+    signatureWindow: float = 0.0
+    # Maximum number of accepted request signatures remembered to reject replays. Default is 65536.
+    # KERIA_SIGNATURE_CACHE also sets this
+    signatureCache: int = 65536
+    # Number of worker threads of each HTTP server reading requests and writing responses, the apps still run on the
+    # agency scheduler between passes over the agents. 0 serves requests on the scheduler. Default is 0.
+    # KERIA_SERVER_THREADS also sets this
+    serverThreads: int = 0
+    # Seconds a client of a threaded server or the router has to complete its TLS handshake. Default is 10.0.
+    # KERIA_HANDSHAKE_TIMEOUT also sets this
+    handshakeTimeout: float = 10.0
+    # Seconds a connection of a threaded server or the router may stay idle or stall sending its request before it is
+    # closed. Default is 30.0. KERIA_IDLE_TIMEOUT also sets this
+    idleTimeout: float = 30.0
+    # Minimum size in bytes of admin API response bodies compressed with gzip for clients accepting it, 0 disables
+    # compression. Default is 0, operators opt in with a threshold such as 1024. KERIA_GZIP_THRESHOLD also sets this
+    gzipThreshold: int = 0
+    # Index of the shard run by this worker process, set by the router for each worker. Default is None
+    shard: int | None = None
     # Controller Service Endpoint Location OOBI URLs to resolve at startup of each Agent. Makes a 'controller' EndRole and LocScheme in the database for each URL
     curls: List[str] = field(default_factory=list)
     # General Introduction OOBI URLs to resolve at startup of each Agent. For things like witnesses, watchers, mailboxes, and TEL observers.
@@ -184,16 +317,34 @@ def runAgency(config: KERIAServerConfig, temp=False):
         else None
     )
     agency = createAgency(config, temp=temp, cf=cf)
-    doist = agencyDoist(setupDoers(agency, config))
+    doist = agencyDoist(setupDoers(agency, config), idleTock=config.idleTock)
     logger.info("The Agency is loaded and waiting for requests...")
     doist.do()
 
 
-def agencyDoist(doers: List[Doer]):
-    """Creates a Doist for the Agency doers and adds a graceful shutdown handler. Useful for testing."""
+def agencyDoist(doers: List[Doer], idleTock=0.0):
+    """
+    Creates a Doist for the Agency doers and adds a graceful shutdown handler. Useful for testing.
+    With an idleTock the Doist sleeps up to idleTock seconds between passes while idle, see AdaptiveDoist.
+    """
     tock = 0.03125
-    doist = doing.Doist(limit=0.0, tock=tock, real=True)
-    doers.append(GracefulShutdownDoer(agency=getAgency(doers)))
+    agency = getAgency(doers)
+    ticks = agency.ticks if agency is not None else None
+    if idleTock:
+        doist = AdaptiveDoist(
+            servers=[
+                doer.server for doer in doers if isinstance(doer, http.ServerDoer)
+            ],
+            busy=agency.busy if agency is not None else None,
+            maxTock=idleTock,
+            wakers=[doer.waker for doer in doers if isinstance(doer, Dispatcher)],
+            ticks=ticks,
+            limit=0.0,
+            tock=tock,
+        )
+    else:
+        doist = metrics.MeteredDoist(ticks=ticks, limit=0.0, tock=tock, real=True)
+    doers.append(GracefulShutdownDoer(agency=agency))
     doist.doers = doers
     return doist
 
@@ -212,6 +363,7 @@ class Agency(doing.DoDoer):
     - agent provisioning
     - agent deletion
     - shutting down agents
+    - releasing least recently used agents to bound the number of resident agents and memory use
     """
 
     def __init__(
@@ -228,6 +380,35 @@ class Agency(doing.DoDoer):
         iurls=None,
         durls=None,
         cf=None,
+        maxAgents=None,
+        memoryBudget=None,
+        asyncLoad=False,
+        loadWorkers=4,
+        retryAfter=1,
+        lazy=False,
+        shared=False,
+        shard=None,
+        shards=0,
+        prewarmCount=0,
+        prewarmRate=1.0,
+        activityInterval=60,
+        quiesceAfter=0,
+        escrowWake=300,
+        routeCache=65536,
+        unknownTtl=5.0,
+        drainTimeout=10.0,
+        closeTimeout=30.0,
+        closeWorkers=8,
+        escrowDeadline=10.0,
+        ingressLimit=16 * 1024 * 1024,
+        parseBytes=65536,
+        parseMsgs=16,
+        preverifyWorkers=0,
+        verifyCache=65536,
+        exchangeTimeout=86400.0,
+        outboxConnections=0,
+        outboxBatch=262144,
+        witnessConcurrency=8,
     ):
         """
         Initialize the Agency with the given parameters.
@@ -245,6 +426,50 @@ class Agency(doing.DoDoer):
             iurls (list | None): General Introduction OOBI URLs to resolve at startup of each Agent.
             durls (list | None): Data OOBI URLs resolved at startup of each Agent.
             cf (configing.Configer | None): Optional Configer instance for configuration data.
+            maxAgents (int | None): Maximum number of resident agents, None or 0 means unlimited.
+            memoryBudget (int | None): Resident set size budget in bytes, None or 0 means no budget.
+            asyncLoad (bool): Load non-resident agents on background threads, see Agency.loading.
+            loadWorkers (int): Number of background threads loading agents when asyncLoad is True.
+            retryAfter (int): Seconds to wait before retrying a request for a loading agent.
+            lazy (bool): Create agents that open auxiliary databases and start optional doers on first use.
+            shared (bool): Create agents that keep their KERIA owned stores in one AgentStore environment.
+            shard (int | None): Index of the shard of agents this agency owns, None means all agents.
+            shards (int): Number of shards the agents are partitioned into when shard is set.
+            prewarmCount (int): Number of most recently active agents to load at startup, see Prewarmer.
+            prewarmRate (float): Agents loaded per second while pre-warming.
+            activityInterval (int): Minimum seconds between persisting the last activity of an agent.
+            quiesceAfter (int): Seconds without activity before an idle agent stops running, see Quiescer.
+            escrowWake (int): Seconds between the escrow passes a quiescent agent is woken for.
+            routeCache (int): Number of prefix routes and unknown prefixes cached by locate, 0 disables caching.
+            unknownTtl (float): Seconds an unknown prefix is remembered by locate.
+            drainTimeout (float): Seconds agents may flush queued work on shutdown, see shutdownAgency.
+            closeTimeout (float): Seconds to wait for agent databases to close on shutdown.
+            closeWorkers (int): Number of threads closing agent databases in parallel on shutdown.
+            escrowDeadline (float): Default maximum seconds between passes over an unchanged escrow, see Escrower.
+            ingressLimit (int): Maximum bytes of indirect mode CESR queued for each agent, 0 means unbounded.
+            parseBytes (int): Bytes of queued CESR each agent moves to its parser on each pass, see ParserDoer.
+            parseMsgs (int): Maximum messages each agent parses on each pass.
+            preverifyWorkers (int): Threads verifying signatures of received CESR ahead of the parsers, 0 disables.
+            verifyCache (int): Number of verified signatures cached for the parsers, see Preverifier.
+            exchangeTimeout (float): Seconds incomplete exchanges wait to be sent, see ExchangeSender.
+            outboxConnections (int): Connections kept open to each peer endpoint, 0 disables the Outbox.
+            outboxBatch (int): Maximum bytes of messages merged into one request to a peer.
+            witnessConcurrency (int): Events of an agent receipted by their witnesses at once, see Witnesser.
+
+        Attributes:
+            .agents (OrderedDict): resident agents keyed by caid in least to most recently used order.
+            .hits (int): number of agent lookups served by a resident agent.
+            .misses (int): number of agent lookups that loaded an agent from disk.
+            .evictions (int): number of agents released to stay within maxAgents or memoryBudget.
+            .loads (dict): in-flight background agent loads as futures keyed by caid.
+            .activity (dict): last activity time persisted in .adb.acts keyed by caid.
+            .routes (OrderedDict): caid of managed AIDs and agent AIDs in least to most recently used order.
+            .unknown (OrderedDict): expiry of prefixes known not to belong to any agent in insertion order.
+            .draining (bool): True once shutdown started, requests are refused while agents flush their work.
+            .loadTimes (Histogram): seconds taken to load each agent from disk.
+            .ticks (Histogram): seconds taken by each pass of the Doist running the agency.
+            .preverifier (Preverifier | None): verifies signatures of received CESR on worker threads.
+            .outbox (Outbox | None): outbound connections to peers shared by all agents.
         """
         self.name = name
         self.base = base
@@ -270,17 +495,77 @@ class Agency(doing.DoDoer):
         else:
             self.cf = cf
 
-        self.agents = dict()
+        self.agents = OrderedDict()
+        self.maxAgents = maxAgents
+        self.memoryBudget = memoryBudget
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.asyncLoad = asyncLoad
+        self.retryAfter = retryAfter
+        self.lazy = lazy
+        self.shared = shared
+        self.shard = shard
+        self.shards = shards
+        self.activityInterval = activityInterval
+        self.activity = dict()
+        self.routeCache = routeCache
+        self.unknownTtl = unknownTtl
+        self.routes = OrderedDict()
+        self.unknown = OrderedDict()
+        self.drainTimeout = drainTimeout
+        self.closeTimeout = closeTimeout
+        self.closeWorkers = closeWorkers
+        self.escrowDeadline = escrowDeadline
+        self.ingressLimit = ingressLimit
+        self.parseBytes = parseBytes
+        self.parseMsgs = parseMsgs
+        self.exchangeTimeout = exchangeTimeout
+        self.witnessConcurrency = witnessConcurrency
+        self.draining = False
+        self.deadline = None
+        self.reported = 0.0
+        self.loadTimes = metrics.Histogram()
+        self.ticks = metrics.Histogram()
+        self.preverifier = (
+            keriaverifying.Preverifier(
+                workers=preverifyWorkers,
+                cache=keriaverifying.VerifyCache(size=verifyCache),
+            )
+            if preverifyWorkers
+            else None
+        )
+        self.loads = dict()
+        self.loader = (
+            futures.ThreadPoolExecutor(
+                max_workers=loadWorkers, thread_name_prefix="agent-loader"
+            )
+            if asyncLoad
+            else None
+        )
 
         self.adb = (
             adb
             if adb is not None
             else basing.AgencyBaser(name="TheAgency", base=base, reopen=True, temp=temp)
         )
-        super(Agency, self).__init__(
-            doers=[Releaser(self, releaseTimeout=releaseTimeout)]
+        self.outbox = (
+            posting.Outbox(connections=outboxConnections, batch=outboxBatch)
+            if outboxConnections
+            else None
         )
 
+        doers = [Releaser(self, releaseTimeout=releaseTimeout)]
+        if self.outbox is not None:
+            doers.append(self.outbox)
+        if prewarmCount:
+            doers.append(Prewarmer(self, count=prewarmCount, rate=prewarmRate))
+        if quiesceAfter:
+            doers.append(
+                Quiescer(self, quiesceAfter=quiesceAfter, escrowWake=escrowWake)
+            )
+        super(Agency, self).__init__(doers=doers)
+
     def _loadConfigForAgent(self, caid):
         """
         Loads configuration data for an agent by looking up the Agency's configuration and copying
@@ -350,6 +635,11 @@ class Agency(doing.DoDoer):
             caid (str): The controller AID (Agent Identifier) for the new agent.
             salt (str): Optional QB64 salt for the agent's Habery. If not provided, a random salt will be used.
         """
+        if not self.owns(caid):
+            raise kering.ConfigurationError(
+                f"controller {caid} belongs to shard {basing.shardOf(caid, self.shards)}"
+            )
+
         habName = f"agent-{caid}"
         ks = keeping.Keeper(name=caid, base=self.base, temp=self.temp, reopen=True)
         agent_cf = self._writeAgentConfig(caid)
@@ -369,23 +659,32 @@ class Agency(doing.DoDoer):
         )
 
         agent = Agent(
-            hby=agentHby, rgy=agentRgy, agentHab=agentHab, caid=caid, agency=self
+            hby=agentHby,
+            rgy=agentRgy,
+            agentHab=agentHab,
+            caid=caid,
+            agency=self,
+            lazy=self.lazy,
+            shared=self.shared,
         )
 
         self.adb.agnt.pin(keys=(caid,), val=coring.Prefixer(qb64=agent.pre))
 
         self.adb.ctrl.pin(keys=(agent.pre,), val=coring.Prefixer(qb64=caid))
+        self.route(agent.pre, caid)
 
-        # add agent to cache
-        self.agents[caid] = agent
-        # start agents processes running
-        self.extend([agent])
+        self._cache(agent)
+        self.touch(agent)
 
         return agent
 
     def delete(self, agent):
         """Deletes the agent from the agency and cleans up its resources."""
         self.adb.agnt.rem(key=agent.caid)
+        self.adb.acts.rem(keys=(agent.caid,))
+        self.activity.pop(agent.caid, None)
+        for pre in [pre for pre, caid in self.routes.items() if caid == agent.caid]:
+            del self.routes[pre]
         # TODO call the agent's shutdown method to clean up resources instead of manually closing them below
         agent.hby.deleteHab(agent.caid)
         agent.hby.ks.close(clear=True)
@@ -396,48 +695,167 @@ class Agency(doing.DoDoer):
     @deprecated(
         deprecated_in="0.2.0-rc2",
         removed_in="1.0.0",
-        details="Use Agency.shutdownagency and Agent.shutdownAgent instead.",
+        details="Use Agency.release instead.",
     )
     def shut(self, agent):
         """
-        Shuts down an agent and cleans up its resources.
+        Shuts down an agent and cleans up its resources, same as Agency.release.
 
         """
-        logger.info(f"Shutting down agent {agent.caid}")
-        agent.remove(agent.doers)
-        self.remove([agent])
-        del self.agents[agent.caid]
-        try:
-            agent.hby.ks.close(clear=False)
-            agent.seeker.close(clear=False)
-            agent.exnseeker.close(clear=False)
-            agent.monitor.opr.close(clear=False)
-            agent.notifier.noter.close(clear=False)
-            agent.rep.mbx.close(clear=False)
-            agent.registrar.rgy.close()
-            agent.mgr.rb.close(clear=False)
-            agent.hby.close(clear=False)
-        except (
-            lmdb.Error
-        ) as ex:  # Sometimes LMDB will throw an error if the DB is already closed
-            logger.error(f"Error closing databases for agent {agent.caid}: {ex}")
+        self.release(agent)
 
     def get(self, caid):
         """
-        Retrieve an agent from the agency's agent list by controller AID (caid).
+        Retrieve an agent from the agency's agent list by controller AID (caid), loading it from disk
+        if it is not resident. Waits for an in-flight background load of the agent rather than
+        opening its databases a second time.
 
         Returns:
             Agent: The agent associated with the given caid, or None if not found.
         """
         if caid in self.agents:
             agent = self.agents[caid]
-            agent.last = helping.nowUTC()
+            self.touch(agent)
+            self.agents.move_to_end(caid)
+            self.hits += 1
+            return agent
+
+        if caid in self.loads:
+            agent = self._complete(caid)
+            self.touch(agent)
             return agent
 
+        if not self.owns(caid):
+            return None
+
         aaid = self.adb.agnt.get(keys=(caid,))
         if aaid is None:
             return None
 
+        self.misses += 1
+        agent = self._load(caid, aaid)
+        self._cache(agent)
+        self.touch(agent)
+
+        return agent
+
+    def warm(self, caid):
+        """
+        Makes the agent of caid resident ahead of its use without recording activity, loading it in
+        the background when the agency loads asynchronously.
+
+        Parameters:
+            caid (str): The controller AID (Agent Identifier) of the agent.
+        """
+        if self.loading(caid) or caid in self.agents:
+            return
+
+        if not self.owns(caid) or (aaid := self.adb.agnt.get(keys=(caid,))) is None:
+            return
+
+        self._cache(self._load(caid, aaid))
+
+    def touch(self, agent):
+        """
+        Records activity of an agent, waking it if it is quiescent, and persists its last activity
+        time in the agency database at most once per activityInterval so the most active agents can
+        be pre-warmed after a restart.
+
+        Parameters:
+            agent (Agent): the agent in use
+        """
+        agent.last = helping.nowUTC()
+        agent.wake()
+        saved = self.activity.get(agent.caid)
+        if (
+            saved is None
+            or (agent.last - saved).total_seconds() >= self.activityInterval
+        ):
+            self.adb.acts.pin(keys=(agent.caid,), val=helping.toIso8601(agent.last))
+            self.activity[agent.caid] = agent.last
+
+    def flushActivity(self, agent):
+        """Persists activity of agent not yet written by touch, used when an agent leaves memory."""
+        if (
+            saved := self.activity.pop(agent.caid, None)
+        ) is not None and agent.last > saved:
+            self.adb.acts.pin(keys=(agent.caid,), val=helping.toIso8601(agent.last))
+
+    def loading(self, caid):
+        """
+        Check whether the agent for caid is being loaded in the background, starting a background
+        load if the agent is provisioned but not resident. Concurrent requests for the same caid share
+        a single load. Always False unless the agency was created with asyncLoad.
+
+        Parameters:
+            caid (str): The controller AID (Agent Identifier) of the agent.
+
+        Returns:
+            bool: True means the agent is not available yet and the request should be retried.
+        """
+        if self.loader is None or caid in self.agents:
+            return False
+
+        if caid in self.loads:
+            if not self.loads[caid].done():
+                return True
+            self.collect()
+            return False
+
+        if (
+            self.shouldShutdown
+            or not self.owns(caid)
+            or (aaid := self.adb.agnt.get(keys=(caid,))) is None
+        ):
+            return False
+
+        self.misses += 1
+        self.loads[caid] = self.loader.submit(self._load, caid, aaid)
+        return True
+
+    def owns(self, caid):
+        """True means the agent of caid belongs to the shard of this agency, see basing.shardOf."""
+        return self.shard is None or basing.shardOf(caid, self.shards) == self.shard
+
+    def collect(self, wait=False):
+        """
+        Adds agents whose background loads have finished to the resident agents.
+
+        Parameters:
+            wait (bool): True means block until every in-flight load has finished.
+        """
+        for caid, future in list(self.loads.items()):
+            if not wait and not future.done():
+                continue
+            try:
+                self._complete(caid)
+            except Exception as ex:
+                logger.error(f"Error loading agent {caid}: {ex}")
+
+    def _complete(self, caid):
+        """Waits for the background load of caid to finish and adds the agent to the resident agents."""
+        future = self.loads[caid]
+        try:
+            agent = future.result()
+        finally:
+            del self.loads[caid]
+
+        self._cache(agent)
+        return agent
+
+    def _load(self, caid, aaid):
+        """
+        Opens the Keeper, Habery and Regery of a provisioned agent and creates the Agent. Runs on a
+        background thread when loading asynchronously so must not touch the agency's running state.
+
+        Parameters:
+            caid (str): The controller AID (Agent Identifier) of the agent.
+            aaid (Prefixer): The agent AID recorded for caid.
+
+        Returns:
+            Agent: The loaded agent, not yet resident or running.
+        """
+        start = time.perf_counter()
         ks = keeping.Keeper(name=caid, base=self.base, temp=self.temp, reopen=True)
 
         agentHby = habbing.Habery(
@@ -454,28 +872,122 @@ class Agency(doing.DoDoer):
             hby=agentHby, name=agentHab.name, base=self.base, temp=self.temp
         )
         agent = Agent(
-            hby=agentHby, rgy=agentRgy, agentHab=agentHab, agency=self, caid=caid
+            hby=agentHby,
+            rgy=agentRgy,
+            agentHab=agentHab,
+            agency=self,
+            caid=caid,
+            lazy=self.lazy,
+            shared=self.shared,
         )
+        self.loadTimes.observe(time.perf_counter() - start)
+        return agent
+
+    def _cache(self, agent):
+        """
+        Adds an agent as the most recently used resident agent, starts its processes running and
+        releases least recently used agents if the agency is over its resident agent or memory limits.
 
-        self.agents[caid] = agent
+        Parameters:
+            agent (Agent): the newly created or loaded agent
+        """
+        self.agents[agent.caid] = agent
+        self.agents.move_to_end(agent.caid)
         self.extend([agent])
+        self.evict()
 
-        return agent
+    def evict(self):
+        """
+        Releases least recently used agents until the number of resident agents is within maxAgents.
+        While the process is over its memoryBudget one further least recently used agent is released
+        per call since memory is returned to the operating system lazily. The most recently used
+        agent is never evicted.
 
-    def lookup(self, pre):
+        Returns:
+            int: the number of agents released
         """
-        Look up an agent by either a managed AID prefix (pre) or its controller AID in the agency's database.
+        released = 0
+        while self.maxAgents and len(self.agents) > self.maxAgents:
+            self.release(next(iter(self.agents.values())))
+            released += 1
+
+        if self.memoryBudget and len(self.agents) > 1:
+            rss = residentSetSize()
+            if rss is not None and rss > self.memoryBudget:
+                self.release(next(iter(self.agents.values())))
+                released += 1
+
+        self.evictions += released
+        return released
+
+    def release(self, agent):
+        """
+        Shuts down a resident agent, closing its databases and removing it from the agency's running
+        processes. The agent remains provisioned and is reloaded from disk on its next use.
+
+        Parameters:
+            agent (Agent): the resident agent to release
+        """
+        logger.info(f"Releasing agent {agent.caid}")
+        self.agents.pop(agent.caid, None)
+        self.flushActivity(agent)
+        agent.shutdownAgent()
+        if agent in self.doers:
+            self.remove([agent])
+
+    def locate(self, pre):
+        """
+        Find the controller AID (caid) for either a managed AID prefix (pre) or an agent AID.
+        Routes are cached, and prefixes not found are remembered as unknown for unknownTtl seconds
+        so repeated traffic for the same destinations does not read the agency database.
 
         Returns:
-            Agent: The agent associated with the given prefix, or None if not found.
+            str: The caid of the agent for the given prefix, or None if not found.
         """
+        if (caid := self.routes.get(pre)) is not None:
+            self.routes.move_to_end(pre)
+            return caid
+
+        if (expiry := self.unknown.get(pre)) is not None:
+            if expiry > time.monotonic():
+                return None
+            del self.unknown[pre]
+
         # Check to see if this is a managed AID
         if (prefixer := self.adb.aids.get(keys=(pre,))) is not None:
             caid = prefixer.qb64
         # Or if its an agent AID
         elif (prefixer := self.adb.ctrl.get(keys=(pre,))) is not None:
             caid = prefixer.qb64
-        else:
+
+        if caid is not None:
+            self.route(pre, caid)
+        elif self.routeCache:
+            self.unknown[pre] = time.monotonic() + self.unknownTtl
+            if len(self.unknown) > self.routeCache:
+                self.unknown.popitem(last=False)
+
+        return caid
+
+    def route(self, pre, caid):
+        """Caches the route of prefix pre to controller AID caid, evicting the least recently used route"""
+        self.unknown.pop(pre, None)
+        if not self.routeCache:
+            return
+
+        self.routes[pre] = caid
+        self.routes.move_to_end(pre)
+        if len(self.routes) > self.routeCache:
+            self.routes.popitem(last=False)
+
+    def lookup(self, pre):
+        """
+        Look up an agent by either a managed AID prefix (pre) or its controller AID in the agency's database.
+
+        Returns:
+            Agent: The agent associated with the given prefix, or None if not found.
+        """
+        if (caid := self.locate(pre)) is None:
             return None
 
         try:
@@ -486,26 +998,119 @@ class Agency(doing.DoDoer):
     def incept(self, caid, pre):
         """Maps a given agent to its controller AID (caid) in the agency's database."""
         self.adb.aids.pin(keys=(pre,), val=coring.Prefixer(qb64=caid))
+        self.route(pre, caid)
+
+    def busy(self):
+        """
+        Check whether the agency has work in progress: agents loading, draining or an agent that is
+        not quiescent with pending work.
+        """
+        if self.loads or self.draining or self.shouldShutdown:
+            return True
+
+        return any(
+            not agent.quiescent and agent.pending() for agent in self.agents.values()
+        )
 
     def shutdownAgency(self):
-        """Shuts down the agents in an agency in preparation for agency shutdown."""
-        if len(self.agents) > 0:
-            caids = list(self.agents.keys())
-            for caid in caids:
-                agent = self.agents[caid]
-                if not agent.shouldShutdown:
-                    agent.shouldShutdown = True
-                if agent.done:
-                    self.remove([agent])
-                    del self.agents[caid]
+        """
+        Shuts down the agents in an agency in preparation for agency shutdown. The agency first
+        drains: requests are refused with 503 Service Unavailable while agents keep running until
+        their queued work is flushed or drainTimeout expires. The agents are then closed in parallel,
+        see closeAgents. Called once per loop until all agents are closed.
+        """
+        if self.loads:  # agents still loading must finish so their databases get closed
+            self.collect(wait=True)
+
+        now = time.monotonic()
+        if not self.draining:
+            logger.info(
+                f"Draining {len(self.agents)} agents for up to {self.drainTimeout} seconds"
+            )
+            self.draining = True
+            self.deadline = now + self.drainTimeout
+            for agent in self.agents.values():
+                agent.wake()
+
+        busy = [agent for agent in self.agents.values() if agent.pending()]
+        if busy and now < self.deadline:
+            if now - self.reported >= 1.0:
+                logger.info(
+                    f"Draining: {len(busy)} of {len(self.agents)} agents flushing queued work"
+                )
+                self.reported = now
+            return
+
+        if busy:
+            logger.warning(
+                f"Drain timeout reached with {len(busy)} agents still flushing queued work"
+            )
+        self.closeAgents()
+
+    def closeAgents(self):
+        """
+        Stops the doers of every resident agent on the scheduler thread then closes their databases
+        on closeWorkers daemon threads, waiting up to closeTimeout seconds and reporting progress.
+        Databases still closing at the timeout are abandoned so they do not hold up process exit.
+        """
+        agents = list(self.agents.values())
+        logger.info(f"Closing {len(agents)} agents")
+
+        closing = deque()
+        for agent in agents:
+            self.flushActivity(agent)
+            agent.remove(agent.doers)
+            self.remove([agent])
+            del self.agents[agent.caid]
+            closing.append(agent)
+
+        closed = []
+
+        def close():
+            while closing:
+                try:
+                    agent = closing.popleft()
+                except IndexError:
+                    return
+                try:
+                    agent.closeDatabases()
+                except Exception as ex:
+                    logger.error(f"Error closing agent {agent.caid}: {ex}")
+                closed.append(agent)
+
+        closers = [
+            threading.Thread(target=close, name=f"agent-closer-{i}", daemon=True)
+            for i in range(min(max(self.closeWorkers, 1), len(agents)))
+        ]
+        for closer in closers:
+            closer.start()
+
+        deadline = time.monotonic() + self.closeTimeout
+        while (alive := [closer for closer in closers if closer.is_alive()]) and (
+            remaining := deadline - time.monotonic()
+        ) > 0:
+            alive[0].join(timeout=min(remaining, 1.0))
+            logger.info(f"Closed {len(closed)} of {len(agents)} agents")
+
+        if len(closed) < len(agents):
+            logger.error(
+                f"Close timeout reached with {len(agents) - len(closed)} agents still closing"
+            )
+        closing.clear()
 
     def recur(self, tyme=None, tock=0.0):
         """
         Checks once per loop to see if the Agency should shutdown.
         If so, it will shut down each agent and then exit the Agency by returning True for the task (DoDoer) completion status.
         """
+        if self.loads:
+            self.collect(wait=self.shouldShutdown)
         if self.shouldShutdown and len(self.agents) == 0:
             logger.info("Agency shutdown complete. Exiting Agency.")
+            if self.loader is not None:
+                self.loader.shutdown(wait=False)
+            if self.preverifier is not None:
+                self.preverifier.close()
             return True
         if self.shouldShutdown and len(self.agents) > 0:
             self.shutdownAgency()
@@ -517,7 +1122,7 @@ class Agency(doing.DoDoer):
         Called once per agent since self.remove() calls self.exit() when cleaning up each agent.
         Should only trigger the Doist loop to exit once all agents have been removed.
         """
-        super(Agency, self).exit(deeds=deeds if deeds else self.deeds)
+        super(Agency, self).exit(deeds=deeds if deeds is not None else self.deeds)
         if len(self.agents) == 0 and self.shouldShutdown:
             raise KeyboardInterrupt("Agency shutdown complete. Exiting Agency.")
 
@@ -538,7 +1143,9 @@ class Agent(doing.DoDoer):
       hierarchical deterministic key (HDK) management scheme used to select keys at the edge.
     """
 
-    def __init__(self, hby, rgy, agentHab, agency, caid, **opts):
+    def __init__(
+        self, hby, rgy, agentHab, agency, caid, lazy=False, shared=False, **opts
+    ):
         """
         Initialize the Agent with the given Habery, Regery, and agent's Hab.
         Parameters:
@@ -547,6 +1154,11 @@ class Agent(doing.DoDoer):
             agentHab (Hab): The Hab instance representing the agent itself.
             agency (Agency): The Agency instance managing this agent.
             caid (str): The controller AID identifier for this agent.
+            lazy (bool): Open the seekers, mailbox, operations and notifications databases on first
+                use and start the Granter, Admitter, GroupRequester, SeekerDoer and ExchangeCueDoer
+                once their cue Deck first receives work.
+            shared (bool): Open the seekers, operations, remote key and notifications databases as
+                named sub databases of a single AgentStore environment.
             opts (dict): Additional options for the Agent initialization.
 
         Attributes:
@@ -555,6 +1167,7 @@ class Agent(doing.DoDoer):
             .hby (Habery): The Habery instance for the agent's local database.
             .agentHab (Hab): The Hab instance representing the agent itself.
             .rgy (Regery): The Regery instance for the agent's registry access.
+            .store (AgentStore | None): Shared environment of the KERIA owned stores, shared mode only.
             .cfd (MappingProxyType): Configuration data for the agent.
             .tocks (MappingProxyType): Escrow timing configurations for the underlying Hio tasks comprising this agent.
             .last (datetime.datetime): Last activity timestamp for the agent.
@@ -592,7 +1205,9 @@ class Agent(doing.DoDoer):
             .kvy (Kevery): Key Event Log (KEL) event processor for routing and processing KEL messages.
             .tvy (Tevery): TEL event processor for routing and processing TEL messages.
             .parser (Parser): Parses incoming messages and routes them to the appropriate handlers.
+            .escrower (Escrower): Schedules the escrow processing of each escrow family, including delegation escrows.
             .doers (List[Doer]): List of Doers that handle various tasks for the agent.
+            .deferred (list): (Deck, Doer) pairs of doers not started until their Deck has work, lazy mode only.
 
          Subtasks (Doers, DoDoers):
             oobiery (Oobiery): Handles OOBI resolution.
@@ -609,7 +1224,7 @@ class Agent(doing.DoDoer):
             monitor (Monitor): Monitors the agent's state and performs long-running tasks like credential issuance and revocation.
             Initer: prints a log message when the agent is initialized with the agent and controller AIDs.
             Querier: Handles key state queries by sequence number, anchor, or prefix.
-            Escrower: Handles all message escrows including KEL, TEL, Reply, and Exchange messages.
+            Escrower: Handles all message escrows including KEL, TEL, Reply, Exchange and delegation messages.
             Parser: Runs the Parser to parse incoming messages and route them to the appropriate handlers.
             Witnesser: Performs event receipting, catchup, and propagation all current witnesses for KEL events.
             Delegator: Handles delegated event processing.
@@ -642,14 +1257,29 @@ class Agent(doing.DoDoer):
         self.tocks = MappingProxyType(self.cfd.get("tocks", {}))
         self.last = helping.nowUTC()
         self._shouldShutdown = False
+        self.quiescent = False
+        self.slept = None
+        self.baseline = dict()
 
-        self.swain = delegating.Anchorer(hby=hby, proxy=agentHab)
+        self.swain = delegating.Anchorer(hby=hby, proxy=agentHab, escrows=False)
         self.counselor = Counselor(hby=hby, swain=self.swain, proxy=agentHab)
         self.org = connecting.Organizer(hby=hby)
 
         oobiery = oobiing.Oobiery(hby=hby)
 
-        self.mgr = RemoteManager(hby=hby)
+        self.store = (
+            basing.AgentStore(
+                name=hby.name,
+                base=hby.base,
+                temp=hby.temp,
+                reopen=True,
+                headDirPath=hby.db.headDirPath,
+            )
+            if shared
+            else None
+        )
+
+        self.mgr = RemoteManager(hby=hby, store=self.store)
 
         self.cues = decking.Deck()
         self.groups = decking.Deck()
@@ -660,17 +1290,30 @@ class Agent(doing.DoDoer):
         self.grants = decking.Deck()
         self.admits = decking.Deck()
         self.submits = decking.Deck()
+        self.ingress = Ingress(
+            limit=agency.ingressLimit,
+            preverify=(
+                (lambda msg: agency.preverifier.submit(msg, hby.db))
+                if agency.preverifier is not None
+                else None
+            ),
+        )
+
+        # In lazy mode auxiliary databases are opened by their first use
+        deferred = basing.LazyDB if lazy else (lambda opener: opener())
 
         receiptor = agenting.Receiptor(hby=hby)
         self.witq = agenting.WitnessInquisitor(hby=self.hby)
         self.witPub = agenting.WitnessPublisher(hby=self.hby)
-        self.witDoer = agenting.WitnessReceiptor(hby=self.hby)
+        self.witDoer = agenting.WitnessReceiptor(
+            hby=self.hby, cues=delegating.WitnessCues()
+        )
         self.witSubmitDoer = agenting.WitnessReceiptor(hby=self.hby, force=True)
 
         self.rep = storing.Respondant(
             hby=hby,
             cues=self.cues,
-            mbx=Mailboxer(name=self.hby.name, temp=self.hby.temp),
+            mbx=deferred(lambda: Mailboxer(name=hby.name, temp=hby.temp)),
         )
 
         doers = [
@@ -686,7 +1329,13 @@ class Agent(doing.DoDoer):
         ]
 
         signaler = signaling.Signaler()
-        self.notifier = Notifier(hby=hby, signaler=signaler)
+        self.notifier = Notifier(
+            hby=hby,
+            signaler=signaler,
+            noter=deferred(
+                lambda: notifying.Noter(name=hby.name, temp=hby.temp, store=self.store)
+            ),
+        )
         self.mux = grouping.Multiplexor(hby=hby, notifier=self.notifier)
 
         # Initialize all the credential processors
@@ -709,15 +1358,20 @@ class Agent(doing.DoDoer):
             notifier=self.notifier,
         )
 
-        self.seeker = basing.Seeker(
-            name=hby.name,
-            db=hby.db,
-            reger=self.rgy.reger,
-            reopen=True,
-            temp=self.hby.temp,
+        self.seeker = deferred(
+            lambda: basing.Seeker(
+                name=hby.name,
+                db=hby.db,
+                reger=rgy.reger,
+                reopen=True,
+                temp=hby.temp,
+                store=self.store,
+            )
         )
-        self.exnseeker = basing.ExnSeeker(
-            name=hby.name, db=hby.db, reopen=True, temp=self.hby.temp
+        self.exnseeker = deferred(
+            lambda: basing.ExnSeeker(
+                name=hby.name, db=hby.db, reopen=True, temp=hby.temp, store=self.store
+            )
         )
 
         challengeHandler = challenging.ChallengeHandler(db=hby.db, signaler=signaler)
@@ -734,6 +1388,11 @@ class Agent(doing.DoDoer):
             swain=self.swain,
             counselor=self.counselor,
             temp=hby.temp,
+            opr=deferred(
+                lambda: longrunning.Operator(
+                    name=hby.name, temp=hby.temp, store=self.store
+                )
+            ),
             registrar=self.registrar,
             credentialer=self.credentialer,
             submitter=self.submitter,
@@ -761,6 +1420,21 @@ class Agent(doing.DoDoer):
             local=True,
         )  # disable misfit escrow until we can add another parser for remote.
 
+        self.escrower = Escrower(
+            kvy=self.kvy,
+            rgy=self.rgy,
+            rvy=self.rvy,
+            tvy=self.tvy,
+            exc=self.exc,
+            vry=self.verifier,
+            registrar=self.registrar,
+            credentialer=self.credentialer,
+            swain=self.swain,
+            deadline=agency.escrowDeadline,
+            schedule=self.tocks.get("escrows", {}),
+            tock=self.tocks.get("escrower", 0.0),
+        )
+
         doers.extend(
             [
                 Initer(
@@ -773,23 +1447,19 @@ class Agent(doing.DoDoer):
                     queries=self.queries,
                     tock=self.tocks.get("querier", 0.0),
                 ),
-                Escrower(
-                    kvy=self.kvy,
-                    rgy=self.rgy,
-                    rvy=self.rvy,
-                    tvy=self.tvy,
-                    exc=self.exc,
-                    vry=self.verifier,
-                    registrar=self.registrar,
-                    credentialer=self.credentialer,
-                    tock=self.tocks.get("escrower", 0.0),
-                ),
+                self.escrower,
                 ParserDoer(
-                    kvy=self.kvy, parser=self.parser, tock=self.tocks.get("parser", 0.0)
+                    kvy=self.kvy,
+                    parser=self.parser,
+                    ingress=self.ingress,
+                    budget=agency.parseBytes,
+                    batch=agency.parseMsgs,
+                    tock=self.tocks.get("parser", 0.0),
                 ),
                 Witnesser(
                     receiptor=receiptor,
                     witners=self.witners,
+                    concurrency=agency.witnessConcurrency,
                     tock=self.tocks.get("witnesser", 0.0),
                 ),
                 Delegator(
@@ -803,16 +1473,30 @@ class Agent(doing.DoDoer):
                     agentHab=agentHab,
                     exc=self.exc,
                     exchanges=self.exchanges,
+                    timeout=agency.exchangeTimeout,
+                    outbox=agency.outbox,
                     tock=self.tocks.get("exchangeSender", 0.0),
                 ),
+                self.submitter,
+            ]
+        )
+
+        # Doers only needed once a controller uses IPEX, multisig or the search indexes
+        optional = [
+            (
+                self.grants,
                 Granter(
                     hby=hby,
                     rgy=rgy,
                     agentHab=agentHab,
                     exc=self.exc,
                     grants=self.grants,
+                    outbox=agency.outbox,
                     tock=self.tocks.get("granter", 0.0),
                 ),
+            ),
+            (
+                self.admits,
                 Admitter(
                     hby=hby,
                     witq=self.witq,
@@ -822,6 +1506,9 @@ class Agent(doing.DoDoer):
                     admits=self.admits,
                     tock=self.tocks.get("admitter", 0.0),
                 ),
+            ),
+            (
+                self.groups,
                 GroupRequester(
                     hby=hby,
                     agentHab=agentHab,
@@ -829,20 +1516,30 @@ class Agent(doing.DoDoer):
                     groups=self.groups,
                     tock=self.tocks.get("groupRequester", 0.0),
                 ),
+            ),
+            (
+                self.verifier.cues,
                 SeekerDoer(
                     seeker=self.seeker,
                     cues=self.verifier.cues,
                     tock=self.tocks.get("seeker", 0.0),
                 ),
+            ),
+            (
+                self.exc.cues,
                 ExchangeCueDoer(
                     seeker=self.exnseeker,
                     cues=self.exc.cues,
                     queries=self.queries,
                     tock=self.tocks.get("exchangecue", 0.0),
                 ),
-                self.submitter,
-            ]
-        )
+            ),
+        ]
+        if lazy:
+            self.deferred = optional
+        else:
+            self.deferred = []
+            doers.extend([doer for _, doer in optional])
 
         super(Agent, self).__init__(doers=doers, **opts)
 
@@ -882,16 +1579,110 @@ class Agent(doing.DoDoer):
 
         self.agency.incept(self.caid, pre)
 
+    def enter(self, doers=None):
+        deeds = super(Agent, self).enter(doers=doers)
+        if doers is None:
+            # number of running tasks of each child DoDoer when there is no work in progress
+            self.baseline = {
+                doer: len(doer.deeds)
+                for doer in self.doers
+                if isinstance(doer, doing.DoDoer)
+            }
+        return deeds
+
     def recur(self, tyme=None, tock=0.0):
         if self.shouldShutdown:
             self.shutdownAgent()  # will call exit so no need to return
             return True  # never gets here since shutdownAgent triggers exit
+        if self.quiescent:
+            return False
+        if self.deferred:
+            self.startDeferred()
         super(Agent, self).recur(tyme=tyme)
         return False
 
+    def startDeferred(self):
+        """Starts the deferred doers whose cue Deck has received work since the last check."""
+        ready = [doer for deck, doer in self.deferred if deck]
+        if ready:
+            self.deferred = [
+                (deck, doer) for deck, doer in self.deferred if doer not in ready
+            ]
+            self.extend(ready)
+
+    def pending(self):
+        """
+        Check whether the agent has queued or in progress work: non empty cue and message decks,
+        unparsed inbound messages, exchanges waiting to complete or running child tasks.
+
+        Returns:
+            bool: True means the doers of the agent have work to finish
+        """
+        if self.parser.ims or self.ingress:
+            return True
+
+        decks = [
+            self.cues,
+            self.groups,
+            self.anchors,
+            self.witners,
+            self.queries,
+            self.exchanges,
+            self.grants,
+            self.admits,
+            self.submits,
+            self.verifier.cues,
+            self.exc.cues,
+            *(doer.msgs for doer in self.doers if hasattr(doer, "msgs")),
+            *(doer.waiting for doer in self.doers if hasattr(doer, "waiting")),
+        ]
+        if any(decks):
+            return True
+
+        return any(len(doer.deeds) > count for doer, count in self.baseline.items())
+
+    def idle(self, after):
+        """
+        Check whether the agent has been without activity for after seconds and has no work in
+        progress: nothing pending and no escrowed events or queued OOBIs.
+
+        Parameters:
+            after (int): Seconds since the last activity of the agent
+
+        Returns:
+            bool: True means the agent can be taken off the scheduler
+        """
+        if (helping.nowUTC() - self.last).total_seconds() < after:
+            return False
+
+        if self.pending():
+            return False
+
+        return (
+            basing.escrowed(self.hby.db, basing.KEL_ESCROWS) == 0
+            and basing.escrowed(self.rgy.reger, basing.TEL_ESCROWS) == 0
+        )
+
+    def quiesce(self):
+        """Takes the agent off the scheduler, its doers do not run until it is woken."""
+        if not self.quiescent:
+            logger.debug(f"Agent {self.caid} quiescent")
+            self.quiescent = True
+            self.slept = helping.nowUTC()
+
+    def wake(self):
+        """Puts a quiescent agent back on the scheduler, its doers run from the next pass."""
+        if self.quiescent:
+            logger.debug(f"Agent {self.caid} woken")
+            self.quiescent = False
+            self.slept = None
+
     def shutdownAgent(self):
         self.remove(self.doers)  # calls .exit()
-        # Shut down all of the LMDBer subclasses to close open files.
+        self.closeDatabases()
+
+    def closeDatabases(self):
+        """Closes all of the LMDBer subclasses of the agent to close open files, safe to run off the scheduler thread."""
         to_close = [
             self.seeker,
             self.exnseeker,
@@ -900,6 +1691,7 @@ class Agent(doing.DoDoer):
             self.rep.mbx,
             self.registrar.rgy.reger,
             self.mgr.rb,
+            *([self.store] if self.store is not None else []),
             self.hby,
         ]
         for db in to_close:
@@ -917,8 +1709,13 @@ class Agent(doing.DoDoer):
         logger.info(f"Agent {self.caid} shut down")
 
 
-def createBootServerDoer(config: KERIAServerConfig, agency: Agency):
-    """Create the Agent boot HTTP server and the Doer to run it. Returns only the Doer."""
+def createBootServerDoer(
+    config: KERIAServerConfig, agency: Agency, dispatcher: Dispatcher | None = None
+):
+    """
+    Create the Agent boot HTTP server and the Doer to run it. Returns only the Doer.
+    With a dispatcher the server is threaded and the app runs on the Doist of the dispatcher.
+    """
     bootApp = falconApp(config.logRequests)
 
     bootEnd = BootEnd(
@@ -926,6 +1723,21 @@ def createBootServerDoer(config: KERIAServerConfig, agency: Agency):
     )
     bootApp.add_route("/boot", bootEnd)
     bootApp.add_route("/health", HealthEnd())
+    if config.metrics:
+        bootApp.add_route("/metrics", MetricsEnd(agency))
+
+    if dispatcher is not None:
+        return threadedServerDoer(
+            config.bootPort,
+            bootApp,
+            dispatcher,
+            workers=config.serverThreads,
+            handshakeTimeout=config.handshakeTimeout,
+            idleTimeout=config.idleTimeout,
+            keypath=config.keyPath,
+            certpath=config.certPath,
+            cafilepath=config.caFilePath,
+        )
 
     bootServer = createHttpServer(
         config.bootPort, bootApp, config.keyPath, config.certPath, config.caFilePath
@@ -935,13 +1747,18 @@ def createBootServerDoer(config: KERIAServerConfig, agency: Agency):
     return http.ServerDoer(server=bootServer)
 
 
-def createAdminServerDoer(config: KERIAServerConfig, agency: Agency):
+def createAdminServerDoer(
+    config: KERIAServerConfig, agency: Agency, dispatcher: Dispatcher | None = None
+):
     """
     Create the Admin HTTP server and the Doer to run it.
     Returns the Doer and the Falcon app so the HTTP app can use it for OpenAPI docs.
+    With a dispatcher the server is threaded and the app runs on the Doist of the dispatcher.
     """
     # Create Authenticater for verifying signatures on all requests
-    authn = Authenticater(agency=agency)
+    authn = Authenticater(
+        agency=agency, window=config.signatureWindow, size=config.signatureCache
+    )
 
     adminApp = falconApp(config.logRequests)
     if config.cors:
@@ -951,6 +1768,10 @@ def createAdminServerDoer(config: KERIAServerConfig, agency: Agency):
             agency=agency, authn=authn, allowed=["/agent"]
         )
     )
+    if config.gzipThreshold:
+        adminApp.add_middleware(
+            middleware=httping.GzipMiddleware(threshold=config.gzipThreshold)
+        )
     adminApp.req_options.media_handlers.update(media.Handlers())
     adminApp.resp_options.media_handlers.update(media.Handlers())
 
@@ -964,6 +1785,19 @@ def createAdminServerDoer(config: KERIAServerConfig, agency: Agency):
     keriaexchanging.loadEnds(app=adminApp)
     ipexing.loadEnds(app=adminApp)
 
+    if dispatcher is not None:
+        return adminApp, threadedServerDoer(
+            config.adminPort,
+            adminApp,
+            dispatcher,
+            workers=config.serverThreads,
+            handshakeTimeout=config.handshakeTimeout,
+            idleTimeout=config.idleTimeout,
+            keypath=config.keyPath,
+            certpath=config.certPath,
+            cafilepath=config.caFilePath,
+        )
+
     adminServer = createHttpServer(
         config.adminPort, adminApp, config.keyPath, config.certPath, config.caFilePath
     )
@@ -975,9 +1809,15 @@ def createAdminServerDoer(config: KERIAServerConfig, agency: Agency):
 
 
 def createHttpServerDoer(
-    config: KERIAServerConfig, agency: Agency, adminApp: falcon.App
+    config: KERIAServerConfig,
+    agency: Agency,
+    adminApp: falcon.App,
+    dispatcher: Dispatcher | None = None,
 ):
-    """Create the main HTTP server and the Doer to run it. Returns only the Doer."""
+    """
+    Create the main HTTP server and the Doer to run it. Returns only the Doer.
+    With a dispatcher the server is threaded and the app runs on the Doist of the dispatcher.
+    """
     happ = falconApp(config.logRequests)
     happ.req_options.media_handlers.update(media.Handlers())
     happ.resp_options.media_handlers.update(media.Handlers())
@@ -993,6 +1833,20 @@ def createHttpServerDoer(
     )
     specEnd.addRoutes(happ)
     happ.add_route("/spec.yaml", specEnd)
+
+    if dispatcher is not None:
+        return threadedServerDoer(
+            config.httpPort,
+            happ,
+            dispatcher,
+            workers=config.serverThreads,
+            handshakeTimeout=config.handshakeTimeout,
+            idleTimeout=config.idleTimeout,
+            keypath=config.keyPath,
+            certpath=config.certPath,
+            cafilepath=config.caFilePath,
+        )
+
     server = createHttpServer(
         config.httpPort, happ, config.keyPath, config.certPath, config.caFilePath
     )
@@ -1014,6 +1868,35 @@ def createAgency(config: KERIAServerConfig, temp=False, cf=None):
         durls=config.durls,
         temp=temp,
         cf=cf,
+        maxAgents=config.maxAgents,
+        memoryBudget=config.memoryBudget * 1024 * 1024,
+        asyncLoad=config.asyncLoad,
+        loadWorkers=config.loadWorkers,
+        retryAfter=config.retryAfter,
+        lazy=config.lazyAgents,
+        shared=config.sharedStore,
+        shard=config.shard,
+        shards=config.shards,
+        prewarmCount=config.prewarmCount,
+        prewarmRate=config.prewarmRate,
+        activityInterval=config.activityInterval,
+        quiesceAfter=config.quiesceAfter,
+        escrowWake=config.escrowWake,
+        routeCache=config.routeCache,
+        unknownTtl=config.unknownTtl,
+        drainTimeout=config.drainTimeout,
+        closeTimeout=config.closeTimeout,
+        closeWorkers=config.closeWorkers,
+        escrowDeadline=config.escrowDeadline,
+        ingressLimit=config.ingressLimit,
+        parseBytes=config.parseBytes,
+        parseMsgs=config.parseMsgs,
+        preverifyWorkers=config.preverifyWorkers,
+        verifyCache=config.verifyCache,
+        exchangeTimeout=config.exchangeTimeout,
+        outboxConnections=config.outboxConnections,
+        outboxBatch=config.outboxBatch,
+        witnessConcurrency=config.witnessConcurrency,
     )
 
 
@@ -1023,73 +1906,218 @@ def setupDoers(agency: Agency, config: KERIAServerConfig, temp=False, cf=None):
     1. Boot server for bootstrapping agents. Signify calls this with a signed inception event.
     2. Admin server for administrative tasks like creating agents.
     3. HTTP server for all other agent operations.
+    With serverThreads the servers are threaded and a Dispatcher runs their apps on the Doist.
 
     Parameters:
         config (KERIAServerConfig): Configuration for the KERIA server.
         temp (bool): Whether to use a temporary database. Default is False. Useful for testing.
         cf (configing.Configer | None): Optional Configer instance for configuration data. Useful for testing.
     """
-    bootServerDoer = createBootServerDoer(config, agency)
-    adminApp, adminServerDoer = createAdminServerDoer(config, agency)
+    dispatcher = Dispatcher() if config.serverThreads else None
+    bootServerDoer = createBootServerDoer(config, agency, dispatcher)
+    adminApp, adminServerDoer = createAdminServerDoer(config, agency, dispatcher)
 
     doers = [agency, bootServerDoer, adminServerDoer]
 
     if config.httpPort:
-        httpServerDoer = createHttpServerDoer(config, agency, adminApp)
+        httpServerDoer = createHttpServerDoer(config, agency, adminApp, dispatcher)
         doers.append(httpServerDoer)
+    if dispatcher is not None:
+        doers.append(dispatcher)
     return doers
 
 
+class Ingress:
+    """
+    Bounded queue of CESR message streams received for an agent over the indirect mode HTTP port,
+    fed to the parser of the agent by ParserDoer. With preverify each stream is held back until
+    the verification of its signatures started on push completes, or for at most timeout seconds
+    after which it goes to the parser unverified.
+    """
+
+    def __init__(self, limit=0, preverify=None, timeout=5.0):
+        """
+        Parameters:
+            limit (int): maximum bytes queued, 0 means unbounded
+            preverify (Callable | None): starts verifying the signatures of a stream, returns a Future
+            timeout (float): seconds a stream waits on its verification
+        """
+        self.limit = limit
+        self.preverify = preverify
+        self.timeout = timeout
+        self.chunks = deque()
+        self.pending = deque()
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def push(self, msg):
+        """
+        Queues msg unless that exceeds the limit. An empty queue always accepts a message so streams
+        larger than the limit still get through one at a time.
+
+        Returns:
+            bool: True means msg was queued
+        """
+        if self.limit and self.chunks and self.size + len(msg) > self.limit:
+            return False
+
+        msg = bytes(msg)
+        self.chunks.append(msg)
+        self.pending.append(
+            (self.preverify(msg), time.monotonic() + self.timeout)
+            if self.preverify is not None
+            else None
+        )
+        self.size += len(msg)
+        return True
+
+    def feed(self, ims, budget):
+        """
+        Moves queued streams to ims, whole streams at a time in order, until ims holds at least budget
+        bytes or the next stream is still being verified.
+
+        Returns:
+            int: number of bytes moved
+        """
+        moved = 0
+        while self.chunks and len(ims) < budget:
+            if self.pending[0] is not None:
+                future, deadline = self.pending[0]
+                if not future.done():
+                    if time.monotonic() < deadline:
+                        break
+                    future.cancel()
+                    logger.info(
+                        "Signature verification of a %s byte stream timed out, parsing it unverified",
+                        len(self.chunks[0]),
+                    )
+            self.pending.popleft()
+            chunk = self.chunks.popleft()
+            ims.extend(chunk)
+            moved += len(chunk)
+
+        self.size -= moved
+        return moved
+
+
 class ParserDoer(doing.Doer):
     """A Doer that continuously processes messages from the Parser."""
 
-    def __init__(self, kvy, parser, tock=0.0):
+    def __init__(self, kvy, parser, ingress=None, budget=65536, batch=16, tock=0.0):
+        """
+        Parameters:
+            kvy (Kevery): Kevery of the agent, used in log messages
+            parser (Parser): parser of the agent
+            ingress (Ingress): queue of received message streams to parse
+            budget (int): bytes of queued streams moved to the parser on each pass
+            batch (int): maximum number of messages parsed on each pass
+        """
         self.kvy = kvy
         self.parser = parser
+        self.ingress = ingress if ingress is not None else Ingress()
+        self.budget = budget
+        self.batch = max(batch, 1)
         self.tock = tock
         super(ParserDoer, self).__init__(tock=self.tock)
 
     def recur(self, tyme=None, tock=0.0, **opts):
         """
-        Continually processes messages on the incoming message stream (ims).
-        Inner parsator yields continually when the stream is empty, making this good for long-running
-        servers.
+        Continually processes messages on the incoming message stream (ims), moving up to budget bytes
+        of the ingress queue to it and parsing up to batch messages on each pass so one busy agent
+        does not hold up the others. Inner parsator yields continually when the stream is empty,
+        making this good for long-running servers.
         """
-        if self.parser.ims:
-            logger.info(
-                "Agent %s received:\n%s\n...\n", self.kvy, self.parser.ims[:1024]
-            )
-        done = yield from self.parser.parsator()  # process messages continuously
-        return done  # should never get here except forced close
+        parsator = self.parser.parsator()
+        try:
+            while True:
+                if self.ingress.feed(self.parser.ims, self.budget):
+                    logger.info(
+                        "Agent %s received:\n%s\n...\n",
+                        self.kvy,
+                        self.parser.ims[:1024],
+                    )
+
+                for _ in range(self.batch):
+                    size = len(self.parser.ims)
+                    next(parsator)  # yields once per message or when waiting on bytes
+                    if not self.parser.ims or len(self.parser.ims) == size:
+                        break
+
+                yield self.tock
+        finally:
+            parsator.close()
 
 
-class Witnesser(doing.Doer):
+class Witnesser(doing.DoDoer):
     """
     Uses the Receiptor to obtain key event receipts from witnesses or on rotation events to catch up
     witnesses as needed to the current key state.
+
+    Receipts up to concurrency events at once so their witness round trips overlap. Events of an AID
+    wait for the earlier events of the AID, witnesses only receipt events in order.
     """
 
-    def __init__(self, receiptor, witners, tock=0.0):
+    def __init__(self, receiptor, witners, concurrency=8, tock=0.0):
+        """
+        Parameters:
+            receiptor (Receiptor): sends events to their witnesses and collects the receipts
+            witners (decking.Deck): queue of events to receipt
+            concurrency (int): maximum number of events receipted at once
+            tock (float): The time interval for checking the queue.
+        """
         self.receiptor = receiptor
         self.witners = witners
+        self.concurrency = max(concurrency, 1)
         self.tock = tock
-        super(Witnesser, self).__init__(tock=self.tock)
+        self.inflight = dict()
+        super(Witnesser, self).__init__(always=True, tock=self.tock)
 
-    def recur(self, tyme=None, tock=0.0, **opts):
-        while True:
-            if self.witners:
-                msg = self.witners.popleft()
-                serder = msg["serder"]
+    def recur(self, tyme, deeds=None):
+        live = {id(doer) for _, _, doer in self.deeds}
+        self.inflight = {
+            pre: doer for pre, doer in self.inflight.items() if id(doer) in live
+        }
+
+        waiting = []
+        for _ in range(len(self.witners)):
+            if len(self.inflight) >= self.concurrency:
+                break
+
+            msg = self.witners.popleft()
+            serder = msg["serder"]
+            if serder.pre in self.inflight:
+                waiting.append(msg)
+                continue
 
-                # If we are a rotation event, may need to catch new witnesses up to current key state
-                if serder.ked["t"] in (Ilks.rot, Ilks.drt):
-                    adds = serder.ked["ba"]
-                    for wit in adds:
-                        yield from self.receiptor.catchup(serder.pre, wit)
+            doer = Witnessing(receiptor=self.receiptor, serder=serder, tock=self.tock)
+            self.extend([doer])
+            self.inflight[serder.pre] = doer
 
-                yield from self.receiptor.receipt(serder.pre, serder.sn)
+        self.witners.extendleft(reversed(waiting))
+        return super(Witnesser, self).recur(tyme, deeds)
 
-            yield self.tock
+
+class Witnessing(doing.Doer):
+    """Receipts one event, catching up the witnesses a rotation event adds first"""
+
+    def __init__(self, receiptor, serder, tock=0.0):
+        self.receiptor = receiptor
+        self.serder = serder
+        super(Witnessing, self).__init__(tock=tock)
+
+    def recur(self, tyme=None, tock=0.0, **opts):
+        serder = self.serder
+
+        # If we are a rotation event, may need to catch new witnesses up to current key state
+        if serder.ked["t"] in (Ilks.rot, Ilks.drt):
+            adds = serder.ked["ba"]
+            for wit in adds:
+                yield from self.receiptor.catchup(serder.pre, wit)
+
+        yield from self.receiptor.receipt(serder.pre, serder.sn)
+        return True
 
 
 class Delegator(doing.Doer):
@@ -1110,54 +2138,113 @@ class Delegator(doing.Doer):
 
 
 class ExchangeSender(doing.DoDoer):
-    def __init__(self, hby, agentHab, exc, exchanges, tock=0.0):
+    """
+    Sends exchange messages to their recipients once the Exchanger has them complete. Incomplete
+    exchanges, such as multisig exchanges waiting on the signatures of other members, wait by SAID
+    until the Exchanger has that SAID complete or they expire after timeout seconds.
+    """
+
+    def __init__(
+        self, hby, agentHab, exc, exchanges, timeout=86400.0, outbox=None, tock=0.0
+    ):
+        """
+        Parameters:
+            hby (Habery): The Agent Habery.
+            agentHab (Hab): The Agent Hab.
+            exc (Exchanger): The Exchanger instance for this Agent.
+            exchanges (decking.Deck): Queue of exchange messages to send.
+            timeout (float): Seconds an incomplete exchange waits, 0 means forever.
+            outbox (Outbox | None): Agency connections to send through, None opens one for each message.
+            tock (float): The time interval for processing exchanges.
+        """
         self.hby = hby
         self.agentHab = agentHab
         self.exc = exc
         self.exchanges = exchanges
+        self.timeout = timeout
+        self.outbox = outbox
+        self.waiting = OrderedDict()
         self.tock = tock
         super(ExchangeSender, self).__init__(always=True, tock=self.tock)
 
     def recur(self, tyme, deeds=None):
         if self.exchanges:
             msg = self.exchanges.popleft()
-            said = msg["said"]
-            if not self.exc.complete(said=said):
-                self.exchanges.append(msg)
-                return super(ExchangeSender, self).recur(tyme, deeds)
-
-            serder, pathed = exchanging.cloneMessage(self.hby, said)
+            if self.exc.complete(said=msg["said"]):
+                self.send(msg)
+            else:
+                self.park(msg)
 
-            pre = msg["pre"]
-            rec = msg["rec"]
-            topic = msg["topic"]
-            hab = self.hby.habs[pre]
-            logger.debug("[%s | %s]: Current Message Body= %s", hab.name, hab.pre, msg)
-            if self.exc.lead(hab, said=said):
-                atc = exchanging.serializeMessage(self.hby, said)
-                del atc[: serder.size]
-                for recp in rec:
-                    logger.debug(
-                        "[%s | %s]: Sending on topic %s to recipient %s from %s",
-                        hab.name,
-                        hab.pre,
-                        topic,
-                        recp,
-                        pre,
-                    )
-                    postman = forwarding.StreamPoster(
-                        hby=self.hby, hab=self.agentHab, recp=recp, topic=topic
-                    )
-                    try:
-                        postman.send(serder=serder, attachment=atc)
-                    except kering.ValidationError:
-                        logger.info(f"unable to send to recipient={recp}")
-                    else:
-                        doer = doing.DoDoer(doers=postman.deliver())
-                        self.extend([doer])
+        if self.waiting:
+            self.wake()
 
         return super(ExchangeSender, self).recur(tyme, deeds)
 
+    def park(self, msg):
+        """Adds the incomplete exchange msg to the wait-set"""
+        said = msg["said"]
+        if said not in self.waiting:
+            expiry = time.monotonic() + self.timeout if self.timeout else None
+            self.waiting[said] = (expiry, [])
+        self.waiting[said][1].append(msg)
+
+    def wake(self):
+        """Sends the waiting exchanges completed since the last check and drops expired ones"""
+        for said in list(self.waiting):
+            if self.exc.complete(said=said):
+                _, msgs = self.waiting.pop(said)
+                for msg in msgs:
+                    self.send(msg)
+
+        now = time.monotonic()
+        while self.waiting:
+            said, (expiry, msgs) = next(iter(self.waiting.items()))
+            if expiry is None or expiry > now:
+                break
+            del self.waiting[said]
+            logger.warning(
+                "Exchange %s on topic %s expired after %s seconds waiting to complete",
+                said,
+                msgs[0]["topic"],
+                self.timeout,
+            )
+
+    def send(self, msg):
+        said = msg["said"]
+        serder, pathed = exchanging.cloneMessage(self.hby, said)
+
+        pre = msg["pre"]
+        rec = msg["rec"]
+        topic = msg["topic"]
+        hab = self.hby.habs[pre]
+        logger.debug("[%s | %s]: Current Message Body= %s", hab.name, hab.pre, msg)
+        if self.exc.lead(hab, said=said):
+            atc = exchanging.serializeMessage(self.hby, said)
+            del atc[: serder.size]
+            for recp in rec:
+                logger.debug(
+                    "[%s | %s]: Sending on topic %s to recipient %s from %s",
+                    hab.name,
+                    hab.pre,
+                    topic,
+                    recp,
+                    pre,
+                )
+                postman = posting.poster(
+                    hby=self.hby,
+                    recp=recp,
+                    outbox=self.outbox,
+                    hab=self.agentHab,
+                    topic=topic,
+                )
+                try:
+                    postman.send(serder=serder, attachment=atc)
+                except kering.ValidationError:
+                    logger.info(f"unable to send to recipient={recp}")
+                else:
+                    if messengers := postman.deliver():
+                        self.extend([doing.DoDoer(doers=messengers)])
+
 
 class Granter(doing.DoDoer):
     """
@@ -1165,7 +2252,7 @@ class Granter(doing.DoDoer):
     by sending all relevant data including delegated KELs and chained ACDCs.
     """
 
-    def __init__(self, hby, rgy, agentHab, exc, grants, tock=0.0):
+    def __init__(self, hby, rgy, agentHab, exc, grants, outbox=None, tock=0.0):
         """
         Accepts a list of IPEX Grant cues to process.
 
@@ -1175,6 +2262,7 @@ class Granter(doing.DoDoer):
             agentHab (Hab): The Agent Hab.
             exc (Exchanger): The Exchanger instance for this Agent.
             grants (decking.Deck): Queue of grant messages to process.
+            outbox (Outbox | None): Agency connections to send through, None opens one for each message.
             tock (float): The time interval for processing grants.
         """
         self.hby = hby
@@ -1182,6 +2270,7 @@ class Granter(doing.DoDoer):
         self.agentHab = agentHab
         self.exc = exc
         self.grants: decking.Deck = grants
+        self.outbox = outbox
         self.tock = tock
         super(Granter, self).__init__(always=True, tock=self.tock)
 
@@ -1294,8 +2383,12 @@ class GrantDoer(doing.Doer):
         hab = self.hby.habs[pre]
         if self.exc.lead(hab, said=said):
             for recp in rec:
-                postman = forwarding.StreamPoster(
-                    hby=self.hby, hab=self.agentHab, recp=recp, topic="credential"
+                postman = posting.poster(
+                    hby=self.hby,
+                    recp=recp,
+                    outbox=self.parent.outbox,
+                    hab=self.agentHab,
+                    topic="credential",
                 )
                 try:
                     agent_evts = self.gatherAgentKEL(pre, recp, postman)
@@ -1310,8 +2403,8 @@ class GrantDoer(doing.Doer):
                 except KeyError:
                     logger.info(f"invalid grant message={serder.ked}")
                 else:
-                    doer = doing.DoDoer(doers=postman.deliver())
-                    self.parent.extend([doer])
+                    if messengers := postman.deliver():
+                        self.parent.extend([doing.DoDoer(doers=messengers)])
         return True
 
     def recur(self, tock=0.0, **opts):
@@ -1472,48 +2565,153 @@ class GroupRequester(doing.Doer):
 class Querier(doing.DoDoer):
     """
     Performs key state queries depending on sequence number, anchor, or prefix.
+
+    Queries already answered by one in flight are attached to it: the same anchor or prefix, or
+    a sequence number at or below one being queried for the same prefix. Attached queries are
+    answered by its result and run again if it ends without one. Queries in flight for longer than
+    window seconds no longer take attachments, the next duplicate runs the query again.
     """
 
-    def __init__(self, hby, agentHab, queries, kvy, tock=0.0):
+    def __init__(self, hby, agentHab, queries, kvy, window=60.0, tock=0.0):
         self.hby = hby
         self.agentHab = agentHab
         self.queries = queries
         self.kvy = kvy
+        self.window = window
         self.tock = tock
+        # query doer, start time and attached query messages by in flight key
+        self.inflight = dict()
+        self.coalesced = 0
         super(Querier, self).__init__(always=True, tock=self.tock)
 
+    @staticmethod
+    def key(msg):
+        """In flight key of query msg, ("sn", pre, sn), ("anchor", pre, anchor) or ("pre", pre)"""
+        pre = msg["pre"]
+        if "sn" in msg:
+            return "sn", pre, int(msg["sn"], 16)
+        if "anchor" in msg:
+            return "anchor", pre, json.dumps(msg["anchor"], sort_keys=True)
+        return "pre", pre
+
+    def querying(self, key):
+        """Returns the key of the query in flight within window answering the query with key, or None"""
+        if key[0] == "sn":
+            others = [
+                other
+                for other in self.inflight
+                if other[0] == "sn" and other[1] == key[1] and other[2] >= key[2]
+            ]
+        else:
+            others = [key] if key in self.inflight else []
+
+        now = time.monotonic()
+        for other in others:
+            if now - self.inflight[other][1] <= self.window:
+                return other
+        return None
+
+    def settle(self):
+        """Drops queries that completed and runs again the queries attached to ones ended without a result"""
+        for key, (doer, _, attached) in list(self.inflight.items()):
+            if doer.done:
+                del self.inflight[key]
+                self.remove([doer])
+            elif doer not in self.doers:
+                del self.inflight[key]
+                self.queries.extend(attached)
+
     def recur(self, tyme, deeds=None):
         """Processes query reqests submitting any on the cue"""
+        self.settle()
         if self.queries:
             msg = self.queries.popleft()
             if "pre" not in msg:
                 return False
 
             pre = msg["pre"]
+            key = self.key(msg)
+            if (other := self.querying(key)) is not None:
+                self.inflight[other][2].append(msg)
+                self.coalesced += 1
+                return super(Querier, self).recur(tyme, deeds)
 
             if "sn" in msg:
                 sn = int(msg["sn"], 16)
-                seqNoDo = querying.SeqNoQuerier(
+                queryDo = querying.SeqNoQuerier(
                     hby=self.hby, hab=self.agentHab, pre=pre, sn=sn
                 )
-                self.extend([seqNoDo])
             elif "anchor" in msg:
                 anchor = msg["anchor"]
-                anchorDo = querying.AnchorQuerier(
+                queryDo = querying.AnchorQuerier(
                     hby=self.hby, hab=self.agentHab, pre=pre, anchor=anchor
                 )
-                self.extend([anchorDo])
             else:
-                qryDo = querying.QueryDoer(
+                queryDo = querying.QueryDoer(
                     hby=self.hby, hab=self.agentHab, pre=pre, kvy=self.kvy
                 )
-                self.extend([qryDo])
+
+            # a query in flight past its window is replaced, keeping its attached queries
+            attached = []
+            if key in self.inflight:
+                old, _, attached = self.inflight.pop(key)
+                self.remove([old])
+            self.extend([queryDo])
+            self.inflight[key] = (queryDo, time.monotonic(), attached)
 
         return super(Querier, self).recur(tyme, deeds)
 
 
+@dataclass
+class EscrowFamily:
+    """
+    Escrow processor with the escrow sub databases it processes, the other databases and witness
+    cues whose changes can unblock its escrowed events, and its schedule
+    """
+
+    name: str
+    process: Callable
+    db: dbing.LMDBer
+    escrows: tuple
+    watch: tuple = ()  # other LMDBers and WitnessCues whose changes can unblock the escrows
+    interval: float = 0.0  # minimum seconds between passes while the sources change
+    backoff: float = 10.0  # maximum seconds between passes while nothing changes
+    delay: float = 0.0  # current seconds to the next pass while nothing changes
+    versions: tuple | None = (
+        None  # versions of db and watch when the escrows were checked
+    )
+    checked: float = 0.0  # monotonic time the escrows were last checked
+    passes: int = 0  # number of passes over non empty escrows
+    seconds: float = 0.0  # total time spent in passes
+
+
 class Escrower(doing.Doer):
-    def __init__(self, kvy, rgy, rvy, tvy, exc, vry, registrar, credentialer, tock=0.0):
+    """
+    Schedules the escrow processing of an Agent. Each escrow family is checked at its own interval
+    while its database or one of the sources it watches changes, and with an exponentially growing
+    delay capped at its backoff while nothing changes so escrowed events still time out. New
+    escrowed events, receipts, signatures or KEL and TEL events are all writes to a database, TEL
+    escrows also wait on KEL anchors and witness receipts, so they watch the agent's KEL database
+    and witness cues. Families with empty escrows are never processed.
+    """
+
+    MinDelay = 0.5  # first delay of a family after the last change to its database
+
+    def __init__(
+        self,
+        kvy,
+        rgy,
+        rvy,
+        tvy,
+        exc,
+        vry,
+        registrar,
+        credentialer,
+        swain=None,
+        deadline=10.0,
+        schedule=None,
+        tock=0.0,
+    ):
         """Recuring process or escrows for all components in an Agent
 
         Parameters:
@@ -1525,6 +2723,9 @@ class Escrower(doing.Doer):
             vry (Verifier):
             registrar (Registrar): Credential TEL escrow processor
             credentialer (Credentialer): Credential escrow processor
+            swain (Anchorer): Delegation escrow processor, None when it processes its own escrows
+            deadline (float): Default backoff, maximum seconds between passes over an unchanged escrow
+            schedule (Mapping): interval and backoff in seconds keyed by escrow family name
         """
         self.kvy = kvy
         self.rgy = rgy
@@ -1534,24 +2735,143 @@ class Escrower(doing.Doer):
         self.vry = vry
         self.registrar = registrar
         self.credentialer = credentialer
+        self.swain = swain
+        self.deadline = deadline
         self.tock = tock
 
+        tel = ("oots", "taes", "twes", "txnsb.escrowdb")
+        reger = registrar.rgy.reger
+        kel = (kvy.db,)  # TEL and credential escrows wait on KEL anchors
+        witnessed = kel
+        if isinstance(registrar.witDoer.cues, delegating.WitnessCues):
+            witnessed = kel + (registrar.witDoer.cues,)
+        self.families = [
+            EscrowFamily(
+                "kel",
+                kvy.processEscrows,
+                kvy.db,
+                ("ooes", "uwes", "ures", "vres", "pdes", "udes", "pwes", "pses")
+                + ("ldes", "qnfs"),
+            ),
+            EscrowFamily(
+                "delegables", kvy.processEscrowDelegables, kvy.db, ("delegables",)
+            ),
+            EscrowFamily("registry", rgy.processEscrows, rgy.reger, tel, watch=kel),
+            EscrowFamily("reply", rvy.processEscrowReply, rvy.db, ("rpes",)),
+            EscrowFamily("exchange", exc.processEscrow, exc.hby.db, ("epse",)),
+            EscrowFamily(
+                "verifier",
+                vry.processEscrows,
+                vry.reger,
+                ("mre", "mce", "mse"),
+                watch=kel,
+            ),
+            EscrowFamily(
+                "registrarWitness",
+                registrar.processWitnessEscrow,
+                reger,
+                ("tpwe",),
+                watch=witnessed,
+            ),
+            EscrowFamily(
+                "registrarMultisig",
+                registrar.processMultisigEscrow,
+                reger,
+                ("tmse",),
+                watch=kel,
+            ),
+            EscrowFamily(
+                "registrarDissemination",
+                registrar.processDiseminationEscrow,
+                reger,
+                ("tede",),
+                watch=kel,
+            ),
+            EscrowFamily(
+                "credentialer",
+                credentialer.processEscrows,
+                credentialer.rgy.reger,
+                ("cmse",),
+                watch=kel,
+            ),
+        ]
+        if tvy is not None:
+            self.families.insert(
+                3, EscrowFamily("tel", tvy.processEscrows, tvy.reger, tel, watch=kel)
+            )
+        if swain is not None:
+            self.families.extend(
+                [
+                    EscrowFamily(
+                        "delegationWitness",
+                        swain.processPartialWitnessEscrow,
+                        swain.hby.db,
+                        ("dpwe",),
+                        interval=0.5,
+                    ),
+                    EscrowFamily(
+                        "delegationUnanchored",
+                        swain.processUnanchoredEscrow,
+                        swain.hby.db,
+                        ("dune",),
+                        interval=0.5,
+                    ),
+                ]
+            )
+
+        schedule = schedule if schedule is not None else dict()
+        for family in self.families:
+            conf = schedule.get(family.name, {})
+            family.interval = conf.get("interval", family.interval)
+            family.backoff = conf.get("backoff", deadline)
+
         super(Escrower, self).__init__(tock=self.tock)
 
     def recur(self, tyme, tock=0.0, **opts):
-        """Process all escrows once per loop."""
-        self.kvy.processEscrows()
-        self.kvy.processEscrowDelegables()
-        self.rgy.processEscrows()
-        self.rvy.processEscrowReply()
-        if self.tvy is not None:
-            self.tvy.processEscrows()
-        self.exc.processEscrow()
-        self.vry.processEscrows()
-        self.registrar.processEscrows()
-        self.credentialer.processEscrows()
+        """Process the escrows that are due once per loop."""
+        now = time.monotonic()
+        cache = dict()
+        for family in self.families:
+            versions = tuple(
+                self.version(source, cache) for source in (family.db, *family.watch)
+            )
+
+            changed = versions != family.versions
+            if now - family.checked < (family.interval if changed else family.delay):
+                continue
+
+            if changed:
+                family.delay = max(family.interval, self.MinDelay)
+            else:
+                family.delay = min(family.delay * 2, family.backoff)
+
+            # an escrow pass that writes is checked again as a change
+            family.versions = versions
+            family.checked = now
+            if basing.escrowed(family.db, family.escrows):
+                start = time.perf_counter()
+                family.process()
+                family.passes += 1
+                family.seconds += time.perf_counter() - start
+
         return False
 
+    @staticmethod
+    def version(source, cache):
+        """Changes with source, the last transaction id of an LMDBer or the pushes of WitnessCues"""
+        if isinstance(source, delegating.WitnessCues):
+            return source.pushes
+        if source not in cache:
+            cache[source] = source.env.info()["last_txnid"]
+        return cache[source]
+
+    def stats(self):
+        """Returns the passes over and seconds spent in each escrow family keyed by family name"""
+        return {
+            family.name: dict(passes=family.passes, seconds=family.seconds)
+            for family in self.families
+        }
+
 
 class Releaser(doing.Doer):
     def __init__(self, agency: Agency, releaseTimeout=86400):
@@ -1579,9 +2899,90 @@ class Releaser(doing.Doer):
                     idle.append(caid)
 
             for caid in idle:
-                self.agency.shut(self.agents[caid])
+                self.agency.release(self.agents[caid])
+            yield self.tock
+
+
+class Quiescer(doing.Doer):
+    """
+    Takes resident agents that have been idle for quiesceAfter seconds off the scheduler and wakes
+    quiescent agents every escrowWake seconds for a pass over their escrows and queues. Agents are
+    also woken by their next request or inbound message through Agency.touch.
+    """
+
+    def __init__(self, agency: Agency, quiesceAfter=0, escrowWake=300):
+        """
+        Parameters:
+            agency (Agency): KERIA agent manager
+            quiesceAfter (int): Seconds without activity before an idle agent stops running
+            escrowWake (int): Seconds between the escrow passes a quiescent agent is woken for
+
+        """
+        self.tock = 1.0
+        self.agency = agency
+        self.quiesceAfter = quiesceAfter
+        self.escrowWake = escrowWake
+
+        super(Quiescer, self).__init__(tock=self.tock)
+
+    def recur(self, tyme=None, tock=0.0, **opts):
+        while True:
+            now = helping.nowUTC()
+            for agent in list(self.agency.agents.values()):
+                if agent.quiescent:
+                    if (now - agent.slept).total_seconds() >= self.escrowWake:
+                        agent.wake()  # quiesces again on the next check if still idle
+                elif agent.idle(self.quiesceAfter):
+                    agent.quiesce()
+            yield self.tock
+
+
+class Prewarmer(doing.Doer):
+    """
+    Loads the most recently active agents recorded in the agency database at a limited rate after
+    startup so controllers that were busy before a restart find their agents resident.
+    """
+
+    def __init__(self, agency: Agency, count=0, rate=1.0):
+        """
+        Parameters:
+            agency (Agency): KERIA agent manager
+            count (int): Number of most recently active agents to load, capped at the agency maxAgents
+            rate (float): Agents loaded per second
+        """
+        self.agency = agency
+        self.count = count
+        self.rate = rate
+        self.tock = 1.0 / rate if rate > 0 else 0.0
+
+        super(Prewarmer, self).__init__(tock=self.tock)
+
+    def candidates(self):
+        """Returns the caids to pre-warm, most recently active first"""
+        acts = sorted(
+            ((last, caid) for (caid,), last in self.agency.adb.acts.getItemIter()),
+            reverse=True,
+        )
+        count = self.count
+        if self.agency.maxAgents:
+            count = min(count, self.agency.maxAgents)
+        return [caid for _, caid in acts[:count] if self.agency.owns(caid)]
+
+    def recur(self, tyme=None, tock=0.0, **opts):
+        caids = self.candidates()
+        logger.info(f"Pre-warming {len(caids)} agents")
+        for caid in caids:
+            if self.agency.shouldShutdown:
+                break
+
+            try:
+                self.agency.warm(caid)
+            except Exception as ex:
+                logger.error(f"Error pre-warming agent {caid}: {ex}")
             yield self.tock
 
+        return True
+
 
 def loadEnds(app):
     opColEnd = longrunning.OperationCollectionEnd()
@@ -1681,6 +3082,7 @@ class BootEnd:
         """
 
         self.authenticate(req)
+        httping.checkLoading(self.agency, None)
 
         body = req.get_media()
         if "icp" not in body:
@@ -1790,6 +3192,18 @@ class HealthEnd:
         resp.media = {"message": f"Health is okay. Time is {nowIso8601()}"}
 
 
+class MetricsEnd:
+    """Metrics resource exporting agency and resident agent internals for Prometheus"""
+
+    def __init__(self, agency):
+        self.agency = agency
+
+    def on_get(self, req, rep):
+        rep.status = falcon.HTTP_OK
+        rep.content_type = "text/plain; version=0.0.4; charset=utf-8"
+        rep.text = metrics.agencyMetrics(self.agency)
+
+
 class KeyStateCollectionEnd:
     @staticmethod
     def on_get(req, rep):
@@ -0,0 +1,96 @@
+# -*- encoding: utf-8 -*-
+"""
+KERIA
+keria.app.cli.commands module
+
+"""
+
+import argparse
+
+from keri.core import eventing  # noqa: F401 loads keri.db.basing without an import cycle
+from keri.db import basing as kbasing
+from keri.db import dbing
+
+from keria import log_name, ogler
+from keria.app.notifying import Noter
+from keria.core.keeping import RemoteKeeper
+from keria.core.longrunning import Operator
+from keria.db import basing
+
+logger = ogler.getLogger(log_name)
+
+parser = argparse.ArgumentParser(
+    description="Copies the Seeker, ExnSeeker, Operator, RemoteKeeper and notification databases of every "
+    "agent into a single AgentStore environment per agent for use with KERIA_SHARED_STORE. "
+    "The separate databases are left in place."
+)
+parser.set_defaults(handler=lambda args: handler(args))
+parser.add_argument(
+    "--base",
+    "-b",
+    help="additional optional prefix to file location of KERI keystore",
+    required=False,
+    default="",
+)
+
+
+def handler(args):
+    adb = basing.AgencyBaser(name="TheAgency", base=args.base, reopen=True, temp=False)
+
+    caids = [caid for (caid,), _ in adb.agnt.getItemIter()]
+    adb.close()
+
+    for caid in caids:
+        # the Agent opens its AgentStore and RemoteKeeper in the head directory of its KEL database
+        db = kbasing.Baser(name=caid, base=args.base, temp=False, reopen=True)
+        headDirPath = db.headDirPath
+        db.close()
+
+        copied = migrate(caid, base=args.base, headDirPath=headDirPath)
+        for namespace, count in copied.items():
+            logger.info("Agent %s %s: %s entries copied", caid, namespace, count)
+
+
+def migrate(caid, base="", temp=False, headDirPath=None):
+    """Copy the separate KERIA owned databases of one agent into its AgentStore
+
+    The agent must not be running.  Stores are located with the same name, base, temp and head
+    directory the Agent opens them with: only RemoteKeeper and the AgentStore use base and the
+    head directory of the agent's KEL database.
+
+    Parameters:
+        caid (str): controller AID naming the agent's databases
+        base (str): optional prefix to file location of KERI keystore
+        temp (bool): True means the agent's databases are temporary
+        headDirPath (str | None): head directory of the agent's KEL database, None for the default
+
+    Returns:
+        dict: number of entries copied keyed by store Namespace
+    """
+    sources = [
+        basing.Seeker(db=None, reger=None, name=caid, temp=temp),
+        basing.ExnSeeker(db=None, name=caid, temp=temp),
+        Operator(name=caid, temp=temp, reopen=False),
+        Noter(name=caid, temp=temp, reopen=False),
+        RemoteKeeper(name=caid, base=base, temp=temp, headDirPath=headDirPath),
+    ]
+
+    store = basing.AgentStore(
+        name=caid, base=base, temp=temp, reopen=True, headDirPath=headDirPath
+    )
+    copied = dict()
+    try:
+        for src in sources:
+            if not src.exists(name=src.name, base=src.base):
+                continue
+
+            # open only the environment, the sub databases are copied as they are
+            dbing.LMDBer.reopen(src)
+            try:
+                copied[src.Namespace] = basing.migrateStore(src, store, src.Namespace)
+            finally:
+                src.close()
+    finally:
+        store.close()
+
+    return copied
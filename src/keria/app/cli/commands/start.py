@@ -13,7 +13,7 @@ import os
 from keri import __version__
 from keri import help
 
-from keria.app import agenting
+from keria.app import agenting, sharding
 
 d = "Runs KERI Signify Agent\n"
 d += "\tExample:\nkli ahab\n"
@@ -137,31 +137,72 @@ logger = help.ogler.getLogger()
 
 
 def launch(args):
-    agenting.runAgency(
-        agenting.KERIAServerConfig(
-            name=args.name or "ahab",
-            base=args.base or "",
-            bran=args.bran,
-            adminPort=args.admin,
-            httpPort=args.http,
-            bootPort=args.boot,
-            configFile=args.configFile,
-            configDir=args.configDir,
-            keyPath=args.keypath,
-            certPath=args.certpath,
-            caFilePath=args.cafilepath,
-            logLevel=args.loglevel,
-            logFile=args.logfile,
-            logRequests=args.logrequests if args.logrequests else False,
-            cors=os.getenv("KERI_AGENT_CORS", "false").lower() in ("true", "1"),
-            releaseTimeout=int(os.getenv("KERIA_RELEASER_TIMEOUT", "86400")),
-            curls=getListVariable("KERIA_CURLS"),
-            iurls=getListVariable("KERIA_IURLS"),
-            durls=getListVariable("KERIA_DURLS"),
-            bootPassword=args.bootPassword,
-            bootUsername=args.bootUsername,
-        )
+    config = agenting.KERIAServerConfig(
+        name=args.name or "ahab",
+        base=args.base or "",
+        bran=args.bran,
+        adminPort=args.admin,
+        httpPort=args.http,
+        bootPort=args.boot,
+        configFile=args.configFile,
+        configDir=args.configDir,
+        keyPath=args.keypath,
+        certPath=args.certpath,
+        caFilePath=args.cafilepath,
+        logLevel=args.loglevel,
+        logFile=args.logfile,
+        logRequests=args.logrequests if args.logrequests else False,
+        cors=os.getenv("KERI_AGENT_CORS", "false").lower() in ("true", "1"),
+        releaseTimeout=int(os.getenv("KERIA_RELEASER_TIMEOUT", "86400")),
+        maxAgents=int(os.getenv("KERIA_MAX_AGENTS", "0")),
+        memoryBudget=int(os.getenv("KERIA_MEMORY_BUDGET", "0")),
+        asyncLoad=os.getenv("KERIA_ASYNC_LOAD", "false").lower() in ("true", "1"),
+        loadWorkers=int(os.getenv("KERIA_LOAD_WORKERS", "4")),
+        retryAfter=int(os.getenv("KERIA_RETRY_AFTER", "1")),
+        lazyAgents=os.getenv("KERIA_LAZY_AGENTS", "false").lower() in ("true", "1"),
+        sharedStore=os.getenv("KERIA_SHARED_STORE", "false").lower() in ("true", "1"),
+        shards=int(os.getenv("KERIA_SHARDS", "0")),
+        shardPortStep=int(os.getenv("KERIA_SHARD_PORT_STEP", "10")),
+        routerTimeout=float(os.getenv("KERIA_ROUTER_TIMEOUT", "60.0")),
+        routerBodyLimit=int(os.getenv("KERIA_ROUTER_BODY_LIMIT", "16777216")),
+        prewarmCount=int(os.getenv("KERIA_PREWARM_COUNT", "0")),
+        prewarmRate=float(os.getenv("KERIA_PREWARM_RATE", "1.0")),
+        activityInterval=int(os.getenv("KERIA_ACTIVITY_INTERVAL", "60")),
+        quiesceAfter=int(os.getenv("KERIA_QUIESCE_AFTER", "0")),
+        escrowWake=int(os.getenv("KERIA_ESCROW_WAKE", "300")),
+        routeCache=int(os.getenv("KERIA_ROUTE_CACHE", "65536")),
+        unknownTtl=float(os.getenv("KERIA_UNKNOWN_TTL", "5.0")),
+        drainTimeout=float(os.getenv("KERIA_DRAIN_TIMEOUT", "10.0")),
+        closeTimeout=float(os.getenv("KERIA_CLOSE_TIMEOUT", "30.0")),
+        closeWorkers=int(os.getenv("KERIA_CLOSE_WORKERS", "8")),
+        metrics=os.getenv("KERIA_METRICS", "false").lower() in ("true", "1"),
+        escrowDeadline=float(os.getenv("KERIA_ESCROW_DEADLINE", "10.0")),
+        idleTock=float(os.getenv("KERIA_IDLE_TOCK", "0.0")),
+        ingressLimit=int(os.getenv("KERIA_INGRESS_LIMIT", str(16 * 1024 * 1024))),
+        parseBytes=int(os.getenv("KERIA_PARSE_BYTES", "65536")),
+        parseMsgs=int(os.getenv("KERIA_PARSE_MSGS", "16")),
+        preverifyWorkers=int(os.getenv("KERIA_PREVERIFY_WORKERS", "0")),
+        verifyCache=int(os.getenv("KERIA_VERIFY_CACHE", "65536")),
+        exchangeTimeout=float(os.getenv("KERIA_EXCHANGE_TIMEOUT", "86400.0")),
+        outboxConnections=int(os.getenv("KERIA_OUTBOX_CONNECTIONS", "0")),
+        outboxBatch=int(os.getenv("KERIA_OUTBOX_BATCH", "262144")),
+        witnessConcurrency=int(os.getenv("KERIA_WITNESS_CONCURRENCY", "8")),
+        signatureWindow=float(os.getenv("KERIA_SIGNATURE_WINDOW", "0.0")),
+        signatureCache=int(os.getenv("KERIA_SIGNATURE_CACHE", "65536")),
+        serverThreads=int(os.getenv("KERIA_SERVER_THREADS", "0")),
+        handshakeTimeout=float(os.getenv("KERIA_HANDSHAKE_TIMEOUT", "10.0")),
+        idleTimeout=float(os.getenv("KERIA_IDLE_TIMEOUT", "30.0")),
+        gzipThreshold=int(os.getenv("KERIA_GZIP_THRESHOLD", "0")),
+        curls=getListVariable("KERIA_CURLS"),
+        iurls=getListVariable("KERIA_IURLS"),
+        durls=getListVariable("KERIA_DURLS"),
+        bootPassword=args.bootPassword,
+        bootUsername=args.bootUsername,
     )
+    if config.shards > 1:
+        sharding.runShards(config)
+    else:
+        agenting.runAgency(config)
     logger.info("Agent %s gracefully stopped", args.name)
 
 
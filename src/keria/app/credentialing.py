@@ -1557,6 +1557,7 @@ class Registrar:
         that the event is complete.
 
         """
+        witnessed = set()
         for (regk, snq), (
             prefixer,
             seqner,
@@ -1572,13 +1573,9 @@ class Registrar:
                     kever.wits
                 ):  # We have all of them, this event is finished
                     hab = self.hby.habs[prefixer.qb64]
-                    witnessed = False
-                    for cue in self.witDoer.cues:
-                        if cue["pre"] == hab.pre and cue["sn"] == seqner.sn:
-                            witnessed = True
-
-                    if not witnessed:
+                    if not self.witDoer.cues.witnessed(hab.pre, seqner.sn):
                         continue
+                    witnessed.add((hab.pre, seqner.sn))
                 else:
                     continue
 
@@ -1589,6 +1586,10 @@ class Registrar:
                 keys=(regk, rseq.qb64), val=(prefixer, seqner, saider)
             )
 
+        # registry events anchored in a witnessed event are all escrowed before its receipts arrive
+        for pre, sn in witnessed:
+            self.witDoer.cues.discard(pre, sn)
+
     def processMultisigEscrow(self):
         """
         Process escrow of group multisig events that do not have a full compliment of receipts
@@ -1,6 +1,9 @@
+from collections import Counter
+
 import falcon
 
 from hio.base import doing
+from hio.help import decking
 from keri import kering, help
 from keri.app import forwarding, agenting, habbing
 from keri.core import coring, serdering
@@ -17,6 +20,76 @@ def loadEnds(app, identifierResource):
     app.add_route(DELEGATION_ROUTE, gatorEnd)
 
 
+class WitnessCues(decking.Deck):
+    """
+    Deck of witness receipting completion cues indexed by (pre, sn) so escrows waiting on witness
+    receipts check for completion in constant time instead of scanning the cues.
+
+    Escrows discard the cues of an event once they are done with it. Completions nobody waits on
+    are bounded by maxlen, dropping the oldest first. Each new cue increments pushes so the escrow
+    scheduler sees completions as changes.
+    """
+
+    def __init__(self, iterable=(), maxlen=4096):
+        """
+        Parameters:
+            iterable (Iterable): initial cues, dicts with pre and sn
+            maxlen (int): maximum number of cues kept
+        """
+        super(WitnessCues, self).__init__((), maxlen)
+        self.index = Counter()
+        self.pushes = 0
+        self.extend(iterable)
+
+    @staticmethod
+    def key(cue):
+        return cue["pre"], cue["sn"]
+
+    def append(self, cue):
+        if self.maxlen is not None and len(self) == self.maxlen:
+            self.popleft()
+        super(WitnessCues, self).append(cue)
+        self.index[self.key(cue)] += 1
+        self.pushes += 1
+
+    def extend(self, cues):
+        for cue in cues:
+            self.append(cue)
+
+    def popleft(self):
+        cue = super(WitnessCues, self).popleft()
+        self.forget(cue)
+        return cue
+
+    def pop(self):
+        cue = super(WitnessCues, self).pop()
+        self.forget(cue)
+        return cue
+
+    def clear(self):
+        super(WitnessCues, self).clear()
+        self.index.clear()
+
+    def forget(self, cue):
+        key = self.key(cue)
+        self.index[key] -= 1
+        if self.index[key] <= 0:
+            del self.index[key]
+
+    def witnessed(self, pre, sn):
+        """True means the witnesses of pre receipted the event at sn"""
+        return (pre, sn) in self.index
+
+    def discard(self, pre, sn):
+        """Removes the cues of the event of pre at sn"""
+        if self.index.pop((pre, sn), None) is None:
+            return
+
+        kept = [cue for cue in self if self.key(cue) != (pre, sn)]
+        super(WitnessCues, self).clear()
+        super(WitnessCues, self).extend(kept)
+
+
 class Anchorer(doing.DoDoer):
     """
     Sends messages to Delegator of an identifier and wait for the anchoring event to
@@ -26,7 +99,7 @@ class Anchorer(doing.DoDoer):
 
     """
 
-    def __init__(self, hby, proxy=None, **kwa):
+    def __init__(self, hby, proxy=None, escrows=True, **kwa):
         """
         For the current event, gather the current set of witnesses, send the event,
         gather all receipts and send them to all other witnesses
@@ -34,17 +107,19 @@ class Anchorer(doing.DoDoer):
         Parameters:
             hby (Habery): Habery of the agent to populate witnesses
             proxy (Hab): Agent Hab to use as a messaging proxy to send messages to the delegator on behalf of SignifyHab instances as SignifyHabs cannot sign messages in a KERIA Agent.
+            escrows (bool): Process the delegation escrows in a task of the Anchorer, False when an
+                Escrower schedules processPartialWitnessEscrow and processUnanchoredEscrow instead.
         """
         self.hby = hby
         self.postman = forwarding.Poster(hby=hby)
         self.witq = agenting.WitnessInquisitor(hby=hby)
-        self.witDoer = agenting.Receiptor(hby=self.hby)
+        self.witDoer = agenting.Receiptor(hby=self.hby, cues=WitnessCues())
         self.proxy = proxy
 
-        super(Anchorer, self).__init__(
-            doers=[self.witq, self.witDoer, self.postman, doing.doify(self.escrowDo)],
-            **kwa,
-        )
+        doers = [self.witq, self.witDoer, self.postman]
+        if escrows:
+            doers.append(doing.doify(self.escrowDo))
+        super(Anchorer, self).__init__(doers=doers, **kwa)
 
     def delegation(self, pre, sn=None, proxy=None):
         if pre not in self.hby.habs:
@@ -179,12 +254,9 @@ class Anchorer(doing.DoDoer):
                 kever.wits
             ):  # We have all of them, this event is finished
                 if len(kever.wits) > 0:
-                    witnessed = False
-                    for cue in self.witDoer.cues:
-                        if cue["pre"] == serder.pre and cue["sn"] == seqner.sn:
-                            witnessed = True
-                    if not witnessed:
+                    if not self.witDoer.cues.witnessed(serder.pre, seqner.sn):
                         continue
+                    self.witDoer.cues.discard(serder.pre, seqner.sn)
                 logger.info(
                     "[%s]: Witness receipts complete, waiting for delegation approval for %s",
                     pre,
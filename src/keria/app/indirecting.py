@@ -7,10 +7,17 @@ simple indirect mode demo support classes
 """
 
 import falcon
+from keri import help, kering
 from keri.app import httping
+from keri.core import parsing
 from keri.core.coring import Ilks, Sadder
 from keri.kering import Protocols, Kinds
 
+from keria.core import verifying
+from keria.core.httping import checkLoading
+
+logger = help.ogler.getLogger()
+
 CESR_DESTINATION_HEADER = "CESR-DESTINATION"
 
 
@@ -70,19 +77,19 @@ class HttpEnd:
             raise falcon.HTTPBadRequest(title="CESR request destination header missing")
 
         aid = req.headers[CESR_DESTINATION_HEADER]
+        checkLoading(self.agency, self.agency.locate(aid))
         agent = self.agency.lookup(aid)
         if agent is None:
             raise falcon.HTTPNotFound(title=f"unknown destination AID {aid}")
 
         rep.set_header("Cache-Control", "no-cache")
-        rep.set_header("connection", "close")
 
         cr = httping.parseCesrHttpRequest(req=req)
         serder = Sadder(ked=cr.payload, kind=Kinds.json)
         msg = bytearray(serder.raw)
         msg.extend(cr.attachments.encode("utf-8"))
 
-        agent.parser.ims.extend(msg)
+        self.enqueue(agent, aid, msg)
 
         if serder.proto == Protocols.acdc:
             rep.status = falcon.HTTP_204
@@ -141,19 +148,192 @@ class HttpEnd:
             raise falcon.HTTPBadRequest(title="CESR request destination header missing")
 
         aid = req.headers[CESR_DESTINATION_HEADER]
+        checkLoading(self.agency, self.agency.locate(aid))
         agent = self.agency.lookup(aid)
         if agent is None:
             raise falcon.HTTPNotFound(title=f"unknown destination AID {aid}")
 
         rep.set_header("Cache-Control", "no-cache")
-        rep.set_header("connection", "close")
 
-        agent.parser.ims.extend(req.bounded_stream.read())
+        self.enqueue(agent, aid, req.bounded_stream.read())
 
         rep.status = falcon.HTTP_204
 
+    def enqueue(self, agent, aid, msg):
+        """Queue msg for the parser of agent, raising 429 Too Many Requests when its ingress queue is full"""
+        if not agent.ingress.push(msg):
+            raise falcon.HTTPTooManyRequests(
+                title="Destination busy",
+                description=f"message queue for {aid} is full, retry later",
+                retry_after=self.agency.retryAfter,
+            )
+
+
+class Splitter:
+    """Stands in for the message handlers of a Parser to record the last message parsed"""
+
+    def __init__(self):
+        self.serder = None
+
+    def processEvent(self, serder, sigers=None, wigers=None, cigars=None, **kwa):
+        self.serder = serder
+
+    def processAttachedReceiptCouples(self, serder, cigars, **kwa):
+        self.serder = serder
+
+    def processAttachedReceiptQuadruples(self, serder, trqs, **kwa):
+        self.serder = serder
+
+    def processReceipt(self, serder, cigars, **kwa):
+        self.serder = serder
+
+    def processReceiptWitness(self, serder, wigers, **kwa):
+        self.serder = serder
+
+    def processReceiptTrans(self, serder, tsgs, **kwa):
+        self.serder = serder
+
+    def processReply(self, serder, cigars=None, tsgs=None, **kwa):
+        self.serder = serder
+
+    def processQuery(self, serder, source=None, sigers=None, cigars=None, **kwa):
+        self.serder = serder
+
+    def processCredential(self, creder, **kwa):
+        self.serder = creder
+
+
+class HttpBatchEnd(HttpEnd):
+    """
+    HTTP handler that accepts a CESR stream of many KERI messages with their attachments for one
+    or more agents in one request. Exchange messages go to the agent managing their recipient,
+    all other messages to the CESR-DESTINATION agent or, when no destination is sent, to the agent
+    managing the AID of the message.
+    """
+
+    def on_post(self, req, rep):
+        """
+        Handles POST and PUT for CESR streams of KERI messages.
+
+        Parameters:
+              req (Request) Falcon HTTP request
+              rep (Response) Falcon HTTP response
+
+        ---
+        summary:  Accept a CESR stream of KERI messages for one or more agents
+        description:  Split a CESR stream into its messages and queue each for the agent it is for.
+        tags:
+           - Events
+        requestBody:
+           required: true
+           content:
+             application/cesr:
+               schema:
+                 type: string
+                 format: binary
+                 description: KERI messages with attachments
+        responses:
+           204:
+              description: Messages queued for their agents.
+           400:
+              description: The stream ends partway through a message or does not parse.
+           404:
+              description: No message has a known destination.
+        """
+        if req.method == "OPTIONS":
+            rep.status = falcon.HTTP_200
+            return
+
+        default = None
+        if (aid := req.headers.get(CESR_DESTINATION_HEADER)) is not None:
+            checkLoading(self.agency, self.agency.locate(aid))
+            if (agent := self.agency.lookup(aid)) is None:
+                raise falcon.HTTPNotFound(title=f"unknown destination AID {aid}")
+            default = (aid, agent)
+
+        rep.set_header("Cache-Control", "no-cache")
+
+        raw = req.bounded_stream.read()
+        batches = dict()
+        dropped = 0
+        split = 0
+        for serder, msg in self.split(raw):
+            split += len(msg)
+            if (dest := self.destination(serder, default)) is None:
+                dropped += 1
+                continue
+
+            aid, agent = dest
+            batches.setdefault(agent.caid, (aid, agent, bytearray()))[2].extend(msg)
+
+        if split < len(raw):
+            raise falcon.HTTPBadRequest(
+                title="Invalid CESR stream",
+                description=f"unable to parse the message at byte {split} of {len(raw)}",
+            )
+
+        if dropped:
+            logger.info("Dropped %s messages without a known destination", dropped)
+        if not batches and dropped:
+            raise falcon.HTTPNotFound(title="no known destination for the messages")
+
+        for aid, agent, msg in batches.values():
+            self.enqueue(agent, aid, msg)
+
+        rep.status = falcon.HTTP_204
+
+    on_put = on_post
+
+    @staticmethod
+    def split(raw):
+        """
+        Yields each message of the CESR stream raw with the bytes of the message and its attachments.
+        Splitting stops at the first message that does not parse or is truncated.
+        """
+        splitter = Splitter()
+        parser = parsing.Parser(
+            framed=True,
+            kvy=splitter,
+            tvy=splitter,
+            exc=splitter,
+            rvy=splitter,
+            vry=splitter,
+        )
+        ims = bytearray(raw)
+        while ims:
+            start = len(raw) - len(ims)
+            splitter.serder = None
+            try:
+                if not verifying.parseOnce(parser, ims):
+                    logger.info("CESR stream truncated in message at byte %s", start)
+                    return
+            except (kering.KeriError, ValueError) as ex:
+                logger.info("Unable to split CESR stream at byte %s: %s", start, ex)
+                return
+
+            if splitter.serder is None or len(raw) - len(ims) == start:
+                return
+            yield splitter.serder, raw[start : len(raw) - len(ims)]
+
+    def destination(self, serder, default):
+        """Returns the AID and agent the message serder is for, default when no agent manages its AIDs"""
+        pres = []
+        if serder.sad.get("t") == Ilks.exn:
+            pres.append(serder.sad.get("rp"))
+        if default is None:
+            pres.append(serder.sad.get("i"))
+        for pre in pres:
+            if not isinstance(pre, str) or not pre:
+                continue
+            checkLoading(self.agency, caid := self.agency.locate(pre))
+            if caid is not None and (agent := self.agency.lookup(pre)) is not None:
+                return pre, agent
+
+        return default
+
 
 def loadEnds(app, agency):
-    """Add Falcon HTTP server endpoints for the HTTP endpoint class HttpEnd"""
+    """Add Falcon HTTP server endpoints for the HTTP endpoint classes HttpEnd and HttpBatchEnd"""
     httpEnd = HttpEnd(agency=agency)
     app.add_route("/", httpEnd)
+    app.add_route("/batch", HttpBatchEnd(agency=agency))
@@ -8,8 +8,10 @@ keria.app.notifying module
 import json
 
 import falcon
+from keri.app import notifying
 
 from keria.core import httping
+from keria.db.basing import SharedLMDBer
 from dataclasses import dataclass, field
 from typing import Optional
 from marshmallow import fields
@@ -22,6 +24,12 @@ def loadEnds(app):
     app.add_route("/notifications/{said}", noteRes)
 
 
+class Noter(notifying.Noter, SharedLMDBer):
+    """Notification database that can open in an agent's shared AgentStore environment"""
+
+    Namespace = "not"
+
+
 @dataclass
 class NotificationData:
     r: Optional[str] = field(
@@ -1,8 +1,21 @@
+import io
+import select
 import signal
+import socket
+import socketserver
+import ssl
+import sys
+import threading
+import time
+from collections import deque
+from concurrent import futures
+from wsgiref import simple_server
 
-from hio.base import doing
+from hio.base import doing, tyming
 from keri import help
 
+from keria.monitoring.metrics import MeteredDoist
+
 logger = help.ogler.getLogger()
 
 
@@ -63,3 +76,379 @@ class GracefulShutdownDoer(doing.Doer):
         # Once shutdown_received is set, trigger agency shutdown which will eventually shut down
         # the Doist loop by throwing a KeyboardInterrupt
         return True  # Returns a "done" status
+
+
+class AdaptiveDoist(MeteredDoist):
+    """
+    Real time Doist for the agency that, instead of waking every tock, sleeps between passes until
+    the next deadline of a doer with a tock, until a socket of one of its HTTP servers becomes
+    readable, or for its current idle tock. The idle tock doubles after each pass without work up
+    to maxTock and falls back to the minimum tock as soon as a request arrives or the agency is
+    busy, so passes run every tock under load.
+    """
+
+    def __init__(self, servers=None, busy=None, maxTock=0.5, wakers=None, **kwa):
+        """
+        Parameters:
+            servers (list): hio http.Server instances whose sockets wake the Doist
+            busy (Callable): returns True while passes should run every tock
+            maxTock (float): maximum seconds between passes while idle
+            wakers (list): other sockets that wake the Doist when readable
+            kwa (dict): MeteredDoist parameters, tock is the minimum seconds between passes
+        """
+        self.servers = list(servers) if servers is not None else []
+        self.wakers = list(wakers) if wakers is not None else []
+        self.busy = busy
+        self.maxTock = maxTock
+        super(AdaptiveDoist, self).__init__(**kwa)
+        self.real = True
+        self.idleTock = self.tock
+
+    def do(self, doers=None, limit=None, tyme=None):
+        """Runs passes over the doers until they complete, the limit or a KeyboardInterrupt"""
+        self.done = False
+        if doers is not None:
+            self.doers = list(doers)
+            self.deeds = deque()
+        if limit is not None:
+            self.limit = abs(float(limit))
+        if tyme is not None:
+            self.tyme = tyme
+        try:
+            self.enter()
+            tymer = tyming.Tymer(tymth=self.tymen(), duration=self.limit)
+            origin = (self.tyme, time.monotonic())
+            while True:
+                try:
+                    start = time.monotonic()
+                    self.recur()
+                    if not self.deeds:
+                        self.done = True
+                        break
+                    if self.limit and tymer.expired:
+                        break
+                    self.pause(start)
+                    # keep tyme in real time so doers with a tock run on schedule
+                    self.tyme = max(self.tyme, origin[0] + time.monotonic() - origin[1])
+                except KeyboardInterrupt:
+                    break
+        finally:
+            self.exit()
+
+    def active(self):
+        """Check whether a server has a request, response or unsent data in progress or the agency is busy"""
+        for server in self.servers:
+            if not server.idle():
+                return True
+            for remoter in server.servant.ixes.values():
+                if remoter.txbs:
+                    return True
+                if hasattr(remoter.cs, "pending") and remoter.cs.pending():
+                    return True  # TLS data already read from the socket
+
+        return self.busy is not None and self.busy()
+
+    def sockets(self):
+        """Listening and connected sockets of the servers and the wakers"""
+        socks = list(self.wakers)
+        for server in self.servers:
+            if server.servant.ss is not None:
+                socks.append(server.servant.ss)
+            socks.extend(
+                remoter.cs
+                for remoter in server.servant.ixes.values()
+                if remoter.cs is not None
+            )
+        return socks
+
+    def pause(self, start):
+        """
+        Waits after a pass that started at monotonic time start.
+
+        Returns:
+            bool: True means a socket became readable
+        """
+        elapsed = time.monotonic() - start
+        if elapsed >= self.tock or self.active():
+            self.idleTock = self.tock
+        else:
+            self.idleTock = min(self.idleTock * 2, self.maxTock)
+
+        wait = self.idleTock - elapsed
+        deadlines = [
+            retyme for _, retyme, doer in self.deeds if getattr(doer, "tock", 0)
+        ]
+        if deadlines:
+            wait = min(wait, min(deadlines) - self.tyme)
+        if wait <= 0:
+            return False
+
+        socks = self.sockets()
+        if not socks:
+            time.sleep(wait)
+            return False
+
+        try:
+            if hasattr(select, "poll"):
+                poller = select.poll()
+                for sock in socks:
+                    poller.register(sock, select.POLLIN)
+                readable = poller.poll(wait * 1000)
+            else:
+                readable, _, _ = select.select(socks, [], [], wait)
+        except (OSError, ValueError):  # a socket closed since it was listed
+            return False
+
+        if readable:
+            self.idleTock = self.tock
+        return bool(readable)
+
+
+class Dispatcher(doing.Doer):
+    """
+    Runs the WSGI apps of threaded servers on the agency Doist. Server threads read requests and
+    write responses while the apps, and so all agent state, are only touched between passes of the
+    Doist over the agents. A socket pair wakes an AdaptiveDoist as soon as a request is queued.
+    """
+
+    def __init__(self, timeout=60.0, **kwa):
+        """
+        Parameters:
+            timeout (float): seconds a server thread waits on the Doist before answering 503
+        """
+        self.timeout = timeout
+        self.calls = deque()
+        self.waker, self.alarm = socket.socketpair()
+        self.waker.setblocking(False)
+        self.alarm.setblocking(False)
+        self.handled = 0
+        super(Dispatcher, self).__init__(**kwa)
+
+    def call(self, app, environ):
+        """
+        Runs app on environ on the Doist, called from a server thread.
+
+        Returns:
+            tuple: status, headers and body chunks of the response
+        """
+        future = futures.Future()
+        self.calls.append((app, environ, future))
+        try:
+            self.alarm.send(b"\x00")
+        except BlockingIOError:
+            pass  # a wake up is already pending
+        except OSError:
+            future.cancel()  # the Doist has exited
+        return future.result(timeout=self.timeout)
+
+    def recur(self, tyme=None, tock=0.0, **opts):
+        try:
+            while self.waker.recv(4096):
+                pass
+        except BlockingIOError:
+            pass
+
+        for _ in range(len(self.calls)):
+            app, environ, future = self.calls.popleft()
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(self.respond(app, environ))
+            except Exception as ex:
+                future.set_exception(ex)
+            self.handled += 1
+
+        return False
+
+    @staticmethod
+    def respond(app, environ):
+        response = []
+
+        def start_response(status, headers, exc_info=None):
+            response[:] = [status, headers]
+
+        result = app(environ, start_response)
+        try:
+            chunks = [bytes(chunk) for chunk in result]
+        finally:
+            if hasattr(result, "close"):
+                result.close()
+        return response[0], response[1], chunks
+
+    def exit(self):
+        while self.calls:
+            _, _, future = self.calls.popleft()
+            future.cancel()
+        self.waker.close()
+        self.alarm.close()
+
+
+class Marshal:
+    """WSGI app of a threaded server handing each request to the app on the agency Doist"""
+
+    def __init__(self, app, dispatcher):
+        """
+        Parameters:
+            app (falcon.App): app to run on the Doist
+            dispatcher (Dispatcher): runs the app on the Doist
+        """
+        self.app = app
+        self.dispatcher = dispatcher
+
+    def __call__(self, environ, start_response):
+        # read the body on the server thread so the app never waits on the network
+        length = int(environ.get("CONTENT_LENGTH") or 0)
+        try:
+            body = environ["wsgi.input"].read(length) if length else b""
+        except TimeoutError:
+            start_response("408 Request Timeout", [("Content-Length", "0")])
+            return [b""]
+        environ["wsgi.input"] = io.BytesIO(body)
+        try:
+            status, headers, chunks = self.dispatcher.call(self.app, environ)
+        except (futures.TimeoutError, futures.CancelledError):
+            start_response("503 Service Unavailable", [("Content-Length", "0")])
+            return [b""]
+
+        start_response(status, headers)
+        return chunks
+
+
+class QuietHandler(simple_server.WSGIRequestHandler):
+    def log_message(self, format, *args):
+        logger.debug("Threaded server %s", format % args)
+
+
+class HandshakeMixIn:
+    """
+    Mix-in for threaded socket servers doing the TLS handshake of each accepted connection on the
+    thread serving it, so a client stalling its handshake never holds up accept() for the others.
+    Connections idle or stalled for idleTimeout while a request is read are closed so slow clients
+    cannot hold every worker. Servers set context, None means plain HTTP, handshakeTimeout and
+    idleTimeout.
+    """
+
+    context = None
+    handshakeTimeout = 10.0
+    idleTimeout = 30.0
+
+    def process_request_thread(self, request, client_address):
+        if self.context is not None:
+            try:
+                request = self.context.wrap_socket(
+                    request, server_side=True, do_handshake_on_connect=False
+                )
+                request.settimeout(self.handshakeTimeout)
+                request.do_handshake()
+            except (OSError, ValueError) as ex:
+                logger.debug("TLS handshake with %s failed: %s", client_address, ex)
+                self.shutdown_request(request)
+                return
+
+        request.settimeout(self.idleTimeout)
+        super(HandshakeMixIn, self).process_request_thread(request, client_address)
+
+    def handle_error(self, request, client_address):
+        if isinstance(sys.exc_info()[1], (TimeoutError, ConnectionError)):
+            logger.debug(
+                "Connection from %s closed: %s", client_address, sys.exc_info()[1]
+            )
+            return
+        super(HandshakeMixIn, self).handle_error(request, client_address)
+
+
+class ThreadedServer(
+    HandshakeMixIn, socketserver.ThreadingMixIn, simple_server.WSGIServer
+):
+    """WSGI server serving each connection on one of a bounded pool of worker threads"""
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        port,
+        app,
+        workers=8,
+        context=None,
+        handshakeTimeout=10.0,
+        idleTimeout=30.0,
+    ):
+        """
+        Parameters:
+            port (int): port to listen on
+            app (Callable): WSGI app, a Marshal to run the app on the agency Doist
+            workers (int): number of request worker threads
+            context (ssl.SSLContext | None): TLS context, None means plain HTTP
+            handshakeTimeout (float): seconds a client has to complete its TLS handshake
+            idleTimeout (float): seconds a connection may stay idle or stall sending its request
+        """
+        self.executor = futures.ThreadPoolExecutor(
+            max_workers=max(workers, 1), thread_name_prefix=f"http-{port}"
+        )
+        self.context = context
+        self.handshakeTimeout = handshakeTimeout
+        self.idleTimeout = idleTimeout
+        super(ThreadedServer, self).__init__(("", port), QuietHandler)
+        self.set_app(app)
+
+    def process_request(self, request, client_address):
+        self.executor.submit(self.process_request_thread, request, client_address)
+
+    def server_close(self):
+        super(ThreadedServer, self).server_close()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+class ThreadedServerDoer(doing.Doer):
+    """Runs a ThreadedServer on its own thread while the Doist runs"""
+
+    def __init__(self, server, **kwa):
+        self.server = server
+        self.thread = None
+        super(ThreadedServerDoer, self).__init__(**kwa)
+
+    def enter(self, temp=None):
+        self.thread = threading.Thread(
+            target=self.server.serve_forever,
+            kwargs=dict(poll_interval=0.1),
+            daemon=True,
+        )
+        self.thread.start()
+
+    def recur(self, tyme=None, tock=0.0, **opts):
+        return False
+
+    def exit(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def threadedServerDoer(
+    port,
+    app,
+    dispatcher,
+    workers=8,
+    keypath=None,
+    certpath=None,
+    cafilepath=None,
+    handshakeTimeout=10.0,
+    idleTimeout=30.0,
+):
+    """
+    Creates a ThreadedServer for app running on the Doist of dispatcher and the Doer running it.
+    Serves HTTPS when the TLS key and certificate are present.
+    """
+    context = None
+    if keypath is not None and certpath is not None:
+        context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH, cafile=cafilepath)
+        context.load_cert_chain(certfile=certpath, keyfile=keypath)
+
+    server = ThreadedServer(
+        port,
+        Marshal(app, dispatcher),
+        workers=workers,
+        context=context,
+        handshakeTimeout=handshakeTimeout,
+        idleTimeout=idleTimeout,
+    )
+    return ThreadedServerDoer(server=server)
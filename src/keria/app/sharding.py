@@ -0,0 +1,368 @@
+# -*- encoding: utf-8 -*-
+"""
+KERIA
+keria.app.sharding module
+
+Runs an Agency split across worker processes, each owning a hash partition of the agents, behind a
+router that forwards each admin, boot and indirect request to the worker owning its agent.
+"""
+
+import dataclasses
+import http.client
+import json
+import multiprocessing
+import signal
+import ssl
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote, urlsplit
+
+from keria import log_name, ogler, set_log_level
+from keria.app import agenting, serving
+from keria.app.indirecting import CESR_DESTINATION_HEADER
+from keria.db import basing
+
+logger = ogler.getLogger(log_name)
+
+# Connection specific headers not forwarded between the client, router and worker
+HOP_HEADERS = (
+    "connection",
+    "keep-alive",
+    "proxy-connection",
+    "transfer-encoding",
+    "te",
+    "trailer",
+    "upgrade",
+    "date",
+    "server",
+)
+
+
+def workerConfig(config: agenting.KERIAServerConfig, shard: int):
+    """
+    Returns the config of the worker process running shard. Workers listen on the router ports
+    offset by shardPortStep * (shard + 1) and leave TLS to the router.
+    """
+    step = config.shardPortStep * (shard + 1)
+    return dataclasses.replace(
+        config,
+        adminPort=config.adminPort + step,
+        httpPort=config.httpPort + step if config.httpPort else config.httpPort,
+        bootPort=config.bootPort + step,
+        keyPath=None,
+        certPath=None,
+        caFilePath=None,
+        shard=shard,
+    )
+
+
+class Directory:
+    """
+    Finds the shard owning a request using the AgencyBaser shared by all workers as the directory
+    of managed AIDs and agent AIDs to controller AIDs.
+    """
+
+    def __init__(self, adb, shards):
+        """
+        Parameters:
+            adb (AgencyBaser): agency database written by the workers
+            shards (int): number of shards
+        """
+        self.adb = adb
+        self.shards = shards
+
+    def shard(self, caid):
+        """Shard owning the agent of controller AID caid"""
+        return basing.shardOf(caid, self.shards)
+
+    def route(self, pre):
+        """Shard owning the agent managing pre, a managed AID, agent AID or controller AID"""
+        if (prefixer := self.adb.aids.get(keys=(pre,))) is not None:
+            return self.shard(prefixer.qb64)
+        if (prefixer := self.adb.ctrl.get(keys=(pre,))) is not None:
+            return self.shard(prefixer.qb64)
+
+        return self.shard(pre)
+
+    def admin(self, path, headers, body):
+        """Signed admin requests name their controller in Signify-Resource, /agent/{caid} in the path"""
+        if (caid := headers.get("Signify-Resource")) is not None:
+            return self.shard(caid)
+
+        parts = urlsplit(path).path.split("/")
+        if len(parts) > 2 and parts[1] == "agent":
+            return self.shard(unquote(parts[2]))
+
+        return 0
+
+    def boot(self, path, headers, body):
+        """Boot requests carry the controller inception event"""
+        try:
+            return self.shard(json.loads(body)["icp"]["i"])
+        except (ValueError, KeyError, TypeError):
+            return 0
+
+    def indirect(self, path, headers, body):
+        """Indirect requests name their destination in CESR-DESTINATION, OOBIs in the path"""
+        if (aid := headers.get(CESR_DESTINATION_HEADER)) is not None:
+            return self.route(aid)
+
+        parts = urlsplit(path).path.split("/")
+        if len(parts) > 2 and parts[1] == "oobi" and parts[2]:
+            return self.route(unquote(parts[2]))
+
+        return 0
+
+
+class BodyTooLarge(ValueError):
+    """Request body over the body limit of the router"""
+
+
+class Forwarder(BaseHTTPRequestHandler):
+    """Forwards one request to the worker owning it and streams the response back"""
+
+    protocol_version = "HTTP/1.1"
+
+    def forward(self):
+        try:
+            body = self.readBody()
+        except BodyTooLarge as ex:
+            self.send_error(413, str(ex))
+            return
+        except ValueError as ex:
+            self.send_error(400, str(ex))
+            return
+
+        shard = self.server.resolve(self.path, self.headers, body)
+        port = self.server.ports[shard]
+
+        headers = {
+            key: val
+            for key, val in self.headers.items()
+            if key.lower() not in HOP_HEADERS
+        }
+        if body:
+            headers["Content-Length"] = str(len(body))
+
+        conn = http.client.HTTPConnection(
+            "127.0.0.1", port, timeout=self.server.workerTimeout
+        )
+        try:
+            conn.request(self.command, self.path, body=body or None, headers=headers)
+            resp = conn.getresponse()
+        except OSError as ex:
+            logger.error(f"Shard {shard} on port {port} unavailable: {ex}")
+            conn.close()
+            self.send_error(502, f"shard {shard} unavailable")
+            return
+
+        try:
+            self.send_response(resp.status, resp.reason)
+            for key, val in resp.getheaders():
+                if key.lower() not in HOP_HEADERS:
+                    self.send_header(key, val)
+            self.send_header("Connection", "close")
+            self.end_headers()
+
+            # stream the body so server sent events pass through as they arrive
+            if self.command != "HEAD":
+                while chunk := resp.read1(65536):
+                    self.wfile.write(chunk)
+                    self.wfile.flush()
+        except OSError:
+            pass  # client went away
+        finally:
+            conn.close()
+            self.close_connection = True
+
+    def readBody(self):
+        """
+        Reads the request body, plain or chunked.
+
+        Raises:
+            BodyTooLarge: the body is over the body limit of the server
+            ValueError: the body is malformed or ends before its declared length
+        """
+        limit = self.server.bodyLimit
+        if "chunked" in self.headers.get("Transfer-Encoding", "").lower():
+            body = bytearray()
+            while True:
+                line = self.rfile.readline(1024)
+                if not line.endswith(b"\n"):
+                    raise ValueError("truncated chunked body")
+                size = int(line.split(b";")[0], 16)
+                if size < 0:
+                    raise ValueError(f"invalid chunk size {size}")
+                if size == 0:
+                    break
+                if limit and len(body) + size > limit:
+                    raise BodyTooLarge(f"body over {limit} bytes")
+                chunk = self.rfile.read(size)
+                if len(chunk) < size:
+                    raise ValueError("truncated chunked body")
+                body.extend(chunk)
+                self.rfile.readline(1024)
+
+            # skip the trailer up to the blank line ending the body
+            while self.rfile.readline(1024) not in (b"\r\n", b"\n", b""):
+                pass
+            return bytes(body)
+
+        length = int(self.headers.get("Content-Length") or 0)
+        if length < 0:
+            raise ValueError(f"invalid Content-Length {length}")
+        if limit and length > limit:
+            raise BodyTooLarge(f"body over {limit} bytes")
+        body = self.rfile.read(length) if length else b""
+        if len(body) < length:
+            raise ValueError("truncated body")
+        return body
+
+    def log_message(self, format, *args):
+        logger.debug("Router %s", format % args)
+
+    do_GET = forward
+    do_HEAD = forward
+    do_POST = forward
+    do_PUT = forward
+    do_PATCH = forward
+    do_DELETE = forward
+    do_OPTIONS = forward
+
+
+class ShardServer(serving.HandshakeMixIn, ThreadingHTTPServer):
+    """Router listener for one of the admin, http or boot ports"""
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        port,
+        ports,
+        resolve,
+        context=None,
+        workerTimeout=60.0,
+        handshakeTimeout=10.0,
+        idleTimeout=30.0,
+        bodyLimit=0,
+    ):
+        """
+        Parameters:
+            port (int): port to listen on
+            ports (list[int]): worker port of the same kind for each shard
+            resolve (Callable): returns the shard of a request from its path, headers and body
+            context (ssl.SSLContext | None): TLS context, None means plain HTTP
+            workerTimeout (float): seconds to wait on a worker
+            handshakeTimeout (float): seconds a client has to complete its TLS handshake
+            idleTimeout (float): seconds a connection may stay idle or stall sending its request
+            bodyLimit (int): maximum bytes of a request body, 0 means unbounded
+        """
+        self.ports = ports
+        self.resolve = resolve
+        self.workerTimeout = workerTimeout
+        self.context = context
+        self.handshakeTimeout = handshakeTimeout
+        self.idleTimeout = idleTimeout
+        self.bodyLimit = bodyLimit
+        super(ShardServer, self).__init__(("", port), Forwarder)
+
+
+class Router:
+    """Listens on the agency ports and forwards each request to the worker owning its agent"""
+
+    def __init__(self, config: agenting.KERIAServerConfig, directory: Directory):
+        self.config = config
+        self.directory = directory
+        self.servers = []
+        self.threads = []
+
+        context = None
+        if config.keyPath is not None and config.certPath is not None:
+            context = ssl.create_default_context(
+                ssl.Purpose.CLIENT_AUTH, cafile=config.caFilePath
+            )
+            context.load_cert_chain(certfile=config.certPath, keyfile=config.keyPath)
+
+        workers = [workerConfig(config, shard) for shard in range(config.shards)]
+        listeners = [
+            (config.adminPort, [w.adminPort for w in workers], directory.admin),
+            (config.bootPort, [w.bootPort for w in workers], directory.boot),
+        ]
+        if config.httpPort:
+            listeners.append(
+                (config.httpPort, [w.httpPort for w in workers], directory.indirect)
+            )
+
+        for port, ports, resolve in listeners:
+            self.servers.append(
+                ShardServer(
+                    port,
+                    ports,
+                    resolve,
+                    context=context,
+                    workerTimeout=config.routerTimeout,
+                    handshakeTimeout=config.handshakeTimeout,
+                    idleTimeout=config.idleTimeout,
+                    bodyLimit=config.routerBodyLimit,
+                )
+            )
+
+    def start(self):
+        for server in self.servers:
+            thread = threading.Thread(target=server.serve_forever, daemon=True)
+            thread.start()
+            self.threads.append(thread)
+
+    def close(self):
+        for server in self.servers:
+            server.shutdown()
+            server.server_close()
+
+
+def runShards(config: agenting.KERIAServerConfig):
+    """
+    Runs the agency as config.shards worker processes behind a Router until SIGTERM or SIGINT,
+    then shuts the workers down gracefully. Sharding needs persistent storage shared by the workers.
+    """
+    set_log_level(config.logLevel, logger)
+    logger.info(
+        "Starting %s agency shards for %s listening: admin/%s, http/%s, boot/%s",
+        config.shards,
+        config.name,
+        config.adminPort,
+        config.httpPort,
+        config.bootPort,
+    )
+
+    workers = []
+    for shard in range(config.shards):
+        worker = multiprocessing.Process(
+            target=agenting.runAgency,
+            args=(workerConfig(config, shard),),
+            name=f"keria-shard-{shard}",
+        )
+        worker.start()
+        workers.append(worker)
+
+    adb = basing.AgencyBaser(name="TheAgency", base=config.base, reopen=True)
+    router = Router(config, Directory(adb, config.shards))
+    router.start()
+
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda signum, frame: stop.set())
+    signal.signal(signal.SIGINT, lambda signum, frame: stop.set())
+    while not stop.wait(1.0):
+        if any(not worker.is_alive() for worker in workers):
+            logger.error("Agency shard exited, stopping all shards")
+            break
+
+    router.close()
+    for worker in workers:
+        if worker.is_alive():
+            worker.terminate()  # SIGTERM triggers the graceful shutdown of the worker agency
+    for worker in workers:
+        worker.join(timeout=config.drainTimeout + config.closeTimeout + 5.0)
+        if worker.is_alive():
+            worker.kill()
+    adb.close()
+    logger.info("Agency shards stopped")
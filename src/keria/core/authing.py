@@ -5,28 +5,115 @@ keria.core.authing module
 
 """
 
+import re
+from collections import OrderedDict
 from urllib.parse import quote, unquote
 import falcon
 from hio.help import Hict
 from keri import kering
+from keri.core import coring
 from keri.end import ending
 from keri.help import helping
 
+from keria.core import httping
+
+# Signature-Input of Signify clients: the signify signature over the default fields with created, keyid and alg
+SIGNIFY_INPUT_RE = re.compile(
+    r'\Asignify=\(((?:"[^"\s]+" ?)+)\);created=(\d+);keyid="([^"]+)";alg="([^"]+)"\Z'
+)
+# Signature of Signify clients: one unindexed signify signature
+SIGNIFY_SIGNATURE_RE = re.compile(r'\Aindexed="\?0";signify="([^"]+)"\Z')
+
+
+class Replays:
+    """
+    Signatures of requests accepted within the freshness window, in order of acceptance, each kept
+    until its request falls out of the window. Once full the oldest signatures are dropped first.
+    """
+
+    def __init__(self, window, size=65536):
+        """
+        Parameters:
+            window (float): seconds a request is fresh either side of its created time
+            size (int): maximum number of signatures kept
+        """
+        self.window = window
+        self.size = size
+        self.seen = OrderedDict()
+        self.rejected = 0
+
+    def fresh(self, created, now):
+        return abs(now - created) <= self.window
+
+    def replayed(self, sig, now):
+        """True means sig was accepted before and its request is still fresh"""
+        while self.seen:
+            old, expiry = next(iter(self.seen.items()))
+            if expiry >= now and len(self.seen) <= self.size:
+                break
+            del self.seen[old]
+
+        expiry = self.seen.get(sig)
+        if expiry is not None and expiry >= now:
+            self.rejected += 1
+            return True
+        return False
+
+    def add(self, sig, created):
+        self.seen[sig] = created + self.window
+
+    def __len__(self):
+        return len(self.seen)
+
 
 class Authenticater:
     DefaultFields = ["Signify-Resource", "@method", "@path", "Signify-Timestamp"]
 
-    def __init__(self, agency):
+    def __init__(self, agency, window=0.0, size=65536):
         """Create Agent Authenticator for verifying requests and signing responses
 
         Parameters:
             agency(Agency): habitat of Agent for signing responses
+            window(float): seconds a signed request is accepted either side of its created time and
+                rejected when replayed, 0 accepts requests created at any time again
+            size(int): maximum number of accepted signatures remembered to reject replays
 
         Returns:
               Authenicator:  the configured habery
 
         """
         self.agency = agency
+        self.replays = Replays(window=window, size=size) if window else None
+
+    @staticmethod
+    def inputs(siginput):
+        """Signify inputs of the Signature-Input header siginput, without a full parse for Signify clients"""
+        if (match := SIGNIFY_INPUT_RE.match(siginput)) is not None:
+            fields, created, keyid, alg = match.groups()
+            return [
+                ending.Inputage(
+                    name="signify",
+                    fields=fields.replace('"', "").split(" "),
+                    created=int(created),
+                    keyid=keyid,
+                    alg=alg,
+                    expires=None,
+                    nonce=None,
+                    context=None,
+                )
+            ]
+
+        inputs = ending.desiginput(siginput.encode("utf-8"))
+        return [i for i in inputs if i.name == "signify"]
+
+    @staticmethod
+    def signatures(signature):
+        """Signatures of the Signature header by input name, without a full parse for Signify clients"""
+        if (match := SIGNIFY_SIGNATURE_RE.match(signature)) is not None:
+            return dict(signify=coring.Cigar(qb64=match.group(1)))
+
+        signages = ending.designature(signature)
+        return signages[0].markers
 
     @staticmethod
     def resource(request):
@@ -48,12 +135,23 @@ class Authenticater:
         if not signature:
             return False
 
-        inputs = ending.desiginput(siginput.encode("utf-8"))
-        inputs = [i for i in inputs if i.name == "signify"]
-
+        inputs = self.inputs(siginput)
         if not inputs:
             return False
 
+        markers = self.signatures(signature)
+
+        # reject stale and replayed requests before looking up the agent
+        if self.replays is not None:
+            now = helping.nowUTC().timestamp()
+            for inputage in inputs:
+                if not self.replays.fresh(inputage.created, now):
+                    raise kering.AuthNError(
+                        f"Signature created at {inputage.created} outside freshness window"
+                    )
+                if self.replays.replayed(markers[inputage.name].qb64, now):
+                    raise kering.AuthNError("Signature already used")
+
         for inputage in inputs:
             items = []
             for field in inputage.fields:
@@ -99,11 +197,13 @@ class Authenticater:
                 raise kering.AuthNError("unknown or invalid controller")
 
             ckever = agent.agentHab.kevers[resource]
-            signages = ending.designature(signature)
-            cig = signages[0].markers[inputage.name]
+            cig = markers[inputage.name]
             if not ckever.verfers[0].verify(sig=cig.raw, ser=ser):
                 raise kering.AuthNError(f"Signature for {inputage} invalid")
 
+            if self.replays is not None:
+                self.replays.add(cig.qb64, inputage.created)
+
         return True
 
     def sign(self, agent, headers, method, path, fields=None):
@@ -178,6 +278,8 @@ class SignatureValidationComponent(object):
             if req.path.startswith(path):
                 return
 
+        httping.checkLoading(self.agency, req.headers.get("SIGNIFY-RESOURCE"))
+
         req.path = quote(req.path)
 
         try:
@@ -5,6 +5,7 @@ keria.core.httping module
 
 """
 
+import gzip
 import io
 import logging
 
@@ -37,6 +38,30 @@ def getRequiredParam(body, name):
     return param
 
 
+def checkLoading(agency, caid):
+    """Raise 503 Service Unavailable with Retry-After while the agency drains on shutdown or the
+    agent for caid loads in the background
+
+    Parameters:
+        agency (Agency): agency managing the agent
+        caid (str | None): controller AID of the agent the request is for
+
+    """
+    if agency.draining:
+        raise falcon.HTTPServiceUnavailable(
+            title="Agency draining",
+            description="agency is shutting down, retry later",
+            retry_after=agency.retryAfter,
+        )
+
+    if caid is not None and agency.loading(caid):
+        raise falcon.HTTPServiceUnavailable(
+            title="Agent loading",
+            description=f"agent for {caid} is loading, retry later",
+            retry_after=agency.retryAfter,
+        )
+
+
 def parseRangeHeader(header, name, start=0, end=9):
     """Parse the start and end requested range values, defaults are 0, 9
 
@@ -101,6 +126,56 @@ class RequestLoggerMiddleware:
         logger.debug("Response headers: %s", resp.headers)
 
 
+class GzipMiddleware:
+    """
+    Compresses response bodies of at least threshold bytes with gzip for requests accepting it.
+    Add it after the middleware signing responses so the body is compressed before signing.
+    """
+
+    def __init__(self, threshold=1024, level=6):
+        """
+        Parameters:
+            threshold (int): minimum body size in bytes to compress
+            level (int): gzip compression level, 1 is fastest and 9 smallest
+        """
+        self.threshold = threshold
+        self.level = level
+
+    @staticmethod
+    def accepts(header):
+        """True means the Accept-Encoding header value accepts gzip, an explicit gzip entry overrides *"""
+        qs = dict()
+        for coding in header.split(","):
+            name, _, params = coding.partition(";")
+            name = name.strip().lower()
+            if name not in ("gzip", "*"):
+                continue
+            _, _, q = params.strip().partition("q=")
+            try:
+                qs[name] = float(q) if q else 1.0
+            except ValueError:
+                qs[name] = 0.0
+        return qs.get("gzip", qs.get("*", 0.0)) > 0
+
+    def process_response(
+        self, req: falcon.Request, resp: falcon.Response, resource, req_succeeded
+    ):
+        resp.append_header("Vary", "Accept-Encoding")
+        if not self.accepts(req.get_header("Accept-Encoding", default="")):
+            return
+        if resp.stream is not None or resp.get_header("Content-Encoding"):
+            return
+
+        body = resp.render_body()
+        if body is None or len(body) < self.threshold:
+            return
+
+        resp.data = gzip.compress(body, compresslevel=self.level)
+        resp.text = None
+        resp.media = None
+        resp.set_header("Content-Encoding", "gzip")
+
+
 keriHeaders = [
     "cesr-attachment",
     "cesr-date",
@@ -11,9 +11,11 @@ from keri.app.keeping import PreSit, Algos, PubLot, PubSet
 from keri import core
 from keri.core import coring
 from keri.core.coring import Tiers, MtrDex
-from keri.db import dbing, subing, koming
+from keri.db import subing, koming
 from keri.help import helping
 
+from keria.db.basing import SharedLMDBer
+
 
 @dataclass()
 class Prefix:
@@ -43,7 +45,7 @@ class SaltyPrm:
         return iter(asdict(self))
 
 
-class RemoteKeeper(dbing.LMDBer):
+class RemoteKeeper(SharedLMDBer):
     """
     RemoteKeeper stores data for Salty or Randy Encrypted edge key generation.
 
@@ -53,6 +55,7 @@ class RemoteKeeper(dbing.LMDBer):
     AltTailDirPath = ".keri/rks"
     TempPrefix = "keri_rks_"
     MaxNamedDBs = 10
+    Namespace = "rks"
 
     def __init__(self, headDirPath=None, perm=None, reopen=False, **kwa):
         """
@@ -145,7 +148,7 @@ class RemoteManager:
     associated remote Signify controller.
     """
 
-    def __init__(self, hby, rb: RemoteKeeper = None):
+    def __init__(self, hby, rb: RemoteKeeper = None, store=None):
         self.hby = hby
         self.rb = (
             rb
@@ -157,6 +160,7 @@ class RemoteManager:
                 reopen=True,
                 clear=False,
                 headDirPath=hby.db.headDirPath,
+                store=store,
             )
         )
 
@@ -21,6 +21,7 @@ from keri.db import dbing, koming
 from keri.help import helping
 
 from keria.app import delegating
+from keria.db.basing import SharedLMDBer
 
 # long running operation types
 Typeage = namedtuple(
@@ -111,10 +112,11 @@ class Op:
     metadata: dict
 
 
-class Operator(dbing.LMDBer):
+class Operator(SharedLMDBer):
     TailDirPath = "keri/opr"
     AltTailDirPath = ".keri/opr"
     TempPrefix = "keri_ops_"
+    Namespace = "opr"
 
     def __init__(self, name="opr", headDirPath=None, reopen=True, **kwa):
         """
@@ -0,0 +1,301 @@
+# -*- encoding: utf-8 -*-
+"""
+KERIA
+keria.core.verifying module
+
+Verification of the Ed25519 signatures of received messages ahead of the parser on worker threads
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent import futures
+
+from keri import help
+from keri.core import parsing, serdering
+from keri.core.coring import Ilks, MtrDex
+from keri.core.signing import Verfer
+from keri.db import dbing
+
+logger = help.ogler.getLogger()
+
+# Verfer codes of the keys verified ahead of the parser
+ED25519_CODES = (MtrDex.Ed25519, MtrDex.Ed25519N)
+
+
+def parseOnce(parser, ims):
+    """
+    Parses one message of the complete stream ims with parser. Unlike Parser.parseOne this stops
+    when the parser waits for bytes past the end of ims instead of waiting forever.
+
+    Parameters:
+        parser (Parser): parser with the handlers of the message
+        ims (bytearray): stream the message is parsed from and deleted off
+
+    Returns:
+        bool: False means ims ends partway through a message
+    """
+    parsator = parser.onceParsator(ims=ims)
+    size = len(ims)
+    while True:
+        try:
+            next(parsator)
+        except StopIteration:
+            return True
+
+        if len(ims) == size:  # waiting on bytes that will never arrive
+            parsator.close()
+            return False
+        size = len(ims)
+
+
+class VerifyCache:
+    """
+    Bounded set of verified Ed25519 signatures keyed by public key, signature and digest of the signed
+    serialization, in least to most recently used order. Safe to use from several threads.
+    """
+
+    def __init__(self, size=65536):
+        """
+        Parameters:
+            size (int): maximum number of verified signatures kept
+        """
+        self.size = size
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def key(key, sig, ser):
+        return bytes(key), bytes(sig), hashlib.blake2b(ser, digest_size=32).digest()
+
+    def add(self, key, sig, ser):
+        entry = self.key(key, sig, ser)
+        with self.lock:
+            self.entries[entry] = True
+            self.entries.move_to_end(entry)
+            while len(self.entries) > self.size:
+                self.entries.popitem(last=False)
+
+    def verified(self, key, sig, ser):
+        """True means sig is a valid signature of key on ser"""
+        entry = self.key(key, sig, ser)
+        with self.lock:
+            if entry not in self.entries:
+                return False
+            self.entries.move_to_end(entry)
+            self.hits += 1
+            return True
+
+    def __len__(self):
+        return len(self.entries)
+
+
+_ed25519 = Verfer._ed25519
+_cache = None
+
+
+def install(cache):
+    """
+    Makes every Verfer of the process check cache before verifying an Ed25519 signature and remember
+    the signatures it verifies. Verfer picks its verification function when it is created, so this
+    applies to the Verfers created after the call.
+
+    Parameters:
+        cache (VerifyCache): verified signatures shared by all agents of the process
+    """
+    global _cache
+    _cache = cache
+    Verfer._ed25519 = staticmethod(cachedEd25519)
+
+
+def uninstall():
+    global _cache
+    _cache = None
+    Verfer._ed25519 = staticmethod(_ed25519)
+
+
+def cachedEd25519(sig, ser, key):
+    """Ed25519 verification function of Verfer answering from the installed VerifyCache when it can"""
+    cache = _cache
+    if cache is not None and cache.verified(key, sig, ser):
+        return True
+
+    if not _ed25519(sig=sig, ser=ser, key=key):
+        return False
+
+    if cache is not None:
+        cache.add(key, sig, ser)
+    return True
+
+
+class Collector:
+    """
+    Stands in for the Kevery, Tevery, Exchanger, Revery and Verifier of a Parser to collect the
+    signatures of each parsed message with the public key and serialization they sign. Keys of
+    signers are found in the messages themselves or read from the key event logs in db.
+    """
+
+    def __init__(self, db):
+        """
+        Parameters:
+            db (Baser): database of the agent the messages are for
+        """
+        self.db = db
+        self.checks = []
+
+    def check(self, verfer, sig, ser):
+        if verfer.code in ED25519_CODES and ser is not None:
+            self.checks.append((verfer.raw, bytes(sig), bytes(ser)))
+
+    def indexed(self, verfers, sigers, ser):
+        for siger in sigers or []:
+            if siger.index < len(verfers):
+                self.check(verfers[siger.index], siger.raw, ser)
+
+    def couples(self, cigars, ser):
+        for cigar in cigars or []:
+            if cigar.verfer is not None:
+                self.check(cigar.verfer, cigar.raw, ser)
+
+    def groups(self, tsgs, ser):
+        for prefixer, seqner, saider, sigers in tsgs or []:
+            self.indexed(
+                self.verfers(prefixer.qb64, seqner.sn, saider.qb64), sigers, ser
+            )
+
+    def verfers(self, pre, sn=None, dig=None):
+        """Signing keys of pre at establishment event sn, its current keys when sn is None"""
+        if sn is None:
+            kever = self.db.kevers.get(pre)
+            return kever.verfers if kever is not None else []
+
+        # not in the key event log yet, the parser escrows the message
+        try:
+            _, verfers = self.db.resolveVerifiers(pre=pre, sn=sn, dig=dig)
+        except Exception:
+            return []
+        return verfers
+
+    def witnesses(self, serder):
+        if serder.ilk in (Ilks.icp, Ilks.dip):
+            wits = serder.backs
+        else:
+            kever = self.db.kevers.get(serder.pre)
+            wits = kever.wits if kever is not None else []
+        return [Verfer(qb64=wit) for wit in wits]
+
+    def receipted(self, serder):
+        """Serialization of the event receipted by the receipt serder"""
+        raw = self.db.getEvt(dbing.dgKey(serder.preb, serder.saidb))
+        return bytes(raw) if raw is not None else None
+
+    def processEvent(
+        self, serder, sigers=None, wigers=None, cigars=None, tsgs=None, **kwa
+    ):
+        if not isinstance(serder, serdering.SerderKERI):
+            return
+
+        if serder.ilk in (Ilks.icp, Ilks.rot, Ilks.dip, Ilks.drt):
+            self.indexed(serder.verfers, sigers, serder.raw)
+        elif serder.ilk == Ilks.ixn:
+            self.indexed(self.verfers(serder.pre), sigers, serder.raw)
+
+        if wigers and serder.ilk in (Ilks.icp, Ilks.rot, Ilks.ixn, Ilks.dip, Ilks.drt):
+            self.indexed(self.witnesses(serder), wigers, serder.raw)
+
+        self.couples(cigars, serder.raw)
+        self.groups(tsgs, serder.raw)
+
+    def processAttachedReceiptCouples(self, serder, cigars, **kwa):
+        self.couples(cigars, serder.raw)
+
+    def processAttachedReceiptQuadruples(self, serder, trqs, **kwa):
+        for prefixer, seqner, diger, siger in trqs:
+            self.indexed(
+                self.verfers(prefixer.qb64, seqner.sn, diger.qb64), [siger], serder.raw
+            )
+
+    def processReceipt(self, serder, cigars, **kwa):
+        self.couples(cigars, self.receipted(serder))
+
+    def processReceiptWitness(self, serder, wigers, **kwa):
+        kever = self.db.kevers.get(serder.pre)
+        wits = kever.wits if kever is not None else []
+        self.indexed([Verfer(qb64=wit) for wit in wits], wigers, self.receipted(serder))
+
+    def processReceiptTrans(self, serder, tsgs, **kwa):
+        self.groups(tsgs, self.receipted(serder))
+
+    def processReply(self, serder, cigars=None, tsgs=None, **kwa):
+        self.couples(cigars, serder.raw)
+        self.groups(tsgs, serder.raw)
+
+    def processQuery(self, serder, source=None, sigers=None, cigars=None, **kwa):
+        if source is not None:
+            self.indexed(self.verfers(source.qb64), sigers, serder.raw)
+        self.couples(cigars, serder.raw)
+
+    def processCredential(self, **kwa):
+        pass
+
+
+class Preverifier:
+    """
+    Verifies the Ed25519 signatures of received message streams on worker threads before the agent
+    parses them, remembering the valid ones in the VerifyCache the Verfers of the parser consult.
+    """
+
+    def __init__(self, workers=2, cache=None):
+        """
+        Parameters:
+            workers (int): number of verification threads
+            cache (VerifyCache): verified signatures, installed for all Verfers of the process
+        """
+        self.cache = cache if cache is not None else VerifyCache()
+        self.verified = 0
+        self.executor = futures.ThreadPoolExecutor(
+            max_workers=max(workers, 1), thread_name_prefix="agent-verifier"
+        )
+        install(self.cache)
+
+    def submit(self, msg, db):
+        """
+        Verifies the signatures of the message stream msg for the agent with database db.
+
+        Returns:
+            Future: done once the valid signatures of msg are in the cache
+        """
+        return self.executor.submit(self.verify, bytes(msg), db)
+
+    def verify(self, msg, db):
+        collector = Collector(db)
+        parser = parsing.Parser(
+            framed=True,
+            kvy=collector,
+            tvy=collector,
+            exc=collector,
+            rvy=collector,
+            vry=collector,
+        )
+        ims = bytearray(msg)
+        try:
+            while ims:
+                if not parseOnce(parser, ims):
+                    logger.debug(
+                        "Signature pre-verification stopped at truncated message"
+                    )
+                    break
+        except Exception as ex:  # the agent's parser reports bad messages
+            logger.debug("Signature pre-verification stopped: %s", ex)
+
+        for key, sig, ser in collector.checks:
+            if _ed25519(sig=sig, ser=ser, key=key):
+                self.cache.add(key, sig, ser)
+                self.verified += 1
+
+        return len(collector.checks)
+
+    def close(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        uninstall()
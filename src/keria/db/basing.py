@@ -6,6 +6,8 @@ keria.db.basing module
 """
 
 from dataclasses import dataclass
+import hashlib
+import lmdb
 from ordered_set import OrderedSet as oset
 
 from keri.core import coring
@@ -27,6 +29,133 @@ class IndexRecord:
     paths: list
 
 
+def shardOf(caid, shards):
+    """
+    Returns the index of the shard owning the agent of a controller AID when an agency is split
+    into shards worker processes. Stable across processes and restarts.
+
+    Parameters:
+        caid (str): qb64 controller AID
+        shards (int): number of shards
+
+    Returns:
+        int: shard index in range(shards)
+    """
+    if shards <= 1:
+        return 0
+
+    dig = hashlib.blake2b(caid.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(dig, "big") % shards
+
+
+# Escrow and work queue sub databases of the keri Baser processed by the doers of an Agent
+KEL_ESCROWS = (
+    "ures",
+    "vres",
+    "pses",
+    "pwes",
+    "pdes",
+    "udes",
+    "uwes",
+    "ooes",
+    "ldes",
+    "qnfs",
+    "misfits",
+    "delegables",
+    "rpes",
+    "epse",
+    "epsd",
+    "eoobi",
+    "dpub",
+    "gpwe",
+    "gdee",
+    "gpse",
+    "dpwe",
+    "dune",
+    "oobis",
+    "coobi",
+    "moobi",
+    "woobi",
+    "mfa",
+)
+
+# Escrow sub databases of the keri Reger processed by the doers of an Agent
+TEL_ESCROWS = (
+    "oots",
+    "twes",
+    "taes",
+    "mre",
+    "mce",
+    "mse",
+    "cmse",
+    "tpwe",
+    "tmse",
+    "tede",
+    "txnsb.escrowdb",
+)
+
+
+def escrowed(db, names):
+    """
+    Returns the number of entries in the named sub databases of db read from the LMDB statistics
+    of each sub database, without iterating over the escrowed events.
+
+    Parameters:
+        db (LMDBer): database with the sub databases as attributes
+        names (Iterable[str]): attribute names of the sub databases, dotted for nested attributes
+
+    Returns:
+        int: total number of entries
+    """
+    count = 0
+    with db.env.begin() as txn:
+        for name in names:
+            sub = db
+            for attr in name.split("."):
+                sub = getattr(sub, attr, None)
+            if sub is None:
+                continue
+            count += txn.stat(getattr(sub, "sdb", sub))["entries"]
+
+    return count
+
+
+class LazyDB:
+    """
+    Stands in for an LMDBer that is created, and so opened, the first time any of its attributes are
+    used. Closing a LazyDB whose database was never opened does nothing.
+
+    """
+
+    def __init__(self, opener):
+        """
+        Parameters:
+            opener (Callable): creates and opens the LMDBer on first use
+        """
+        self._opener = opener
+        self._db = None
+
+    @property
+    def loaded(self):
+        """True means the underlying database has been created"""
+        return self._db is not None
+
+    def __getattr__(self, name):
+        if name.startswith("__"):
+            raise AttributeError(name)
+
+        if self._db is None:
+            self._db = self._opener()
+
+        return getattr(self._db, name)
+
+    def close(self, clear=False):
+        if self._db is None:
+            return True
+
+        return self._db.close(clear=clear)
+
+
 class AgencyBaser(dbing.LMDBer):
     """
     Agency database for tracking Agent tenants and their managed identifiers in this KERIA instance.
@@ -69,6 +198,9 @@ class AgencyBaser(dbing.LMDBer):
             .aids values are Prefixer of Controller AID (caid)
                 keyed by managed AID.
                 Maps managed AIDs to their Signify Controller AID (caid).
+            .acts values are ISO8601 datetime str
+                keyed by controller AID (caid).
+                Last recorded activity of the Agent of each controller, used for pre-warming.
 
         Notes:
             dupsort=True for sub DB means allow unique (key,pair) duplicates at a key.
@@ -86,6 +218,7 @@ class AgencyBaser(dbing.LMDBer):
         self.agnt = None
         self.ctrl = None
         self.aids = None
+        self.acts = None
 
         super(AgencyBaser, self).__init__(
             headDirPath=headDirPath, perm=perm, reopen=reopen, **kwa
@@ -110,8 +243,142 @@ class AgencyBaser(dbing.LMDBer):
         # Sub-database keyed by qb64 AID mapping to the Prefixer object of the AID of its Agent
         self.aids = subing.CesrSuber(db=self, subkey="aids.", klas=coring.Prefixer)
 
+        # Sub-database keyed by qb64 controller AID mapping to the ISO8601 time of the last activity of its Agent
+        self.acts = subing.Suber(db=self, subkey="acts.")
+
+
+class AgentStore(dbing.LMDBer):
+    """
+    Single LMDB environment shared by the KERIA owned stores of one Agent (Seeker, ExnSeeker,
+    Operator, RemoteKeeper and Noter) when the agency runs with the consolidated storage layout.
+    Each store keeps its named sub databases in this environment under its own Namespace so one
+    map, lock file and reader table serve them all.
+
+    """
+
+    TailDirPath = "keri/ags"
+    AltTailDirPath = ".keri/ags"
+    TempPrefix = "keri_ags_"
+    MaxNamedDBs = 1024
+    MapSize = 4 * dbing.LMDBer.MapSize
+
+    def __init__(self, headDirPath=None, perm=None, reopen=False, **kwa):
+        if perm is None:
+            perm = self.Perm  # defaults to restricted permissions for non temp
+
+        super(AgentStore, self).__init__(
+            headDirPath=headDirPath, perm=perm, reopen=reopen, **kwa
+        )
+
+
+class SubEnv:
+    """
+    View of a shared lmdb Environment that opens named sub databases with their name prefixed by a
+    namespace. Everything else is delegated to the shared Environment, except close which leaves
+    the shared Environment open for the other stores using it.
+
+    """
+
+    def __init__(self, env, namespace):
+        self.env = env
+        self.namespace = namespace.encode("utf-8")
+
+    def open_db(self, key=None, **kwa):
+        if key is not None:
+            key = self.namespace + key
+        return self.env.open_db(key=key, **kwa)
+
+    def close(self):
+        pass
+
+    def __getattr__(self, name):
+        return getattr(self.env, name)
+
+    def __bool__(self):
+        return True
+
+
+class SharedLMDBer(dbing.LMDBer):
+    """
+    LMDBer that opens in its own environment or, when given an AgentStore, as named sub databases
+    of the store's environment under the class Namespace.
+
+    Subclasses that open sub databases in .reopen must list SharedLMDBer after any other
+    LMDBer subclass they extend so the environment is chosen before sub databases are opened.
+
+    """
+
+    Namespace = ""
+
+    def __init__(self, store=None, **kwa):
+        """
+        Parameters:
+            store (AgentStore | None): shared environment to open in, None means open own environment
+        """
+        self.store = store
+        super(SharedLMDBer, self).__init__(**kwa)
+
+    def reopen(self, readonly=False, **kwa):
+        if self.store is None:
+            return super(SharedLMDBer, self).reopen(readonly=readonly, **kwa)
+
+        if not self.store.opened:
+            self.store.reopen()
+        self.readonly = True if readonly else False
+        self.env = SubEnv(self.store.env, f"{self.Namespace}:")
+        self.opened = True
+        return self.opened
+
+    def close(self, clear=False):
+        if self.store is None:
+            return super(SharedLMDBer, self).close(clear=clear)
+
+        self.env = None
+        self.opened = False
+        return self.opened
+
+
+def migrateStore(src, store, namespace):
+    """
+    Copies every named sub database of a store in the separate environment layout into an
+    AgentStore under namespace, keeping each sub database's dupsort flag.
+
+    Parameters:
+        src (LMDBer): opened store in its own environment
+        store (AgentStore): opened shared environment to copy into
+        namespace (str): Namespace of the store class
+
+    Returns:
+        int: number of entries copied
+    """
+    names = []
+    with src.env.begin() as txn:
+        for key, _ in txn.cursor():
+            names.append(bytes(key))
+
+    count = 0
+    for name in names:
+        try:
+            sdb = src.env.open_db(key=name, create=False)
+        except (
+            lmdb.IncompatibleError
+        ):  # plain key in the main database such as __version__
+            continue
+
+        with src.env.begin() as stxn:
+            dupsort = sdb.flags(stxn)["dupsort"]
+            ddb = store.env.open_db(
+                key=f"{namespace}:".encode("utf-8") + name, dupsort=dupsort
+            )
+            with store.env.begin(write=True) as dtxn:
+                for key, val in stxn.cursor(db=sdb):
+                    dtxn.put(key, val, db=ddb, dupdata=dupsort)
+                    count += 1
+
+    return count
+
 
-class Seeker(dbing.LMDBer):
+class Seeker(SharedLMDBer):
     """
     Seeker indexes all credentials in the KERIpy `saved` Creder database.
 
@@ -125,6 +392,7 @@ class Seeker(dbing.LMDBer):
     AltTailDirPath = ".keri/seekdb"
     TempPrefix = "keri_seekdb_"
     MaxNamedDBs = 500
+    Namespace = "seek"
 
     def __init__(self, db, reger, headDirPath=None, perm=None, reopen=False, **kwa):
         """
@@ -341,7 +609,7 @@ class Seeker(dbing.LMDBer):
         return Cursor(seeker=self, filtr=filtr, sort=sort, skip=skip, limit=limit)
 
 
-class ExnSeeker(dbing.LMDBer):
+class ExnSeeker(SharedLMDBer):
     """
     Seeker indexes all credentials in the KERIpy `saved` Creder database.
 
@@ -355,6 +623,7 @@ class ExnSeeker(dbing.LMDBer):
     AltTailDirPath = ".keri/exndb"
     TempPrefix = "keri_exndb_"
     MaxNamedDBs = 36
+    Namespace = "exn"
 
     DATE_FIELD = coring.Pather(path=["dt"])
     SENDER_FIELD = coring.Pather(path=["i"])
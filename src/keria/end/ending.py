@@ -11,6 +11,8 @@ import falcon
 from keri import kering
 from keri.end import ending
 
+from keria.core import httping
+
 
 def loadEnds(app, agency, default=None):
     end = OOBIEnd(agency=agency, default=default)
@@ -85,6 +87,7 @@ class OOBIEnd:
 
             aid = self.default
 
+        httping.checkLoading(self.agency, self.agency.locate(aid))
         agent = self.agency.lookup(pre=aid)
         if agent is None:
             raise falcon.HTTPNotFound(description="AID not found for this OOBI")
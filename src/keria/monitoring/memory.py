@@ -0,0 +1,37 @@
+# -*- encoding: utf-8 -*-
+"""
+KERIA
+keria.monitoring.memory module
+
+Process memory measurements used to keep the Agency within its memory budget
+"""
+
+import os
+import resource
+import sys
+
+
+def residentSetSize():
+    """
+    Returns the current resident set size (RSS) of this process in bytes.
+
+    Reads /proc/self/statm where available (Linux) and otherwise falls back to the peak RSS
+    reported by getrusage, which is an upper bound of the current RSS.
+
+    Returns:
+        int: resident set size in bytes or None if it cannot be determined
+    """
+    try:
+        with open("/proc/self/statm", "r") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+
+    try:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    except (OSError, ValueError):
+        return None
+
+    # ru_maxrss is in bytes on macOS and kilobytes everywhere else
+    return peak if sys.platform == "darwin" else peak * 1024
@@ -0,0 +1,264 @@
+# -*- encoding: utf-8 -*-
+"""
+KERIA
+keria.monitoring.metrics module
+
+Agency and agent metrics in the Prometheus text exposition format
+"""
+
+import threading
+import time
+from collections import Counter
+
+from hio.base import doing
+
+from keria.db import basing
+
+# Upper bounds in seconds of the latency histogram buckets
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Agent decks exported as keria_agent_deck_length
+AGENT_DECKS = (
+    "cues",
+    "exchanges",
+    "grants",
+    "admits",
+    "queries",
+    "witners",
+    "anchors",
+    "submits",
+)
+
+# Escrows exported as keria_agent_escrow_size, by database attribute of the agent and sub database name
+AGENT_ESCROWS = (
+    ("rgy.reger", "tpwe"),
+    ("rgy.reger", "tmse"),
+    ("rgy.reger", "tede"),
+    ("rgy.reger", "cmse"),
+    ("hby.db", "dpwe"),
+    ("hby.db", "dune"),
+)
+
+
+class Histogram:
+    """Cumulative histogram of observed durations, safe to observe from several threads"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        """
+        Parameters:
+            buckets (tuple[float]): ascending upper bounds of the buckets, +Inf is implied
+        """
+        self.buckets = tuple(buckets)
+        self.counts = [0] * len(self.buckets)
+        self.count = 0
+        self.sum = 0.0
+        self.lock = threading.Lock()
+
+    def observe(self, value):
+        with self.lock:
+            self.count += 1
+            self.sum += value
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    self.counts[i] += 1
+
+    def samples(self, name, labels=None):
+        """Returns the bucket, sum and count samples of the histogram named name"""
+        labels = dict(labels or {})
+        with self.lock:
+            samples = [
+                (f"{name}_bucket", dict(labels, le=str(bound)), count)
+                for bound, count in zip(self.buckets, self.counts)
+            ]
+            samples.append((f"{name}_bucket", dict(labels, le="+Inf"), self.count))
+            samples.append((f"{name}_sum", labels, self.sum))
+            samples.append((f"{name}_count", labels, self.count))
+        return samples
+
+
+class MeteredDoist(doing.Doist):
+    """Doist recording the duration of each pass over its doers"""
+
+    def __init__(self, ticks=None, **kwa):
+        """
+        Parameters:
+            ticks (Histogram): histogram of pass durations, a new one by default
+        """
+        self.ticks = ticks if ticks is not None else Histogram()
+        super(MeteredDoist, self).__init__(**kwa)
+
+    def recur(self, deeds=None):
+        start = time.perf_counter()
+        super(MeteredDoist, self).recur(deeds=deeds)
+        self.ticks.observe(time.perf_counter() - start)
+
+
+class Exposition:
+    """Writes metric families in the Prometheus text exposition format"""
+
+    def __init__(self):
+        self.lines = []
+
+    def family(self, name, kind, doc, samples):
+        """
+        Adds a metric family.
+
+        Parameters:
+            name (str): metric name
+            kind (str): counter, gauge or histogram
+            doc (str): help text
+            samples (Iterable): (name, labels, value) tuples, or (labels, value) to use the family name
+        """
+        self.lines.append(f"# HELP {name} {doc}")
+        self.lines.append(f"# TYPE {name} {kind}")
+        for sample in samples:
+            sname, labels, value = sample if len(sample) == 3 else (name, *sample)
+            if labels:
+                pairs = ",".join(
+                    f'{key}="{escape(val)}"' for key, val in labels.items()
+                )
+                self.lines.append(f"{sname}{{{pairs}}} {value}")
+            else:
+                self.lines.append(f"{sname} {value}")
+
+    def text(self):
+        return "\n".join(self.lines) + "\n"
+
+
+def escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def resolve(obj, path):
+    for attr in path.split("."):
+        obj = getattr(obj, attr)
+    return obj
+
+
+def agencyMetrics(agency):
+    """
+    Collects the metrics of an agency and its resident agents.
+
+    Parameters:
+        agency (Agency): agency to report on
+
+    Returns:
+        str: metrics in the Prometheus text exposition format
+    """
+    out = Exposition()
+    agents = list(agency.agents.values())
+
+    out.family(
+        "keria_agents_resident",
+        "gauge",
+        "Number of agents resident in memory",
+        [({}, len(agents))],
+    )
+    out.family(
+        "keria_agents_quiescent",
+        "gauge",
+        "Number of resident agents taken off the scheduler while idle",
+        [({}, sum(1 for agent in agents if agent.quiescent))],
+    )
+    out.family(
+        "keria_agents_loading",
+        "gauge",
+        "Number of agents loading in the background",
+        [({}, len(agency.loads))],
+    )
+    out.family(
+        "keria_agent_lookups_total",
+        "counter",
+        "Agent lookups by result",
+        [
+            (dict(result="hit"), agency.hits),
+            (dict(result="miss"), agency.misses),
+        ],
+    )
+    out.family(
+        "keria_agent_evictions_total",
+        "counter",
+        "Agents released to stay within the resident agent or memory limits",
+        [({}, agency.evictions)],
+    )
+    out.family(
+        "keria_agent_load_seconds",
+        "histogram",
+        "Time to open the databases of an agent and create it",
+        agency.loadTimes.samples("keria_agent_load_seconds"),
+    )
+    out.family(
+        "keria_doist_tick_seconds",
+        "histogram",
+        "Time of one pass of the scheduler over all doers",
+        agency.ticks.samples("keria_doist_tick_seconds"),
+    )
+
+    decks = []
+    ingress = []
+    escrows = []
+    passes = []
+    seconds = []
+    ops = []
+    for agent in agents:
+        for deck in AGENT_DECKS:
+            decks.append((dict(agent=agent.caid, deck=deck), len(getattr(agent, deck))))
+        ingress.append((dict(agent=agent.caid), len(agent.ingress)))
+
+        for path, name in AGENT_ESCROWS:
+            escrows.append(
+                (
+                    dict(agent=agent.caid, escrow=name),
+                    basing.escrowed(resolve(agent, path), (name,)),
+                )
+            )
+
+        for family, stats in agent.escrower.stats().items():
+            labels = dict(agent=agent.caid, family=family)
+            passes.append((labels, stats["passes"]))
+            seconds.append((labels, stats["seconds"]))
+
+        opr = agent.monitor.opr
+        if getattr(opr, "loaded", True):  # do not open the operations of lazy agents
+            types = Counter(op.type for _, op in opr.ops.getItemIter())
+            for kind, count in sorted(types.items()):
+                ops.append((dict(agent=agent.caid, type=kind), count))
+
+    out.family(
+        "keria_agent_deck_length",
+        "gauge",
+        "Number of messages queued on an agent deck",
+        decks,
+    )
+    out.family(
+        "keria_agent_ingress_bytes",
+        "gauge",
+        "Bytes of received CESR queued for the parser of an agent",
+        ingress,
+    )
+    out.family(
+        "keria_agent_escrow_size",
+        "gauge",
+        "Number of entries in an agent escrow",
+        escrows,
+    )
+    out.family(
+        "keria_agent_escrow_passes_total",
+        "counter",
+        "Number of passes over a non empty escrow family of an agent",
+        passes,
+    )
+    out.family(
+        "keria_agent_escrow_seconds_total",
+        "counter",
+        "Time spent processing an escrow family of an agent",
+        seconds,
+    )
+    out.family(
+        "keria_agent_operations",
+        "gauge",
+        "Number of long running operations of an agent by type",
+        ops,
+    )
+
+    return out.text()
@@ -0,0 +1,245 @@
+# -*- encoding: utf-8 -*-
+"""
+KERIA
+keria.peer.posting module
+
+Agency wide pool of outbound HTTP connections for delivering CESR messages to peers
+"""
+
+import random
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from urllib.parse import urlparse
+
+from hio.base import doing
+from hio.core import http
+from hio.help import Hict
+from keri import kering
+from keri.app import agenting, forwarding, httping
+from keri.help import ogler
+from ordered_set import OrderedSet as oset
+
+logger = ogler.getLogger()
+
+
+@dataclass
+class Delivery:
+    """CESR messages for one destination waiting to be PUT to an endpoint"""
+
+    dest: str
+    body: bytearray
+    headers: dict = field(default_factory=dict)
+    count: int = 1
+
+
+class Channel:
+    """Persistent HTTP connection to an endpoint carrying one request at a time"""
+
+    def __init__(self, scheme, hostname, port):
+        self.client = http.clienting.Client(
+            scheme=scheme, hostname=hostname, port=port, portOptional=True
+        )
+        self.doer = http.clienting.ClientDoer(client=self.client)
+        self.delivery = None
+        self.started = 0.0
+        self.used = time.monotonic()
+
+    @property
+    def busy(self):
+        return self.delivery is not None
+
+    def send(self, delivery):
+        headers = Hict(
+            [
+                ("Content-Type", "application/cesr"),
+                ("Content-Length", len(delivery.body)),
+                (httping.CESR_DESTINATION_HEADER, delivery.dest),
+            ]
+            + list(delivery.headers.items())
+        )
+        self.client.request(
+            method="PUT", path="/", headers=headers, body=bytes(delivery.body)
+        )
+        self.delivery = delivery
+        self.started = time.monotonic()
+
+
+class Outbox(doing.DoDoer):
+    """
+    Delivers CESR messages over HTTP connections kept open per endpoint and shared by all agents.
+    Messages for the same destination queued behind a busy endpoint are sent together in one request.
+
+    Attributes:
+        .queues (dict): Deliveries waiting for a connection keyed by endpoint (scheme, host, port)
+        .channels (dict): open Channels keyed by endpoint
+        .sent (int): number of requests sent
+        .merged (int): number of messages sent in the request of an earlier message
+    """
+
+    def __init__(self, connections=4, batch=262144, timeout=30.0, idle=60.0, **kwa):
+        """
+        Parameters:
+            connections (int): maximum concurrent connections to each endpoint
+            batch (int): maximum bytes of messages merged into one request
+            timeout (float): seconds to wait on a response before dropping the connection
+            idle (float): seconds an unused connection is kept open
+        """
+        self.connections = max(connections, 1)
+        self.batch = batch
+        self.timeout = timeout
+        self.idle = idle
+        self.queues = dict()
+        self.channels = dict()
+        self.sent = 0
+        self.merged = 0
+        super(Outbox, self).__init__(always=True, **kwa)
+
+    def deliver(self, pre, urls, msg, headers=None):
+        """
+        Queues msg for the endpoint of pre in urls.
+
+        Parameters:
+            pre (str): qb64 identifier prefix of the recipient
+            urls (dict): endpoint URLs of the recipient keyed by scheme
+            msg (bytes): CESR messages
+            headers (dict | None): extra HTTP headers
+
+        Returns:
+            bool: False means urls has no HTTP endpoint to deliver to
+        """
+        url = urls.get(kering.Schemes.http) or urls.get(kering.Schemes.https)
+        if url is None:
+            return False
+
+        up = urlparse(url)
+        endpoint = (up.scheme, up.hostname, up.port)
+        headers = dict(headers) if headers else {}
+        queue = self.queues.setdefault(endpoint, deque())
+        for delivery in queue:
+            if (
+                delivery.dest == pre
+                and delivery.headers == headers
+                and len(delivery.body) + len(msg) <= self.batch
+            ):
+                delivery.body.extend(msg)
+                delivery.count += 1
+                self.merged += 1
+                return True
+
+        queue.append(Delivery(dest=pre, body=bytearray(msg), headers=headers))
+        return True
+
+    def recur(self, tyme, deeds=None):
+        now = time.monotonic()
+        for endpoint, channels in list(self.channels.items()):
+            for channel in list(channels):
+                self.service(endpoint, channel, now)
+
+        for endpoint, queue in self.queues.items():
+            channels = self.channels.setdefault(endpoint, [])
+            for channel in channels:
+                if not queue:
+                    break
+                if not channel.busy:
+                    self.send(channel, queue.popleft())
+
+            while queue and len(channels) < self.connections:
+                channel = Channel(*endpoint)
+                self.extend([channel.doer])
+                channels.append(channel)
+                self.send(channel, queue.popleft())
+
+        self.queues = {
+            endpoint: queue for endpoint, queue in self.queues.items() if queue
+        }
+        return super(Outbox, self).recur(tyme, deeds)
+
+    def send(self, channel, delivery):
+        channel.send(delivery)
+        self.sent += 1
+
+    def service(self, endpoint, channel, now):
+        """Collects the response of channel and closes it once timed out, cut off or idle"""
+        if channel.busy and channel.client.responses:
+            rep = channel.client.respond()
+            if rep.status >= 400:
+                logger.info(
+                    "Delivery of %s messages to %s at %s failed with %s",
+                    channel.delivery.count,
+                    channel.delivery.dest,
+                    endpoint[1],
+                    rep.status,
+                )
+            channel.delivery = None
+            channel.used = now
+
+        if channel.busy:
+            if now - channel.started < self.timeout:
+                return
+            logger.info(
+                "Delivery of %s messages to %s at %s timed out",
+                channel.delivery.count,
+                channel.delivery.dest,
+                endpoint[1],
+            )
+        elif not channel.client.connector.cutoff and now - channel.used < self.idle:
+            return
+
+        self.remove([channel.doer])
+        self.channels[endpoint].remove(channel)
+        if not self.channels[endpoint]:
+            del self.channels[endpoint]
+
+
+class PooledPoster(forwarding.StreamPoster):
+    """StreamPoster delivering through the connections of an Outbox instead of one connection per message"""
+
+    def __init__(self, hby, recp, outbox, **kwa):
+        """
+        Parameters:
+            hby (Habery): Habery of the sending agent
+            recp (str): qb64 identifier prefix of the recipient
+            outbox (Outbox): agency wide outbound connections
+        """
+        self.outbox = outbox
+        super(PooledPoster, self).__init__(hby=hby, recp=recp, **kwa)
+
+    def sendDirect(self, hab, ends, msg):
+        for ctrl, locs in ends.items():
+            if not self.outbox.deliver(
+                pre=ctrl, urls=locs, msg=msg, headers=self.headers
+            ):
+                self.messagers.append(
+                    agenting.streamMessengerFrom(
+                        hab=hab, pre=ctrl, urls=locs, msg=msg, headers=self.headers
+                    )
+                )
+        return self.messagers
+
+    def forward(self, hab, ends, msg, topic):
+        # If we are one of the mailboxes, just store locally in mailbox
+        owits = oset(ends.keys())
+        if self.mbx and owits.intersection(hab.prefixes):
+            self.mbx.storeMsg(topic=f"{self.recp}/{topic}".encode("utf-8"), msg=msg)
+            return []
+
+        # Its not us, randomly select a mailbox and forward it on
+        mbx, mailbox = random.choice(list(ends.items()))
+        ims = bytearray()
+        ims.extend(forwarding.introduce(hab, mbx))
+        ims.extend(msg)
+        if not self.outbox.deliver(pre=mbx, urls=mailbox, msg=bytes(ims)):
+            self.messagers.append(
+                agenting.streamMessengerFrom(
+                    hab=hab, pre=mbx, urls=mailbox, msg=bytes(ims)
+                )
+            )
+        return self.messagers
+
+
+def poster(hby, recp, outbox=None, **kwa):
+    """Returns a PooledPoster on outbox, or a StreamPoster when outbox is None"""
+    if outbox is None:
+        return forwarding.StreamPoster(hby=hby, recp=recp, **kwa)
+    return PooledPoster(hby=hby, recp=recp, outbox=outbox, **kwa)
@@ -6,13 +6,18 @@ keria.app.agenting module
 Testing the Mark II Agent (KERIA)
 """
 
+import datetime
 import json
 import multiprocessing
 import os
 import shutil
 import signal
+import socket
+import ssl
+import threading
 import time
 from base64 import b64encode
+from types import SimpleNamespace
 
 import falcon
 import hio
@@ -26,14 +31,16 @@ from keri import core
 from keri import kering
 from keri.app import habbing, configing, indirecting, oobiing, querying
 from keri.app.agenting import Receiptor, WitnessReceiptor
-from keri.core import serdering
-from keri.core.coring import MtrDex
+from keri.core import coring, serdering
+from keri.core.coring import Ilks, MtrDex
 from keri.db import basing, dbing
 from keri.help import nowIso8601
+from keri.peer import exchanging
 from keri.vdr import credentialing
 
-from keria.app import agenting, aiding
+from keria.app import agenting, aiding, serving
 from keria.core import longrunning, httping
+from keria.monitoring import metrics
 from keria.testing.testing_helper import SCRIPTS_DIR
 
 
@@ -62,6 +69,127 @@ def test_setup():
     assert len(doers) == 4
 
 
+def test_setup_threaded():
+    ports = []
+    for _ in range(2):
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            ports.append(sock.getsockname()[1])
+    config = agenting.KERIAServerConfig(
+        name="test",
+        adminPort=ports[0],
+        bootPort=ports[1],
+        httpPort=None,
+        serverThreads=2,
+    )
+    agency = agenting.createAgency(config, temp=True, cf=None)
+    doers = agenting.setupDoers(agency, config)
+    assert len(doers) == 4
+    dispatcher = doers[-1]
+    assert isinstance(dispatcher, agenting.Dispatcher)
+
+    # Requests are read on server threads and answered by the app on the Doist
+    assert agenting.agencyDoist(list(doers), idleTock=0.25).wakers == [dispatcher.waker]
+    doist = agenting.AdaptiveDoist(
+        wakers=[dispatcher.waker], maxTock=0.25, tock=0.03125
+    )
+    doist.extend(doers[1:])
+    replies = []
+    thread = threading.Thread(
+        target=lambda: replies.append(
+            requests.get(f"http://127.0.0.1:{ports[1]}/health", timeout=5)
+        )
+    )
+    thread.start()
+    start = time.monotonic()
+    while not replies and time.monotonic() - start < 5.0:
+        doist.recur()
+        doist.pause(time.monotonic())
+    thread.join()
+    assert replies[0].status_code == 200
+    assert dispatcher.handled == 1
+    doist.exit()
+
+
+class StalledTLS:
+    """TLS context whose clients never finish their handshake"""
+
+    def __init__(self):
+        self.calls = []
+
+    def wrap_socket(self, sock, server_side=False, do_handshake_on_connect=True):
+        assert server_side and not do_handshake_on_connect
+        return self
+
+    def settimeout(self, timeout):
+        self.calls.append(("settimeout", timeout))
+
+    def do_handshake(self):
+        raise socket.timeout("handshake timed out")
+
+    def shutdown(self, how):
+        self.calls.append(("shutdown", how))
+
+    def close(self):
+        self.calls.append(("close",))
+
+
+def test_threaded_handshake():
+    handled = []
+    context = StalledTLS()
+    server = serving.ThreadedServer(
+        0,
+        lambda environ, start: handled.append(environ),
+        workers=1,
+        context=context,
+        handshakeTimeout=0.5,
+    )
+
+    # The handshake runs on the worker thread with a timeout, not in accept()
+    assert not isinstance(server.socket, ssl.SSLSocket)
+    left, right = socket.socketpair()
+    try:
+        server.process_request_thread(left, ("127.0.0.1", 1))
+    finally:
+        server.server_close()
+        left.close()
+        right.close()
+
+    assert context.calls == [
+        ("settimeout", 0.5),
+        ("shutdown", socket.SHUT_WR),
+        ("close",),
+    ]
+    assert handled == []
+
+
+def test_threaded_idle():
+    def app(environ, start_response):
+        start_response("200 OK", [("Content-Length", "2")])
+        return [b"ok"]
+
+    server = serving.ThreadedServer(0, app, workers=1, idleTimeout=0.25)
+    port = server.server_address[1]
+    threading.Thread(
+        target=server.serve_forever, kwargs=dict(poll_interval=0.05), daemon=True
+    ).start()
+
+    # An idle connection holding the only worker is closed so the next request is served
+    idle = socket.create_connection(("127.0.0.1", port))
+    try:
+        time.sleep(0.05)
+        start = time.monotonic()
+        res = requests.get(f"http://127.0.0.1:{port}/", timeout=5)
+        assert res.status_code == 200
+        assert time.monotonic() - start < 2.0
+        idle.settimeout(1.0)
+        assert idle.recv(10) == b""
+    finally:
+        idle.close()
+        server.shutdown()
+        server.server_close()
+
+
 def wait_for_server(port, timeout=10):
     """Poll server until it responds or until timeout"""
     url = f"http://127.0.0.1:{port}/health"
@@ -168,6 +296,257 @@ def test_graceful_shutdown_doer():
         assert len(agency.agents) == 0, "Agents not shut down as expected."
 
 
+def test_adaptive_doist():
+    server = http.Server(host="127.0.0.1", port=5678, app=falcon.App())
+    assert server.reopen()
+    doist = agenting.AdaptiveDoist(
+        servers=[server], busy=lambda: False, maxTock=0.25, tock=0.03125
+    )
+    assert doist.sockets() == [server.servant.ss]
+    assert doist.active() is False
+
+    # Idle passes back off up to maxTock
+    for _ in range(5):
+        assert doist.pause(time.monotonic()) is False
+    assert doist.idleTock == 0.25
+
+    # A connection wakes the pause early and resets the idle tock
+    sock = socket.create_connection(("127.0.0.1", 5678))
+    try:
+        start = time.monotonic()
+        assert doist.pause(time.monotonic()) is True
+        assert time.monotonic() - start < 0.25
+        assert doist.idleTock == doist.tock
+    finally:
+        sock.close()
+        server.close()
+
+    # Busy agencies run every tock
+    doist = agenting.AdaptiveDoist(busy=lambda: True, maxTock=0.25, tock=0.03125)
+    doist.pause(time.monotonic())
+    assert doist.idleTock == doist.tock
+
+    doers = [doing.Doer(tock=0.0)]
+    doist = agenting.agencyDoist(doers, idleTock=0.25)
+    assert isinstance(doist, agenting.AdaptiveDoist)
+    assert isinstance(agenting.agencyDoist(doers), metrics.MeteredDoist)
+    doist.do(doers=doers, limit=0.2)
+    assert doist.tyme >= 0.2
+
+
+def test_agency_drain():
+    salter = core.Salter(raw=b"0123456789dddddd")
+    agency = agenting.Agency(
+        name="agency", bran=None, temp=True, configDir=SCRIPTS_DIR, closeWorkers=2
+    )
+    doist = doing.Doist(limit=1.0, tock=0.03125, real=True)
+    doist.enter(doers=[agency])
+
+    caids = [
+        "ELI7pg979AdhmvrjDeam2eAO2SR5niCgnjAJXJHtDra1",
+        "ELI7pg979AdhmvrjDeam2eAO2SR5niCgnjAJXJHtDra2",
+    ]
+    agents = [agency.create(caid, salt=salter.qb64) for caid in caids]
+    for _ in range(5):
+        doist.recur()
+
+    # Agents with queued work keep running while requests are refused
+    agents[0].groups.append(dict(sn=0))
+    agency.shouldShutdown = True
+    agency.shutdownAgency()
+    assert agency.draining is True
+    assert len(agency.agents) == 2
+    with pytest.raises(falcon.HTTPServiceUnavailable) as ex:
+        httping.checkLoading(agency, None)
+    assert ex.value.title == "Agency draining"
+
+    # Once flushed all agents are closed in parallel
+    agents[0].groups.clear()
+    agency.shutdownAgency()
+    assert len(agency.agents) == 0
+    for agent in agents:
+        assert agent.hby.db.opened is False
+        assert agent.rgy.reger.opened is False
+    agency.adb.close(clear=True)
+
+
+def test_agency_close_timeout():
+    salter = core.Salter(raw=b"0123456789cccccc")
+    agency = agenting.Agency(
+        name="agency", bran=None, temp=True, configDir=SCRIPTS_DIR, closeTimeout=0.2
+    )
+    doist = doing.Doist(limit=1.0, tock=0.03125, real=True)
+    doist.enter(doers=[agency])
+    agent = agency.create(
+        "ELI7pg979AdhmvrjDeam2eAO2SR5niCgnjAJXJHtClo1", salt=salter.qb64
+    )
+
+    # A database that never closes does not hold up shutdown past the timeout
+    stuck = threading.Event()
+    close = agent.closeDatabases
+    agent.closeDatabases = stuck.wait
+    start = time.monotonic()
+    agency.closeAgents()
+    assert time.monotonic() - start < 1.0
+    assert len(agency.agents) == 0
+    assert all(
+        thread.daemon
+        for thread in threading.enumerate()
+        if thread.name.startswith("agent-closer")
+    )
+
+    stuck.set()
+    close()
+    agency.adb.close(clear=True)
+
+
+def test_escrower_changes():
+    salter = core.Salter(raw=b"0123456789eeeeee")
+    agency = agenting.Agency(
+        name="agency", bran=None, temp=True, configDir=SCRIPTS_DIR, escrowDeadline=5.0
+    )
+    doist = doing.Doist(limit=1.0, tock=0.03125, real=True)
+    doist.enter(doers=[agency])
+    caid = "ELI7pg979AdhmvrjDeam2eAO2SR5niCgnjAJXJHtEsc1"
+    agent = agency.create(caid, salt=salter.qb64)
+
+    escrower = next(doer for doer in agent.doers if isinstance(doer, agenting.Escrower))
+    processed = []
+    for family in escrower.families:
+        family.process = lambda name=family.name: processed.append(name)
+
+    # Empty escrows are never processed
+    escrower.recur(tyme=0.0)
+    assert processed == []
+
+    # A new escrow entry changes the database
+    agent.hby.db.qnfs.add(keys=(caid, "dig"), val="msg")
+    escrower.recur(tyme=0.0)
+    assert processed == ["kel"]
+    escrower.recur(tyme=0.0)
+    assert processed == ["kel"]
+
+    # as does any other write such as an event unblocking the escrow
+    agent.hby.db.qnfs.add(keys=(caid, "dig"), val="other")
+    escrower.recur(tyme=0.0)
+    assert processed == ["kel", "kel"]
+
+    # Unchanged escrows are processed again at their deadline
+    kel = escrower.families[0]
+    kel.checked -= 5.0
+    escrower.recur(tyme=0.0)
+    assert processed == ["kel", "kel", "kel"]
+
+    agency.release(agent)
+    agency.adb.close(clear=True)
+
+
+def test_escrower_schedule():
+    salter = core.Salter(raw=b"0123456789ssssss")
+    agency = agenting.Agency(name="agency", bran=None, temp=True, configDir=SCRIPTS_DIR)
+    doist = doing.Doist(limit=1.0, tock=0.03125, real=True)
+    doist.enter(doers=[agency])
+    caid = "ELI7pg979AdhmvrjDeam2eAO2SR5niCgnjAJXJHtEsc2"
+    agent = agency.create(caid, salt=salter.qb64)
+
+    # The delegation escrows of the Anchorer are scheduled by the Escrower
+    assert len(agent.swain.doers) == 3
+    assert "delegationWitness" in agent.escrower.stats()
+
+    escrower = agenting.Escrower(
+        kvy=agent.kvy,
+        rgy=agent.rgy,
+        rvy=agent.rvy,
+        tvy=agent.tvy,
+        exc=agent.exc,
+        vry=agent.verifier,
+        registrar=agent.registrar,
+        credentialer=agent.credentialer,
+        swain=agent.swain,
+        deadline=30.0,
+        schedule={"kel": {"interval": 1.0, "backoff": 2.0}},
+    )
+    kel = escrower.families[0]
+    assert (kel.interval, kel.backoff) == (1.0, 2.0)
+    assert all(family.backoff == 30.0 for family in escrower.families[1:])
+    kel.process = lambda: None
+
+    agent.hby.db.qnfs.add(keys=(caid, "dig"), val="msg")
+    escrower.recur(tyme=0.0)
+    assert escrower.stats()["kel"]["passes"] == 1
+
+    # Changes are processed at most once per interval
+    agent.hby.db.qnfs.add(keys=(caid, "dig"), val="other")
+    escrower.recur(tyme=0.0)
+    assert escrower.stats()["kel"]["passes"] == 1
+    kel.checked -= 1.0
+    escrower.recur(tyme=0.0)
+    assert escrower.stats()["kel"]["passes"] == 2
+
+    # Unchanged escrows back off exponentially up to their backoff
+    assert kel.delay == 1.0
+    kel.checked -= 1.0
+    escrower.recur(tyme=0.0)
+    assert escrower.stats()["kel"]["passes"] == 3
+    assert kel.delay == 2.0
+    kel.checked -= 1.0
+    escrower.recur(tyme=0.0)
+    assert escrower.stats()["kel"]["passes"] == 3
+    kel.checked -= 1.0
+    escrower.recur(tyme=0.0)
+    assert escrower.stats()["kel"]["passes"] == 4
+    assert kel.delay == 2.0
+    assert escrower.stats()["kel"]["seconds"] >= 0.0
+    assert escrower.stats()["reply"] == dict(passes=0, seconds=0.0)
+
+    agency.release(agent)
+    agency.adb.close(clear=True)
+
+
+def test_metrics_end():
+    salter = core.Salter(raw=b"0123456789mmmmmm")
+    agency = agenting.Agency(name="agency", bran=None, temp=True, configDir=SCRIPTS_DIR)
+    doist = metrics.MeteredDoist(ticks=agency.ticks, limit=1.0, tock=0.03125)
+    doist.enter(doers=[agency])
+
+    caid = "ELI7pg979AdhmvrjDeam2eAO2SR5niCgnjAJXJHtMtr1"
+    agent = agency.create(caid, salt=salter.qb64)
+    agent.exchanges.append(dict(said="x"))
+    agent.monitor.opr.ops.pin(
+        keys=("oobi.1",),
+        val=longrunning.Op(oid="1", type="oobi", start=nowIso8601(), metadata={}),
+    )
+    doist.recur()
+    assert agency.ticks.count == 1
+
+    app = falcon.App()
+    app.add_route("/metrics", agenting.MetricsEnd(agency))
+    client = testing.TestClient(app)
+
+    res = client.simulate_get("/metrics")
+    assert res.status_code == 200
+    assert res.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+    lines = res.text.splitlines()
+    assert "# TYPE keria_agents_resident gauge" in lines
+    assert "keria_agents_resident 1" in lines
+    assert "keria_doist_tick_seconds_count 1" in lines
+    assert f'keria_agent_deck_length{{agent="{caid}",deck="exchanges"}} 1' in lines
+    assert f'keria_agent_escrow_size{{agent="{caid}",escrow="tpwe"}} 0' in lines
+    assert f'keria_agent_operations{{agent="{caid}",type="oobi"}} 1' in lines
+    assert f'keria_agent_escrow_passes_total{{agent="{caid}",family="kel"}} 0' in lines
+
+    assert "keria_agent_load_seconds_count 0" in lines  # created, not loaded
+
+    agency.loadTimes.observe(0.02)
+    lines = client.simulate_get("/metrics").text.splitlines()
+    assert 'keria_agent_load_seconds_bucket{le="0.01"} 0' in lines
+    assert 'keria_agent_load_seconds_bucket{le="0.025"} 1' in lines
+    assert 'keria_agent_load_seconds_bucket{le="+Inf"} 1' in lines
+    assert "keria_agent_load_seconds_sum 0.02" in lines
+
+    agency.release(agent)
+
+
 def test_load_ends(helpers):
     with helpers.openKeria() as (agency, agent, app, client):
         agenting.loadEnds(app=app)
@@ -415,6 +794,362 @@ def test_agency_with_urls_from_arguments():
         assert agent.hby.cf.get()["durls"] == durls
 
 
+def test_agency_lru_release():
+    salt = b"0123456789eeeeee"
+    salter = core.Salter(raw=salt)
+
+    agency = agenting.Agency(
+        name="agency",
+        base="",
+        bran=None,
+        temp=True,
+        configDir=SCRIPTS_DIR,
+        maxAgents=2,
+    )
+    doist = doing.Doist(limit=1.0, tock=0.03125, real=True)
+    doist.enter(doers=[agency])
+
+    caids = [
+        "ELI7pg979AdhmvrjDeam2eAO2SR5niCgnjAJXJHtLru1",
+        "ELI7pg979AdhmvrjDeam2eAO2SR5niCgnjAJXJHtLru2",
+        "ELI7pg979AdhmvrjDeam2eAO2SR5niCgnjAJXJHtLru3",
+    ]
+    first = agency.create(caids[0], salt=salter.qb64)
+    agency.create(caids[1], salt=salter.qb64)
+    assert list(agency.agents.keys()) == caids[:2]
+
+    # Touching the first agent makes the second the least recently used
+    assert agency.get(caids[0]) is first
+    assert agency.hits == 1
+    assert list(agency.agents.keys()) == [caids[1], caids[0]]
+
+    released = agency.agents[caids[1]]
+    agency.create(caids[2], salt=salter.qb64)
+    assert list(agency.agents.keys()) == [caids[0], caids[2]]
+    assert agency.evictions == 1
+    assert released not in agency.doers
+    assert len(released.doers) == 0
+    assert released.hby.db.opened is False
+
+    # A memory budget below the current RSS releases one agent per pass but never the last one
+    agency.memoryBudget = 1
+    assert agency.evict() == 1
+    assert list(agency.agents.keys()) == [caids[2]]
+    assert agency.evict() == 0
+    assert agency.evictions == 2
+
+
+def test_agency_async_load(monkeypatch):
+    salt = b"0123456789ffffff"
+    salter = core.Salter(raw=salt)
+    base = "keria-async"
+
+    def clean():
+        for kind in ("db", "ks", "adb", "reg"):
+            if os.path.exists(f"/usr/local/var/keri/{kind}/{base}"):
+                shutil.rmtree(f"/usr/local/var/keri/{kind}/{base}")
+
+    clean()
+    agency = agenting.Agency(name="agency", base=base, bran=None, configDir=SCRIPTS_DIR)
+    doist = doing.Doist(limit=1.0, tock=0.03125, real=True)
+    doist.enter(doers=[agency])
+
+    caid = "ELI7pg979AdhmvrjDeam2eAO2SR5niCgnjAJXJHtLasy"
+    agent = agency.create(caid, salt=salter.qb64)
+    pre = agent.pre
+    agency.release(agent)
+
+    # Recreate the agency loading agents in the background
+    agency = agenting.Agency(
+        name="agency",
+        base=base,
+        bran=None,
+        configDir=SCRIPTS_DIR,
+        asyncLoad=True,
+        loadWorkers=1,
+        retryAfter=2,
+    )
+    doist.enter(doers=[agency])
+
+    # Hold the background load open until the in-flight behaviour has been checked
+    gate = threading.Event()
+    load = agency._load
+    monkeypatch.setattr(agency, "_load", lambda c, a: gate.wait(30) and load(c, a))
+
+    assert agency.loading("E987eerAdhmvrjDeam2eAO2SR5niCgnjAJXJHtJoe") is False
+    assert agency.loading(caid) is True
+    future = agency.loads[caid]
+    assert agency.loading(caid) is True  # concurrent requests share the in-flight load
+    assert agency.loads[caid] is future
+    assert agency.misses == 1
+
+    with pytest.raises(falcon.HTTPServiceUnavailable) as ex:
+        httping.checkLoading(agency, caid)
+    assert ex.value.headers["Retry-After"] == "2"
+
+    gate.set()
+    future.result(timeout=30)
+    agency.collect()
+    assert agency.loads == {}
+    assert agency.agents[caid].pre == pre
+    assert agency.agents[caid] in agency.doers
+    assert agency.loading(caid) is False
+    assert agency.get(caid) is agency.agents[caid]
+    assert agency.hits == 1
+
+    agency.release(agency.agents[caid])
+    clean()
+
+
+def test_agent_lazy():
+    salt = b"0123456789gggggg"
+    salter = core.Salter(raw=salt)
+
+    agency = agenting.Agency(
+        name="agency", base="", bran=None, temp=True, configDir=SCRIPTS_DIR, lazy=True
+    )
+    doist = doing.Doist(limit=1.0, tock=0.03125, real=True)
+    doist.enter(doers=[agency])
+
+    caid = "ELI7pg979AdhmvrjDeam2eAO2SR5niCgnjAJXJHtLazy"
+    agent = agency.create(caid, salt=salter.qb64)
+
+    lazies = [
+        agent.seeker,
+        agent.exnseeker,
+        agent.rep.mbx,
+        agent.monitor.opr,
+        agent.notifier.noter,
+    ]
+    assert all(not db.loaded for db in lazies)
+    assert [type(doer) for _, doer in agent.deferred] == [
+        agenting.Granter,
+        agenting.Admitter,
+        agenting.GroupRequester,
+        agenting.SeekerDoer,
+        agenting.ExchangeCueDoer,
+    ]
+    assert not any(doer in agent.doers for _, doer in agent.deferred)
+
+    # First use opens the database
+    assert agent.monitor.get("unknown.op") is None
+    assert agent.monitor.opr.loaded
+    assert agent.monitor.opr.opened
+
+    # A doer starts when its cue deck receives work
+    admitter = agent.deferred[1][1]
+    agent.admits.append(dict(said="EAdmit"))
+    agent.startDeferred()
+    assert admitter in agent.doers
+    assert len(agent.deferred) == 4
+
+    agency.release(agent)
+    assert not agent.monitor.opr.opened
+    assert not agent.seeker.loaded
+
+
+def test_agent_shared_store():
+    salt = b"0123456789hhhhhh"
+    salter = core.Salter(raw=salt)
+
+    agency = agenting.Agency(
+        name="agency", base="", bran=None, temp=True, configDir=SCRIPTS_DIR, shared=True
+    )
+    doist = doing.Doist(limit=1.0, tock=0.03125, real=True)
+    doist.enter(doers=[agency])
+
+    caid = "ELI7pg979AdhmvrjDeam2eAO2SR5niCgnjAJXJHtShrd"
+    agent = agency.create(caid, salt=salter.qb64)
+
+    for db in (
+        agent.seeker,
+        agent.exnseeker,
+        agent.monitor.opr,
+        agent.notifier.noter,
+        agent.mgr.rb,
+    ):
+        assert db.store is agent.store
+        assert db.env.env is agent.store.env
+
+    agency.release(agent)
+    assert agent.store.opened is False
+    assert agent.mgr.rb.env is None
+
+
+def test_agency_prewarm():
+    salter = core.Salter(raw=b"0123456789kkkkkk")
+    base = "keria-prewarm"
+
+    def clean():
+        for kind in ("db", "ks", "adb", "reg", "rks", "seekdb", "exndb", "opr", "not"):
+            if os.path.exists(f"/usr/local/var/keri/{kind}/{base}"):
+                shutil.rmtree(f"/usr/local/var/keri/{kind}/{base}")
+
+    clean()
+    agency = agenting.Agency(name="agency", base=base, bran=None, configDir=SCRIPTS_DIR)
+    doist = doing.Doist(limit=1.0, tock=0.03125, real=True)
+    doist.enter(doers=[agency])
+
+    caids = [
+        "ELI7pg979AdhmvrjDeam2eAO2SR5niCgnjAJXJHtWrm1",
+        "ELI7pg979AdhmvrjDeam2eAO2SR5niCgnjAJXJHtWrm2",
+        "ELI7pg979AdhmvrjDeam2eAO2SR5niCgnjAJXJHtWrm3",
+    ]
+    for caid in caids:
+        agent = agency.create(caid, salt=salter.qb64)
+        assert agency.adb.acts.get(keys=(caid,)) is not None
+
+    # Activity is persisted at most once per activityInterval
+    last = agency.adb.acts.get(keys=(caids[0],))
+    agency.get(caids[0])
+    assert agency.adb.acts.get(keys=(caids[0],)) == last
+
+    for caid, last in zip(caids, ("2025-01-02", "2025-01-03", "2025-01-01")):
+        agency.release(agency.agents[caid])
+        agency.adb.acts.pin(keys=(caid,), val=f"{last}T00:00:00.000000+00:00")
+    agency.adb.close()
+
+    agency = agenting.Agency(
+        name="agency",
+        base=base,
+        bran=None,
+        configDir=SCRIPTS_DIR,
+        prewarmCount=2,
+        prewarmRate=0,
+    )
+    doist.enter(doers=[agency])
+    prewarmer = next(
+        doer for doer in agency.doers if isinstance(doer, agenting.Prewarmer)
+    )
+    assert prewarmer.candidates() == [caids[1], caids[0]]
+
+    for _ in prewarmer.recur():
+        pass
+    assert list(agency.agents.keys()) == [caids[1], caids[0]]
+    assert agency.activity == {}  # pre-warming is not activity
+
+    for agent in list(agency.agents.values()):
+        agency.release(agent)
+    agency.adb.close()
+    clean()
+
+
+def test_releaser():
+    salter = core.Salter(raw=b"0123456789rrrrrr")
+    agency = agenting.Agency(name="agency", bran=None, temp=True, configDir=SCRIPTS_DIR)
+    doist = doing.Doist(limit=1.0, tock=0.03125, real=True)
+    doist.enter(doers=[agency])
+    caid = "ELI7pg979AdhmvrjDeam2eAO2SR5niCgnjAJXJHtRel1"
+    agent = agency.create(caid, salt=salter.qb64)
+    assert caid in agency.activity
+
+    # Idle agents are released, persisting their activity
+    releaser = agenting.Releaser(agency, releaseTimeout=60)
+    next(releaser.recur())
+    assert caid in agency.agents
+    agent.last -= datetime.timedelta(seconds=120)
+    next(releaser.recur())
+    assert caid not in agency.agents
+    assert caid not in agency.activity
+    assert agent not in agency.doers
+    assert len(agent.doers) == 0
+
+    agency.adb.close(clear=True)
+
+
+def test_agency_routes():
+    agency = agenting.Agency(
+        name="agency", bran=None, temp=True, configDir=SCRIPTS_DIR, routeCache=2
+    )
+    caid = "ELI7pg979AdhmvrjDeam2eAO2SR5niCgnjAJXJHtJose"
+    pres = [
+        "EAh7pg979AdhmvrjDeam2eAO2SR5niCgnjAJXJHtJose",
+        "EBh7pg979AdhmvrjDeam2eAO2SR5niCgnjAJXJHtJose",
+        "ECh7pg979AdhmvrjDeam2eAO2SR5niCgnjAJXJHtJose",
+    ]
+
+    agency.incept(caid, pres[0])
+    assert agency.routes == {pres[0]: caid}
+
+    # Unknown prefixes are remembered without reading the database again until they expire
+    assert agency.locate(pres[1]) is None
+    assert pres[1] in agency.unknown
+    agency.adb.aids.pin(keys=(pres[1],), val=coring.Prefixer(qb64=caid))
+    assert agency.locate(pres[1]) is None
+    agency.unknown[pres[1]] = 0.0
+    assert agency.locate(pres[1]) == caid
+    assert pres[1] not in agency.unknown
+
+    # Incepting an unknown prefix makes it known immediately
+    assert agency.locate(pres[2]) is None
+    agency.incept(caid, pres[2])
+    assert agency.locate(pres[2]) == caid
+    assert list(agency.routes) == [
+        pres[1],
+        pres[2],
+    ]  # bounded, least recently used evicted
+
+    assert agency.locate(pres[0]) == caid  # evicted routes are read from the database
+    agency.adb.close(clear=True)
+
+
+def test_agent_quiesce():
+    salter = core.Salter(raw=b"0123456789qqqqqq")
+    agency = agenting.Agency(
+        name="agency",
+        bran=None,
+        temp=True,
+        configDir=SCRIPTS_DIR,
+        quiesceAfter=1,
+        escrowWake=5,
+    )
+    doist = doing.Doist(limit=1.0, tock=0.03125, real=True)
+    doist.enter(doers=[agency])
+
+    caid = "ELI7pg979AdhmvrjDeam2eAO2SR5niCgnjAJXJHtJose"
+    agent = agency.create(caid, salt=salter.qb64)
+    for _ in range(10):
+        doist.recur()
+
+    quiescer = next(
+        doer for doer in agency.doers if isinstance(doer, agenting.Quiescer)
+    )
+    checks = quiescer.recur()
+
+    # Recently active agents keep running
+    assert agent.idle(1) is False
+    next(checks)
+    assert agent.quiescent is False
+
+    # Idle agents with queued work or escrowed events keep running
+    agent.last -= datetime.timedelta(seconds=2)
+    agent.queries.append(dict(pre=caid))
+    assert agent.idle(1) is False
+    agent.queries.clear()
+    agent.hby.db.qnfs.add(keys=(caid, "dig"), val="msg")
+    assert agent.idle(1) is False
+    agent.hby.db.qnfs.rem(keys=(caid, "dig"))
+    assert agent.idle(1) is True
+
+    # Idle agents are taken off the scheduler
+    next(checks)
+    assert agent.quiescent is True
+    assert agent.recur(tyme=doist.tyme) is False
+
+    # Woken for an escrow pass every escrowWake seconds
+    agent.slept -= datetime.timedelta(seconds=5)
+    next(checks)
+    assert agent.quiescent is False
+    next(checks)
+    assert agent.quiescent is True
+
+    # and by a request
+    assert agency.get(caid) is agent
+    assert agent.quiescent is False
+
+    agency.release(agent)
+
+
 def test_unprotected_boot_ends(helpers):
     agency = agenting.Agency(name="agency", bran=None, temp=True)
     doist = doing.Doist(limit=1.0, tock=0.03125, real=True)
@@ -614,6 +1349,55 @@ def test_witnesser(helpers):
         doist.recur(deeds)
 
 
+class Receipting:
+    """Receiptor stand in taking two passes to receipt each event"""
+
+    def __init__(self):
+        self.started = []
+        self.finished = []
+
+    def catchup(self, pre, wit):
+        yield 0.0
+
+    def receipt(self, pre, sn=None):
+        self.started.append((pre, sn))
+        yield 0.0
+        yield 0.0
+        self.finished.append((pre, sn))
+
+
+def test_witnesser_concurrency():
+    receiptor = Receipting()
+    witners = decking.Deck()
+    wr = agenting.Witnesser(receiptor=receiptor, witners=witners, concurrency=2)
+
+    events = [
+        SimpleNamespace(pre="EAAA", sn=0, ked=dict(t=Ilks.icp)),
+        SimpleNamespace(pre="EAAA", sn=1, ked=dict(t=Ilks.ixn)),
+        SimpleNamespace(pre="EBBB", sn=0, ked=dict(t=Ilks.icp)),
+        SimpleNamespace(pre="ECCC", sn=0, ked=dict(t=Ilks.icp)),
+    ]
+    witners.extend(dict(serder=serder) for serder in events)
+
+    doist = doing.Doist(limit=1.0, tock=0.03125)
+    doist.extend([wr])
+    doist.recur()
+
+    # Events of different AIDs are receipted at once, later events of an AID wait
+    assert receiptor.started == [("EAAA", 0), ("EBBB", 0)]
+    assert [msg["serder"].pre for msg in witners] == ["EAAA", "ECCC"]
+
+    for _ in range(10):
+        doist.recur()
+
+    assert receiptor.finished.index(("EAAA", 0)) < receiptor.started.index(("EAAA", 1))
+    assert sorted(receiptor.finished) == sorted(
+        (serder.pre, serder.sn) for serder in events
+    )
+    assert len(witners) == 0
+    assert len(wr.deeds) == 0
+
+
 def test_keystate_ends(helpers):
     caid = "ELI7pg979AdhmvrjDeam2eAO2SR5niCgnjAJXJHtDose"
     salt = b"0123456789cccccc"
@@ -834,6 +1618,70 @@ def test_oobi_ends(seeder, helpers):
         }
 
 
+def test_exchange_sender_waits(helpers):
+    class MockExchanger:
+        def __init__(self):
+            self.completed = set()
+
+        def complete(self, said):
+            return said in self.completed
+
+    with helpers.openKeria() as (agency, agent, app, client):
+        exc = MockExchanger()
+        sender = agenting.ExchangeSender(
+            hby=agent.hby,
+            agentHab=agent.agentHab,
+            exc=exc,
+            exchanges=decking.Deck(),
+            timeout=0.25,
+        )
+        sent = []
+        sender.send = sent.append
+        doist = doing.Doist(limit=1.0, tock=0.03125, real=True)
+        deeds = doist.enter(doers=[sender])
+
+        # Incomplete exchanges wait by SAID without holding up complete ones
+        exn, _ = exchanging.exchange(
+            route="/multisig/icp", payload={}, sender=agent.agentHab.pre
+        )
+        waiting = dict(said=exn.said, pre=agent.agentHab.pre, rec=[], topic="multisig")
+        ready = dict(said="Eready", pre=agent.agentHab.pre, rec=[], topic="multisig")
+        exc.completed.add("Eready")
+        sender.exchanges.extend([waiting, ready])
+        sender.recur(1.0, deeds=deeds)
+        sender.recur(1.0, deeds=deeds)
+        assert sent == [ready]
+        assert list(sender.waiting) == [exn.said]
+        assert not sender.exchanges
+
+        # Other exchanges saved do not wake it
+        agent.hby.db.exns.put(keys=(exn.said,), val=exn)
+        sender.recur(1.0, deeds=deeds)
+        assert sent == [ready]
+
+        # Woken once the Exchanger has it complete, whether or not anything was saved
+        exc.completed.add(exn.said)
+        sender.recur(1.0, deeds=deeds)
+        assert sent == [ready, waiting]
+        assert not sender.waiting
+
+        # Exchanges never completed expire
+        sender.exchanges.append(dict(waiting, said="Enever"))
+        sender.recur(1.0, deeds=deeds)
+        assert "Enever" in sender.waiting
+        time.sleep(0.3)
+        sender.recur(1.0, deeds=deeds)
+        assert not sender.waiting
+
+        # An agent with exchanges waiting to complete has work pending
+        sender = next(
+            doer for doer in agent.doers if isinstance(doer, agenting.ExchangeSender)
+        )
+        assert not agent.pending()
+        sender.park(waiting)
+        assert agent.pending()
+
+
 def test_querier(helpers):
     with helpers.openKeria() as (agency, agent, app, client):
         qry = agenting.Querier(
@@ -856,7 +1704,52 @@ def test_querier(helpers):
         assert seqNoDoer.pre == "EI7AkI40M11MS7lkTCb10JC9-nDt-tXwQh44OHAFlv_9"
         assert seqNoDoer.sn == 1
 
-        qry.doers.remove(seqNoDoer)
+        # Queries answered by the one in flight are attached to it
+        pre = "EI7AkI40M11MS7lkTCb10JC9-nDt-tXwQh44OHAFlv_9"
+        qry.queries.append(dict(pre=pre, sn="1"))
+        qry.recur(1.0, deeds=deeds)
+        qry.queries.append(dict(pre=pre, sn="0"))
+        qry.recur(1.0, deeds=deeds)
+        assert len(qry.doers) == 1
+        assert qry.coalesced == 2
+        assert qry.inflight[("sn", pre, 1)][2] == [
+            dict(pre=pre, sn="1"),
+            dict(pre=pre, sn="0"),
+        ]
+
+        qry.queries.append(dict(pre=pre, sn="2"))
+        qry.recur(1.0, deeds=deeds)
+        assert len(qry.doers) == 2
+        qry.remove(qry.doers[1:])
+
+        # Attached queries run again when the query ends without a result
+        qry.remove([seqNoDoer])
+        qry.recur(1.0, deeds=deeds)
+        qry.recur(1.0, deeds=deeds)
+        assert len(qry.doers) == 1
+        seqNoDoer = qry.doers[0]
+        assert seqNoDoer.sn == 1
+        assert list(qry.inflight) == [("sn", pre, 1)]
+        assert qry.inflight[("sn", pre, 1)][2] == [dict(pre=pre, sn="0")]
+
+        # and are answered by its result once it completes
+        seqNoDoer.done = True
+        qry.recur(1.0, deeds=deeds)
+        assert qry.doers == []
+        assert qry.inflight == {}
+
+        # Queries in flight past the window are run again
+        qry.window = 0.0
+        qry.queries.append(dict(pre=pre))
+        qry.recur(1.0, deeds=deeds)
+        stale = qry.doers[0]
+        qry.queries.append(dict(pre=pre))
+        qry.recur(1.0, deeds=deeds)
+        assert len(qry.doers) == 1
+        assert qry.doers[0] is not stale
+        qry.remove(qry.doers)
+        qry.inflight.clear()
+        qry.window = 60.0
 
         # Anchor not implemented yet
         qry.queries.append(
@@ -14,6 +14,7 @@ from keri.core import parsing
 from keri.peer import exchanging
 from keri.vc import protocoling
 
+from keria.core import longrunning
 from keria.db import basing
 
 QVI_SAID = "EFgnk_c08WmZGgv9_mpldibRuqFMTQN-rAgtD-TCOwbs"
@@ -387,3 +388,46 @@ def test_exnseeker(helpers, seeder, mockHelpingNowUTC):
 
         saids = seeker.find({"-a-i": {"$eq": issueeHab.pre}})
         assert list(saids) == [grant.said, apply.said]
+
+
+def test_agent_store():
+    salt = b"0123456789abcdef"
+
+    with habbing.openHab(name="hal", salt=salt, temp=True) as (hby, hab):
+        store = basing.AgentStore(name="hal", temp=True, reopen=True)
+
+        seeker = basing.ExnSeeker(db=hby.db, reopen=True, temp=True, store=store)
+        opr = longrunning.Operator(name="hal", temp=True, store=store)
+        assert seeker.env.env is store.env
+        assert opr.env.env is store.env
+        assert seeker.path is None
+
+        op = longrunning.Op(oid="E1", type="oobi", start="now", metadata={})
+        opr.ops.pin(keys=("oobi.E1",), val=op)
+
+        # Stores keep their sub databases in their own namespace of the shared environment
+        with store.env.begin() as txn:
+            names = [bytes(key) for key, _ in txn.cursor()]
+        assert b"opr:opr." in names
+        assert any(name.startswith(b"exn:") for name in names)
+
+        # Closing a store leaves the shared environment open for the others
+        opr.close()
+        assert opr.env is None
+        assert seeker.env.info() is not None
+
+        opr = longrunning.Operator(name="hal", temp=True, store=store)
+        assert opr.ops.get(keys=("oobi.E1",)).oid == "E1"
+
+        # Migrate a separately stored Operator into a fresh store
+        src = longrunning.Operator(name="sep", temp=True)
+        src.ops.pin(keys=("oobi.E2",), val=op)
+        other = basing.AgentStore(name="sep", temp=True, reopen=True)
+        assert basing.migrateStore(src, other, longrunning.Operator.Namespace) == 1
+
+        moved = longrunning.Operator(name="sep", temp=True, store=other)
+        assert moved.ops.get(keys=("oobi.E2",)).oid == "E1"
+
+        src.close(clear=True)
+        other.close(clear=True)
+        store.close(clear=True)
@@ -7,13 +7,16 @@ Testing credentialing endpoint in the Mark II Agent
 """
 
 import json
+import time
 
 import falcon
+import pytest
 from falcon import testing
 from hio.base import doing
 from keri.app import habbing
-from keri.core import scheming, coring, parsing, serdering
-from keri.core.eventing import SealEvent
+from keri import kering
+from keri.core import scheming, coring, indexing, parsing, serdering
+from keri.core.eventing import SealEvent, messagize
 from keri.core.signing import Salter
 from keri.kering import TraitCodex
 from keri.vc import proving
@@ -291,6 +294,56 @@ def test_registry_end(helpers, seeder):
         assert result.json == {"title": "long running operation 'bad_name' not found"}
 
 
+def test_registry_anchor_latency(helpers):
+    with helpers.openKeria() as (agency, agent, app, client):
+        app.add_route("/identifiers", aiding.IdentifierCollectionEnd())
+
+        isalt = b"0123456789abcdef"
+        aid = helpers.createAid(client, "issuer", isalt)["response"]
+        regser = eventing.incept(
+            aid["i"],
+            baks=[],
+            toad="0",
+            nonce=Salter().qb64,
+            cnfg=[TraitCodex.NoBackers],
+            code=coring.MtrDex.Blake3_256,
+        )
+        anchor = dict(i=regser.pre, s=regser.ked["s"], d=regser.said)
+        ixn, sigs = helpers.interact(
+            pre=aid["i"],
+            bran=isalt,
+            pidx=0,
+            ridx=0,
+            dig=aid["d"],
+            sn="1",
+            data=[anchor],
+        )
+
+        # The registry inception arrives before its KEL anchor
+        with pytest.raises(kering.MissingAnchorError):
+            agent.tvy.processEvent(
+                serder=regser,
+                seqner=coring.Seqner(sn=1),
+                saider=coring.Saider(qb64=ixn.said),
+            )
+
+        # and the TEL escrows back off while nothing changes
+        escrower = agent.escrower
+        escrower.recur(tyme=0.0)
+        tel = next(family for family in escrower.families if family.name == "tel")
+        tel.delay = tel.backoff
+        escrower.recur(tyme=0.0)
+        assert regser.pre not in agent.tvy.tevers
+
+        # The KEL anchor unblocks the registry on the next pass
+        start = time.monotonic()
+        ims = messagize(ixn, sigers=[indexing.Siger(qb64=sig) for sig in sigs])
+        agent.parser.parse(ims=ims)
+        escrower.recur(tyme=0.0)
+        assert regser.pre in agent.tvy.tevers
+        assert time.monotonic() - start < 1.0
+
+
 def test_issue_credential(helpers, seeder):
     with (
         helpers.openKeria() as (agency, agent, app, client),
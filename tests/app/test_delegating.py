@@ -63,6 +63,31 @@ def test_sealer():
         assert anchorer.complete(prefixer=prefixer, seqner=seqner) is True
 
 
+def test_witness_cues():
+    cues = delegating.WitnessCues([dict(pre="A", sn=0)], maxlen=3)
+    cues.push(dict(pre="A", sn=1))
+    cues.push(dict(pre="A", sn=1))
+    assert cues.witnessed("A", 0) and cues.witnessed("A", 1)
+    assert not cues.witnessed("B", 0)
+
+    # Oldest completions are dropped at maxlen
+    cues.push(dict(pre="B", sn=0))
+    assert len(cues) == 3
+    assert not cues.witnessed("A", 0)
+    assert cues.witnessed("B", 0)
+    assert cues.pushes == 4
+
+    cues.discard("A", 1)
+    assert not cues.witnessed("A", 1)
+    assert list(cues) == [dict(pre="B", sn=0)]
+    cues.discard("A", 1)
+
+    assert cues.pull() == dict(pre="B", sn=0)
+    assert not cues.witnessed("B", 0)
+    assert cues.pull(emptive=True) is None
+    assert not cues.index
+
+
 def test_delegator_end(helpers):
     torname = "delegator"
     teename = "delegatee"
@@ -7,12 +7,17 @@ Testing the Mark II Agent
 """
 
 import falcon.testing
+from hio.base import doing
 from hio.help import Hict
 from keri import core
 from keri.app import habbing, httping
-from keri.core import serdering
+from keri.app import signing
+from keri.core import coring, serdering
+from keri.core import eventing as keventing
 from keri.core.coring import MtrDex
 from keri.core.signing import Salter
+from keri.peer import exchanging
+from keri.vc import proving
 from keri.vdr import eventing
 from keria.end import ending
 
@@ -171,6 +176,26 @@ def test_indirecting(helpers):
         res = client.put("/", body=serder.raw, headers=dict(headers))
         assert res.status_code == 204
 
+        # Messages queue for the parser until the agent's ingress limit is reached
+        assert len(agent.ingress) > 0
+        assert agent.pending()
+        agent.ingress.limit = len(agent.ingress)
+        res = client.put("/", body=serder.raw, headers=dict(headers))
+        assert res.status_code == 429
+        assert res.headers["Retry-After"] == str(agency.retryAfter)
+
+        queued = len(agent.ingress)
+        first = len(agent.ingress.chunks[0])
+        ims = bytearray()
+        assert agent.ingress.feed(ims, budget=1) == first  # whole streams only
+        assert len(agent.ingress) == queued - first
+        agent.ingress.feed(ims, budget=queued)
+        assert len(ims) == queued
+        assert len(agent.ingress) == 0
+
+        res = client.put("/", body=serder.raw, headers=dict(headers))
+        assert res.status_code == 204
+
         # Test ending
         oobiEnd = ending.OOBIEnd(agency)
         app.add_route("/oobi", oobiEnd)
@@ -187,3 +212,143 @@ def test_indirecting(helpers):
             path="/oobi/EIaGMMWJFPmtXznY1IIiKDIrg-vIyge6mBl2QV8dDjI3"
         )
         assert result.status == falcon.HTTP_404
+
+
+def test_batch(helpers):
+    salt = b"0123456789abcdef"
+    salter = core.Salter(raw=salt)
+    with (
+        helpers.openKeria() as (agency, agent, app, client),
+        habbing.openHby(name="keria", salt=salter.qb64, temp=True) as hby,
+    ):
+        indirecting.loadEnds(app, agency)
+        app.add_route("/identifiers", aiding.IdentifierCollectionEnd())
+        op = helpers.createAid(client, "recipient", salt)
+        aid = op["response"]["i"]
+
+        hab = hby.makeHab("test")
+        icp = hab.makeOwnInception()
+        exn, _ = exchanging.exchange(
+            route="/test", payload={}, sender=hab.pre, recipient=aid
+        )
+        exn = hab.endorse(exn)
+
+        # Messages are split and the exn goes to the agent of its recipient
+        stream = bytes(icp) + bytes(exn)
+        assert [
+            (serder.ilk, bytes(msg))
+            for serder, msg in indirecting.HttpBatchEnd.split(stream)
+        ] == [("icp", bytes(icp)), ("exn", bytes(exn))]
+
+        client = falcon.testing.TestClient(app)
+        res = client.put(
+            "/batch", body=bytes(icp), headers={"Content-Type": "application/cesr"}
+        )
+        assert res.status_code == 404
+        assert len(agent.ingress) == 0
+
+        res = client.put(
+            "/batch", body=bytes(exn), headers={"Content-Type": "application/cesr"}
+        )
+        assert res.status_code == 204
+        assert list(agent.ingress.chunks) == [bytes(exn)]
+
+        # Messages for no managed AID go to the destination, all queued as one stream
+        agent.ingress.feed(bytearray(), budget=len(agent.ingress))
+        res = client.post(
+            "/batch",
+            body=stream,
+            headers={
+                "Content-Type": "application/cesr",
+                httping.CESR_DESTINATION_HEADER: aid,
+            },
+        )
+        assert res.status_code == 204
+        assert list(agent.ingress.chunks) == [stream]
+
+        # A truncated stream is refused as a whole instead of waiting on the missing bytes
+        agent.ingress.feed(bytearray(), budget=len(agent.ingress))
+        assert [
+            serder.ilk for serder, _ in indirecting.HttpBatchEnd.split(stream[:-10])
+        ] == ["icp"]
+        res = client.put(
+            "/batch",
+            body=stream[:-10],
+            headers={
+                "Content-Type": "application/cesr",
+                httping.CESR_DESTINATION_HEADER: aid,
+            },
+        )
+        assert res.status_code == 400
+        assert len(agent.ingress) == 0
+
+        # Credentials and receipt couples are split whole
+        creder = proving.credential(
+            issuer=hab.pre,
+            schema="EBfdlu8R27Fbx-ehrqwImnK-8Cm79sqbAQ4MmvEAYqao",
+            data=dict(
+                dt="2021-01-01T00:00:00.000000+00:00", LEI="254900OPPU84GM83MG36"
+            ),
+            status="ETQoH02zJRCTNz-Wl3nnkUD_RVSzSwcoNvmfa18AWt3M",
+        )
+        acdc = bytes(
+            signing.serialize(
+                creder,
+                coring.Prefixer(qb64=hab.pre),
+                coring.Seqner(sn=0),
+                coring.Saider(qb64=hab.kever.serder.said),
+            )
+        )
+        witness = core.Signer(transferable=False)
+        serder = hab.kever.serder
+        receipted = bytes(
+            keventing.messagize(
+                serder,
+                sigers=hab.sign(ser=serder.raw, indexed=True),
+                cigars=[witness.sign(ser=serder.raw)],
+            )
+        )
+        assert b"-C" in receipted
+        batch = acdc + receipted
+        assert [
+            (serder.said, bytes(msg))
+            for serder, msg in indirecting.HttpBatchEnd.split(batch)
+        ] == [(creder.said, acdc), (hab.pre, receipted)]
+
+        res = client.put(
+            "/batch",
+            body=batch,
+            headers={
+                "Content-Type": "application/cesr",
+                httping.CESR_DESTINATION_HEADER: aid,
+            },
+        )
+        assert res.status_code == 204
+        assert list(agent.ingress.chunks) == [batch]
+        agent.ingress.feed(bytearray(), budget=len(agent.ingress))
+
+        # Messages about an AID of one agent go to the agent they are sent to
+        agency.wind(doing.Doist(tock=0.03125, real=True).tymen())
+        other = agency.create(
+            "ELI7pg979AdhmvrjDeam2eAO2SR5niCgnjAJXJHtBat1", salt=salter.qb64
+        )
+        kel = bytes(agent.hby.db.cloneEvtMsg(pre=aid, fn=0, dig=op["response"]["d"]))
+        res = client.put(
+            "/batch",
+            body=kel,
+            headers={
+                "Content-Type": "application/cesr",
+                httping.CESR_DESTINATION_HEADER: other.pre,
+            },
+        )
+        assert res.status_code == 204
+        assert len(agent.ingress) == 0
+        assert list(other.ingress.chunks) == [kel]
+
+        # and without a destination to the agent managing the AID
+        res = client.put(
+            "/batch", body=kel, headers={"Content-Type": "application/cesr"}
+        )
+        assert res.status_code == 204
+        assert list(agent.ingress.chunks) == [kel]
+        agency.release(other)
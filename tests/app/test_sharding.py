@@ -0,0 +1,236 @@
+# -*- encoding: utf-8 -*-
+"""
+KERIA
+keria.app.sharding module
+
+Testing the sharded agency router
+"""
+
+import json
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import Mock
+
+import pytest
+import requests
+from keri import core, kering
+from keri.core import coring
+
+from keria.app import agenting, sharding
+from keria.db import basing
+from keria.testing.testing_helper import SCRIPTS_DIR
+
+CAIDS = [
+    "ELI7pg979AdhmvrjDeam2eAO2SR5niCgnjAJXJHtJose",
+    "EAh7pg979AdhmvrjDeam2eAO2SR5niCgnjAJXJHtJose",
+    "EBh7pg979AdhmvrjDeam2eAO2SR5niCgnjAJXJHtJose",
+    "ECh7pg979AdhmvrjDeam2eAO2SR5niCgnjAJXJHtJose",
+    "EDh7pg979AdhmvrjDeam2eAO2SR5niCgnjAJXJHtJose",
+    "EEh7pg979AdhmvrjDeam2eAO2SR5niCgnjAJXJHtJose",
+]
+
+
+def test_shard_of():
+    assert basing.shardOf(CAIDS[0], 0) == 0
+    assert basing.shardOf(CAIDS[0], 1) == 0
+
+    shards = [basing.shardOf(caid, 4) for caid in CAIDS]
+    assert shards == [basing.shardOf(caid, 4) for caid in CAIDS]  # stable
+    assert all(0 <= shard < 4 for shard in shards)
+    assert len(set(shards)) > 1
+
+
+def test_worker_config():
+    config = agenting.KERIAServerConfig(shards=2, keyPath="key", certPath="cert")
+    worker = sharding.workerConfig(config, 1)
+    assert worker.shard == 1
+    assert worker.adminPort == config.adminPort + 20
+    assert worker.httpPort == config.httpPort + 20
+    assert worker.bootPort == config.bootPort + 20
+    assert worker.keyPath is None and worker.certPath is None
+    assert config.shard is None
+
+
+def test_agency_owns():
+    salter = core.Salter(raw=b"0123456789jjjjjj")
+    caid = CAIDS[0]
+    owner = basing.shardOf(caid, 2)
+
+    agency = agenting.Agency(
+        name="agency",
+        bran=None,
+        temp=True,
+        configDir=SCRIPTS_DIR,
+        shard=1 - owner,
+        shards=2,
+    )
+    assert agency.owns(caid) is False
+    with pytest.raises(kering.ConfigurationError):
+        agency.create(caid, salt=salter.qb64)
+    assert agency.get(caid) is None
+    agency.adb.close(clear=True)
+
+
+class Backend(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        data = json.dumps(
+            dict(port=self.server.server_address[1], body=body.decode())
+        ).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        self.send_response(204)
+        self.send_header("X-Port", str(self.server.server_address[1]))
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+def test_router():
+    adb = basing.AgencyBaser(name="TheAgency", temp=True, reopen=True)
+    directory = sharding.Directory(adb, 2)
+
+    managed = "EMgd7pg979AdhmvrjDeam2eAO2SR5niCgnjAJXJHtJose"
+    adb.aids.pin(keys=(managed,), val=coring.Prefixer(qb64=CAIDS[0]))
+    assert directory.route(managed) == basing.shardOf(CAIDS[0], 2)
+    assert directory.indirect(f"/oobi/{managed}/agent", {}, b"") == directory.route(
+        managed
+    )
+    assert directory.admin(f"/agent/{CAIDS[1]}", {}, b"") == directory.shard(CAIDS[1])
+    assert directory.boot("/boot", {}, b"not json") == 0
+
+    backends = [ThreadingHTTPServer(("127.0.0.1", 0), Backend) for _ in range(2)]
+    ports = [backend.server_address[1] for backend in backends]
+    for backend in backends:
+        threading.Thread(target=backend.serve_forever, daemon=True).start()
+
+    boot = sharding.ShardServer(0, ports, directory.boot)
+    admin = sharding.ShardServer(0, ports, directory.admin)
+    for server in (boot, admin):
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    try:
+        for caid in CAIDS:
+            body = json.dumps(dict(icp=dict(i=caid)))
+            res = requests.post(
+                f"http://127.0.0.1:{boot.server_address[1]}/boot", data=body
+            )
+            assert res.status_code == 200
+            assert res.json() == dict(port=ports[directory.shard(caid)], body=body)
+
+            res = requests.get(
+                f"http://127.0.0.1:{admin.server_address[1]}/identifiers",
+                headers={"Signify-Resource": caid},
+            )
+            assert res.status_code == 204
+            assert res.headers["X-Port"] == str(ports[directory.shard(caid)])
+
+        # A worker that is down answers 502 Bad Gateway
+        backends[0].shutdown()
+        backends[0].server_close()
+        caid = next(caid for caid in CAIDS if directory.shard(caid) == 0)
+        res = requests.get(
+            f"http://127.0.0.1:{admin.server_address[1]}/identifiers",
+            headers={"Signify-Resource": caid},
+        )
+        assert res.status_code == 502
+    finally:
+        for server in (boot, admin, backends[1]):
+            server.shutdown()
+            server.server_close()
+        adb.close(clear=True)
+
+
+def test_forwarder_body():
+    backend = ThreadingHTTPServer(("127.0.0.1", 0), Backend)
+    threading.Thread(target=backend.serve_forever, daemon=True).start()
+    router = sharding.ShardServer(
+        0, [backend.server_address[1]], lambda *args: 0, idleTimeout=1.0, bodyLimit=64
+    )
+    threading.Thread(target=router.serve_forever, daemon=True).start()
+
+    def send(raw, close=False):
+        with socket.create_connection(("127.0.0.1", router.server_address[1])) as sock:
+            sock.settimeout(5.0)
+            sock.sendall(raw)
+            if close:
+                sock.shutdown(socket.SHUT_WR)
+            return sock.recv(1024).split(b"\r\n")[0]
+
+    head = b"POST /boot HTTP/1.1\r\nHost: router\r\n"
+    chunked = head + b"Transfer-Encoding: chunked\r\n\r\n"
+    try:
+        assert send(chunked + b"2\r\n{}\r\n0\r\n\r\n") == b"HTTP/1.1 200 OK"
+        assert send(head + b"Content-Length: 2\r\n\r\n{}") == b"HTTP/1.1 200 OK"
+
+        # Malformed, truncated and oversized bodies are refused instead of dropping the connection
+        assert send(chunked + b"zz\r\n{}\r\n").startswith(b"HTTP/1.1 400")
+        assert send(chunked + b"8\r\n{}", close=True).startswith(b"HTTP/1.1 400")
+        assert send(head + b"Content-Length: two\r\n\r\n").startswith(b"HTTP/1.1 400")
+        assert send(head + b"Content-Length: 8\r\n\r\n{}", close=True).startswith(
+            b"HTTP/1.1 400"
+        )
+        assert send(head + b"Content-Length: 65\r\n\r\n").startswith(b"HTTP/1.1 413")
+        assert send(chunked + b"41\r\n").startswith(b"HTTP/1.1 413")
+    finally:
+        for server in (router, backend):
+            server.shutdown()
+            server.server_close()
+
+
+def test_router_config():
+    config = agenting.KERIAServerConfig(
+        adminPort=0,
+        bootPort=0,
+        httpPort=None,
+        shards=2,
+        routerTimeout=5.0,
+        routerBodyLimit=1024,
+        handshakeTimeout=2.0,
+        idleTimeout=3.0,
+    )
+    adb = basing.AgencyBaser(name="TheAgency", temp=True, reopen=True)
+    router = sharding.Router(config, sharding.Directory(adb, 2))
+    try:
+        for server in router.servers:
+            assert server.workerTimeout == 5.0
+            assert server.bodyLimit == 1024
+            assert server.handshakeTimeout == 2.0
+            assert server.idleTimeout == 3.0
+    finally:
+        for server in router.servers:
+            server.server_close()
+        adb.close(clear=True)
+
+
+def test_shard_handshake():
+    context = Mock()
+    conn = context.wrap_socket.return_value
+    conn.do_handshake.side_effect = socket.timeout("handshake timed out")
+    server = sharding.ShardServer(0, [], None, context=context, handshakeTimeout=0.5)
+
+    # The handshake runs on the connection thread with a timeout, not in accept()
+    assert server.socket is not conn
+    left, right = socket.socketpair()
+    try:
+        server.process_request_thread(left, ("127.0.0.1", 1))
+    finally:
+        server.server_close()
+        left.close()
+        right.close()
+
+    context.wrap_socket.assert_called_once_with(
+        left, server_side=True, do_handshake_on_connect=False
+    )
+    conn.settimeout.assert_called_once_with(0.5)
+    conn.close.assert_called_once_with()
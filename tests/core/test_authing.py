@@ -98,6 +98,48 @@ def test_authenticater(mockHelpingNowUTC):
 
         assert authn.verify(req)
 
+        # Once the controller rotates only its new key is accepted
+        rot = controller.rotate()
+        parsing.Parser().parse(ims=bytearray(rot), kvy=agentKev)
+        with pytest.raises(kering.AuthNError):
+            authn.verify(req)
+
+        rotated = Hict(
+            [
+                ("Signify-Resource", controller.pre),
+                ("Signify-Timestamp", "2022-09-24T00:05:48.196795+00:00"),
+            ]
+        )
+        header, qsig = ending.siginput(
+            "signify",
+            "POST",
+            "/boot",
+            rotated,
+            fields=authn.DefaultFields,
+            hab=controller,
+            alg="ed25519",
+            keyid=controller.pre,
+        )
+        rotated.extend(header)
+        signage = ending.Signage(
+            markers=dict(signify=qsig),
+            indexed=False,
+            signer=None,
+            ordinal=None,
+            digest=None,
+            kind=None,
+        )
+        rotated.extend(ending.signature([signage]))
+        req = testing.create_req(method="POST", path="/boot", headers=dict(rotated))
+        assert authn.verify(req)
+
+        # With a freshness window a request is accepted once
+        fresh = authing.Authenticater(agency=agency, window=300.0)
+        assert fresh.verify(req)
+        with pytest.raises(kering.AuthNError):
+            fresh.verify(req)
+        assert fresh.replays.rejected == 1
+
         headers = Hict(
             [
                 ("Content-Type", "application/json"),
@@ -127,9 +169,57 @@ def test_authenticater(mockHelpingNowUTC):
             authn.verify(req)
 
 
+def test_signify_inputs():
+    siginput = (
+        'signify=("signify-resource" "@method" "@path" "signify-timestamp");'
+        'created=1609459200;keyid="EPwUOBk9QkxPM20JBaf_pFXPytSjTUoyxbx95uZJE1Hq";alg="ed25519"'
+    )
+    assert authing.Authenticater.inputs(siginput) == ending.desiginput(
+        siginput.encode("utf-8")
+    )
+
+    # Other shapes take the full parser
+    siginput = (
+        'signify=("@method" "@path");created=1609459200;nonce="abc";alg="ed25519",'
+        'other=("@path");created=1609459200'
+    )
+    inputs = authing.Authenticater.inputs(siginput)
+    assert len(inputs) == 1
+    assert inputs[0].nonce == "abc"
+    assert inputs[0].fields == ["@method", "@path"]
+
+    qb64 = "0BDBVr5ape8f9nV60ThhWOKvu5HKXQc5798Sz95FIoqXQ9vvL8HoYsLRp5aN86MIXr0GqH37SowsmTP-k9UhYSkN"
+    signature = f'indexed="?0";signify="{qb64}"'
+    assert authing.Authenticater.signatures(signature)["signify"].qb64 == qb64
+    signature = f'indexed="?0";other="{qb64}";signify="{qb64}"'
+    assert authing.Authenticater.signatures(signature)["signify"].qb64 == qb64
+
+
+def test_replays():
+    replays = authing.Replays(window=60.0, size=2)
+    assert replays.fresh(1000, 1059.0)
+    assert replays.fresh(1000, 941.0)
+    assert not replays.fresh(1000, 1061.0)
+
+    replays.add("sig0", 1000)
+    assert replays.replayed("sig0", 1030.0)
+    assert not replays.replayed("sig1", 1030.0)
+
+    # signatures are dropped once their requests are stale or the cache is full
+    assert not replays.replayed("sig0", 1061.0)
+    assert len(replays) == 0
+    for i in range(3):
+        replays.add(f"sig{i}", 1000)
+    assert not replays.replayed("sig0", 1030.0)
+    assert replays.replayed("sig2", 1030.0)
+    assert len(replays) == 2
+    assert replays.rejected == 2
+
+
 class MockAgency:
     def __init__(self, agent=None):
         self.agent = agent
+        self.draining = False
 
     def get(self, caid=None):
         return self.agent
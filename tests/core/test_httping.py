@@ -1,8 +1,10 @@
+import gzip
+import json
 import unittest
-from falcon import falcon
+from falcon import falcon, testing
 from falcon.testing import helpers
 from falcon.http_status import HTTPStatus
-from keria.core.httping import HandleCORS
+from keria.core.httping import GzipMiddleware, HandleCORS
 
 
 class HandleCORSTest(unittest.TestCase):
@@ -28,3 +30,43 @@ class HandleCORSTest(unittest.TestCase):
             self.cors_handler.process_request(req, resp)
 
         self.assertEqual(cm.exception.status, falcon.HTTP_200)
+
+
+class GzipMiddlewareTest(unittest.TestCase):
+    def setUp(self):
+        self.app = falcon.App(middleware=[GzipMiddleware(threshold=64)])
+        self.app.add_route("/large", Payload(1000))
+        self.app.add_route("/small", Payload(10))
+        self.client = testing.TestClient(self.app)
+
+    def test_accepts(self):
+        self.assertTrue(GzipMiddleware.accepts("gzip, deflate, br"))
+        self.assertTrue(GzipMiddleware.accepts("br;q=1.0, gzip;q=0.5"))
+        self.assertTrue(GzipMiddleware.accepts("*"))
+        self.assertFalse(GzipMiddleware.accepts("gzip;q=0"))
+        self.assertFalse(GzipMiddleware.accepts("*;q=1, gzip;q=0"))
+        self.assertTrue(GzipMiddleware.accepts("*;q=0, gzip"))
+        self.assertFalse(GzipMiddleware.accepts("deflate"))
+        self.assertFalse(GzipMiddleware.accepts(""))
+
+    def test_process_response(self):
+        rep = self.client.simulate_get("/large", headers={"Accept-Encoding": "gzip"})
+        self.assertEqual(rep.headers["Content-Encoding"], "gzip")
+        self.assertEqual(rep.headers["Vary"], "Accept-Encoding")
+        self.assertEqual(json.loads(gzip.decompress(rep.content)), ["a" * 1000])
+
+        rep = self.client.simulate_get("/large")
+        self.assertNotIn("Content-Encoding", rep.headers)
+        self.assertEqual(rep.json, ["a" * 1000])
+
+        rep = self.client.simulate_get("/small", headers={"Accept-Encoding": "gzip"})
+        self.assertNotIn("Content-Encoding", rep.headers)
+        self.assertEqual(rep.json, ["a" * 10])
+
+
+class Payload:
+    def __init__(self, size):
+        self.size = size
+
+    def on_get(self, req, rep):
+        rep.media = ["a" * self.size]
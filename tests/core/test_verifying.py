@@ -0,0 +1,107 @@
+# -*- encoding: utf-8 -*-
+"""
+KERIA
+keria.core.verifying module
+
+Testing signature pre-verification
+"""
+
+from concurrent import futures
+
+from keri.app import habbing
+from keri.core import eventing, parsing
+from keri.core.signing import Verfer
+
+from keria.app import agenting
+from keria.core import verifying
+
+
+def test_verify_cache():
+    cache = verifying.VerifyCache(size=2)
+    cache.add(b"key", b"sig", b"ser")
+    assert cache.verified(b"key", b"sig", b"ser")
+    assert not cache.verified(b"key", b"sig", b"other")
+
+    cache.add(b"key", b"sig2", b"ser")
+    cache.add(b"key", b"sig3", b"ser")
+    assert len(cache) == 2
+    assert not cache.verified(b"key", b"sig", b"ser")  # least recently used dropped
+    assert cache.verified(b"key", b"sig3", b"ser")
+    assert cache.hits == 2
+
+
+def test_preverifier():
+    with (
+        habbing.openHby(name="sender", temp=True) as sender,
+        habbing.openHby(name="receiver", temp=True) as receiver,
+    ):
+        hab = sender.makeHab("test")
+        hab.interact()
+        msgs = bytearray(hab.makeOwnInception())
+        msgs.extend(hab.makeOwnEvent(sn=1))
+
+        preverifier = verifying.Preverifier(workers=1)
+        try:
+            assert Verfer._ed25519 is verifying.cachedEd25519
+
+            # The inception is checked against its own keys, the interaction needs the inception first
+            assert preverifier.submit(msgs, receiver.db).result(timeout=5.0) == 1
+            assert preverifier.verified == 1
+            assert len(preverifier.cache) == 1
+
+            kvy = eventing.Kevery(db=receiver.db, lax=False, local=False)
+            parsing.Parser(kvy=kvy).parse(ims=bytearray(msgs))
+            assert hab.pre in receiver.kevers
+            assert receiver.kevers[hab.pre].sn == 1
+            assert preverifier.cache.hits >= 1
+
+            # Messages for a known AID are checked against its key state
+            rot = bytearray(hab.rotate())
+            assert preverifier.submit(rot, receiver.db).result(timeout=5.0) == 1
+
+            # Bad signatures are not cached
+            bad = bytearray(msgs)
+            bad[-10:-9] = b"A" if bad[-10:-9] != b"A" else b"B"
+            before = preverifier.verified
+            preverifier.submit(bad, receiver.db).result(timeout=5.0)
+            assert preverifier.verified == before + 1
+
+            # Truncated streams stop at the missing bytes
+            assert preverifier.submit(msgs[:-10], receiver.db).result(timeout=5.0) == 1
+
+            ims = bytearray(msgs[:-10])
+            parser = parsing.Parser(framed=True, kvy=verifying.Collector(receiver.db))
+            assert verifying.parseOnce(parser, ims)
+            assert not verifying.parseOnce(parser, ims)
+        finally:
+            preverifier.close()
+
+        assert Verfer._ed25519 is not verifying.cachedEd25519
+
+
+def test_ingress_waits_on_preverify():
+    pending = []
+
+    def preverify(msg):
+        pending.append(futures.Future())
+        return pending[-1]
+
+    ingress = agenting.Ingress(preverify=preverify)
+    assert ingress.push(b"first")
+    assert ingress.push(b"second")
+
+    ims = bytearray()
+    assert ingress.feed(ims, budget=100) == 0  # still being verified
+    pending[0].set_result(1)
+    assert ingress.feed(ims, budget=100) == 5
+    pending[1].cancel()
+    assert ingress.feed(ims, budget=100) == 6
+    assert ims == b"firstsecond"
+    assert len(ingress) == 0
+
+    # Streams whose verification does not finish in time go to the parser unverified
+    ingress = agenting.Ingress(preverify=preverify, timeout=0.0)
+    assert ingress.push(b"third")
+    ims = bytearray()
+    assert ingress.feed(ims, budget=100) == 5
+    assert pending[-1].cancelled()
@@ -0,0 +1,103 @@
+# -*- encoding: utf-8 -*-
+"""
+KERIA
+keria.peer.posting module
+
+Testing the agency wide outbound connections
+"""
+
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from hio.base import doing
+from keri.app import forwarding, habbing
+
+from keria.peer import posting
+
+PRE = "EMgd7pg979AdhmvrjDeam2eAO2SR5niCgnjAJXJHtJose"
+
+
+class Mailbox(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    received = []
+
+    def do_PUT(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        self.received.append(
+            (self.headers["CESR-DESTINATION"], body, self.client_address[1])
+        )
+        self.send_response(204)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+def test_outbox():
+    outbox = posting.Outbox(connections=1, batch=12)
+    assert outbox.deliver(PRE, {"tcp": "tcp://127.0.0.1:5632"}, b"msg") is False
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Mailbox)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    urls = {"http": f"http://127.0.0.1:{server.server_address[1]}/"}
+    Mailbox.received.clear()
+
+    try:
+        # Messages for one destination are merged up to the batch size
+        for msg in (b"aaaa", b"bbbb", b"cccc", b"dddd"):
+            assert outbox.deliver(PRE, urls, msg) is True
+        assert outbox.deliver("EOther", urls, b"eeee") is True
+        assert outbox.merged == 2
+        endpoint = ("http", "127.0.0.1", server.server_address[1])
+        assert [delivery.body for delivery in outbox.queues[endpoint]] == [
+            bytearray(b"aaaabbbbcccc"),
+            bytearray(b"dddd"),
+            bytearray(b"eeee"),
+        ]
+
+        doist = doing.Doist(tock=0.01, real=True, limit=5.0)
+        doist.extend([outbox])
+        start = time.monotonic()
+        while time.monotonic() - start < 5.0 and (
+            len(Mailbox.received) < 3
+            or any(c.busy for cs in outbox.channels.values() for c in cs)
+        ):
+            doist.recur()
+            time.sleep(0.01)
+
+        assert [(dest, body) for dest, body, _ in Mailbox.received] == [
+            (PRE, b"aaaabbbbcccc"),
+            (PRE, b"dddd"),
+            ("EOther", b"eeee"),
+        ]
+        # one connection per endpoint carried every request
+        assert len({port for _, _, port in Mailbox.received}) == 1
+        assert outbox.sent == 3
+        assert len(outbox.channels) == 1
+
+        # idle connections are closed
+        outbox.idle = 0.0
+        doist.recur()
+        assert outbox.channels == {}
+        doist.remove([outbox])
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_poster():
+    with habbing.openHby(name="posting", temp=True) as hby:
+        hab = hby.makeHab(name="sender")
+        postman = posting.poster(hby=hby, recp=PRE, hab=hab)
+        assert type(postman) is forwarding.StreamPoster
+
+        outbox = posting.Outbox()
+        postman = posting.poster(hby=hby, recp=PRE, outbox=outbox, hab=hab)
+        assert isinstance(postman, posting.PooledPoster)
+
+        # HTTP endpoints go to the outbox, others keep their own messenger
+        ends = {PRE: {"http": "http://127.0.0.1:5642/"}}
+        assert postman.sendDirect(hab, ends, b"msg") == []
+        assert len(outbox.queues) == 1